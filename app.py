@@ -6,14 +6,44 @@ del Centro Cultural Marcona como proyecto de misionales institucionales.
 """
 
 import streamlit as st
-import pandas as pd
-import numpy as np
-import json
-import folium
-from streamlit_folium import st_folium
-import plotly.graph_objects as go
+import streamlit.components.v1 as components
 from pathlib import Path
 
+# folium/streamlit_folium y plotly se importan recien donde se dibujan (mapa
+# interactivo y graficos de dimensionamiento): el titulo y los controles se
+# pintan antes de cargar esas librerias. Ver herramientas/perfil_arranque.py.
+
+from modelo.cache_disco import abrir_cache_disco, version_codigo
+from modelo.colegios import IndiceColegios
+from modelo.clusters import MAX_ELEMENTOS, construir_indice, nivel_para_zoom, proyectos_individuales
+from modelo.datos import (
+    DATASETS, DATASET_ACTIVO, cargar_inversiones, cargar_motor, cargar_padron_colegios, cargar_pares,
+    separar_marcona, version_dataset, version_motor, version_padron,
+)
+from modelo.dimensionamiento import (
+    COLEGIO_MAYOR_ALUMNOS, COLEGIO_MAYOR_NOMBRE, METODOS, METODO_DEFAULT, RANGOS_SLIDERS,
+    VERSION_MODELO, demanda_escolar_anual, dimensionar_escenario,
+)
+from modelo.filtros import DIMENSIONES, MIN_PARES, IndiceFiltros, normalizar_filtro, quitar_dimension
+from modelo.graficos import bases_comparacion, superponer_marcona
+from modelo.hexbin import METRICAS_HEX, agregar_hexagonos, geojson_hexagonos, resumen_hexagonos
+from modelo.mapa import (
+    CENTRO_PERU, ZOOM_INICIAL, agregar_leyenda, capa_clusters, construir_mapa, mapa_base, mapa_hexagonos,
+    mapa_lote,
+)
+from modelo.viewport import (
+    IndiceBBox, ampliar, caja_aproximada, caja_desde_bounds, contiene, filtrar_caja,
+)
+from modelo.alertas import alertas_escenario, leer_reglas, marcar_tabla, version_reglas
+from modelo.costos import NIVEL_PREDICCION, ajustar_modelo_costos, predecir_costos
+from modelo.cuantiles import K_DEFAULT, construir_sketches, estadisticas_sketch, percentil_sketch
+from modelo.estadisticas import (
+    N_REMUESTRAS, NIVEL_CONFIANZA, bootstrap_pares, intervalo_percentil, ratio_normalizado,
+)
+from modelo.lote import dimensionar_lote, resumen_nacional
+from modelo.memo import MemoLRU
+from modelo.precalculo import Precalculador, vecinos
+
 # =============================================
 # CONFIGURACION DE PAGINA
 # =============================================
@@ -27,161 +57,302 @@ st.set_page_config(
 BASE_DIR = Path(__file__).parent
 
 
+# =============================================
+# CACHE PERSISTENTE (OPCIONAL, COMPARTIDO ENTRE REPLICAS)
+# =============================================
+@st.cache_resource
+def get_cache_disco():
+    # Las entradas quedan atadas al codigo de app.py y modelo/: un despliegue nuevo no lee las viejas
+    base = Path(__file__).resolve().parent
+    return abrir_cache_disco(version_codigo([base / "app.py", *(base / "modelo").glob("*.py")]))
+
+
+cache_disco = get_cache_disco()
+
+
+def en_disco(partes_clave, fn, *args):
+    """Resultado desde el cache en disco si esta activado (CCM_CACHE_DISCO)."""
+    if cache_disco is None:
+        return fn(*args)
+    return cache_disco.obtener(partes_clave, fn, *args)
+
+
 # =============================================
 # CARGA DE DATOS
 # =============================================
 @st.cache_data
-def load_inversiones():
-    return pd.read_csv(BASE_DIR / "data" / "inversiones_mapav3.csv")
+def load_inversiones(version=DATASET_ACTIVO):
+    return en_disco(("inversiones", version_dataset(version)), cargar_inversiones, version)
 
 
 @st.cache_data
 def load_motor():
-    with open(BASE_DIR / "data" / "resultado_motor.json", "r", encoding="utf-8") as f:
-        return json.load(f)
+    return cargar_motor()
 
 
 df = load_inversiones()
 motor = load_motor()
 
-# -- Constantes de poblacion (Metodo 2 - INEI) --
-MET2 = motor["estadisticas"]["Método 2 (INEI + Proporciones Censo)"]
-POB_2026 = MET2["Población total inicial"]       # 21,409
-POB_2038 = MET2["Población total final"]          # 30,214
-TASA_CRECIMIENTO = MET2["Tasa de crecimiento anual (%)"] / 100  # 0.0291
-ANIO_BASE = MET2["Año inicial"]                   # 2026
-ANIO_FIN = MET2["Año final"]                      # 2038
-POB_0_14 = MET2["Población 0-14 años inicial"]    # 5,364
+# -- Separacion Marcona vs otros --
+marcona_row, otros = separar_marcona(df)
+REGION_MARCONA = "ICA"
+ESTILOS_SEVERIDAD = {"alerta": ("⚠️", "#ff6f00"), "advertencia": ("ℹ️", "#1976d2"), "info": ("💡", "#607d8b")}
 
 
-def proyectar_poblacion(pob_base, anio_base, anio_destino, tasa):
-    """Proyeccion geometrica de poblacion."""
-    t = anio_destino - anio_base
-    return int(round(pob_base * (1 + tasa) ** t))
+# =============================================
+# PRECALCULO EN SEGUNDO PLANO
+# =============================================
+@st.cache_resource
+def get_precalculador():
+    return Precalculador()
 
 
-# -- Separacion Marcona vs otros --
-marcona_row = df[df["es_marcona"] == True]
-otros = df[df["es_marcona"] == False]
+@st.cache_resource
+def load_pares(version, huella):
+    """Pares de una version: el CSV se lee una vez por contenido, no en cada rerun."""
+    return cargar_pares(version)
+
+
+def _pares_version(version):
+    return load_pares(version, VERSIONES[version])
+
+
+def _sketches_version(version):
+    """Sketches KLL de los pares de la version, en una sola pasada."""
+    return construir_sketches(_pares_version(version))
+
+
+@st.cache_resource
+def load_indice_filtros(version, huella):
+    """Mapas de bits por dimension de filtro de los pares de una version."""
+    return IndiceFiltros(_pares_version(version))
+
+
+def _pares_filtrados(version, filtro=()):
+    pares = _pares_version(version)
+    if not filtro:
+        return pares
+    return pares[load_indice_filtros(version, VERSIONES[version]).mascara(filtro)]
+
+
+def _sketches_filtro(version, filtro):
+    return construir_sketches(_pares_filtrados(version, filtro))
+
+
+@st.cache_resource(max_entries=64)
+def load_sketches(version, huella, filtro=()):
+    """Sketches de los pares por version y filtro, construidos una vez por proceso."""
+    if filtro:
+        return en_disco(("sketches", huella, K_DEFAULT, filtro), _sketches_filtro, version, filtro)
+    return en_disco(("sketches", huella, K_DEFAULT), _sketches_version, version)
+
+
+def calcular_sketches(version, filtro=()):
+    return load_sketches(version, VERSIONES[version], filtro)
+
+
+def _estadisticas_version(version, filtro=()):
+    return estadisticas_sketch(calcular_sketches(version, filtro)["total"])
+
+
+def calcular_pares(version, filtro=()):
+    return en_disco(
+        ("pares", version_dataset(version), "kll", K_DEFAULT, filtro), _estadisticas_version, version, filtro,
+    )
+
+
+def _bootstrap_version(version, filtro=()):
+    return bootstrap_pares(_pares_filtrados(version, filtro)["ratio_costo"].to_numpy())
+
+
+def calcular_bootstrap(version, filtro=()):
+    return en_disco(
+        ("bootstrap", version_dataset(version), N_REMUESTRAS, NIVEL_CONFIANZA, filtro),
+        _bootstrap_version, version, filtro,
+    )
+
+
+def _modelo_costos_version(version, filtro=()):
+    return ajustar_modelo_costos(_pares_filtrados(version, filtro))
+
+
+def calcular_modelo_costos(version, filtro=()):
+    return en_disco(
+        ("modelo_costos", version_dataset(version), NIVEL_PREDICCION, filtro),
+        _modelo_costos_version, version, filtro,
+    )
+
+
+def dimensionar_persistente(esc, metodo, alumnos_referencia, reglas, huella_reglas):
+    return en_disco(
+        ("dimensionamiento", VERSION_MOTOR, VERSION_MODELO, huella_reglas, tuple(sorted(esc.items())),
+         metodo, alumnos_referencia),
+        dimensionar_escenario, esc, metodo, alumnos_referencia, reglas,
+    )
+
+
+@st.cache_resource
+def load_mapa(huella):
+    """Mapa folium con todos los proyectos, construido una vez por version del dataset."""
+    return construir_mapa(load_inversiones(DATASET_ACTIVO))
+
+
+@st.cache_data
+def load_indice_clusters(huella):
+    return en_disco(("clusters", huella), construir_indice, load_inversiones(DATASET_ACTIVO))
+
+
+@st.cache_data
+def load_hexagonos(huella, tamano):
+    return en_disco(("hexagonos", huella, tamano), agregar_hexagonos, load_inversiones(DATASET_ACTIVO), tamano)
+
+
+def _html_hexagonos(huella, tamano, metrica):
+    geojson = geojson_hexagonos(load_hexagonos(huella, tamano), metrica)
+    return mapa_hexagonos(geojson, marcona_row, METRICAS_HEX[metrica]).get_root().render()
+
+
+@st.cache_data
+def load_mapa_hexagonos_html(huella, tamano, metrica):
+    return en_disco(("mapa_hexagonos_html", huella, tamano, metrica), _html_hexagonos, huella, tamano, metrica)
+
+
+@st.cache_resource
+def load_indice_bbox(huella):
+    proyectos = load_indice_clusters(huella)["proyectos"]
+    return IndiceBBox(proyectos["latitud"], proyectos["longitud"])
+
+
+def _bases_version(version, filtro=()):
+    return bases_comparacion(_pares_filtrados(version, filtro), cargar_inversiones(version)["tipo"].unique())
+
+
+@st.cache_data(max_entries=64)
+def load_bases_comparacion(huella, filtro=()):
+    """Figuras comparativas solo con los pares, una vez por version del dataset y filtro."""
+    return en_disco(("bases_comparacion", huella, filtro), _bases_version, DATASET_ACTIVO, filtro)
+
+
+@st.cache_resource
+def load_indice_colegios(huella):
+    """(indice espacial del padron de colegios o None, error de lectura o None)."""
+    try:
+        padron = cargar_padron_colegios()
+        return (None if padron is None else IndiceColegios(padron)), None
+    except ValueError as e:
+        return None, str(e)
+
+
+def consultar(clave, fn, *args, etiqueta="resultado"):
+    """Lee del cache de precalculo; muestra un indicador si aun se esta calculando."""
+    if precalculador.listo(clave):
+        return precalculador.obtener(clave, fn, *args)
+    with st.spinner(f"⏳ Calentando cache: {etiqueta}..."):
+        return precalculador.obtener(clave, fn, *args)
+
+
+@st.cache_resource
+def load_reglas(huella):
+    """(reglas de alerta, huella del contenido leido), una vez por contenido del archivo."""
+    return leer_reglas()
+
+
+precalculador = get_precalculador()
+VERSIONES = {v: version_dataset(v) for v in DATASETS}
+VERSION_MOTOR = version_motor()
+# Reglas y huella salen de los mismos bytes: un cambio del archivo no guarda resultados de las
+# reglas viejas bajo la huella nueva
+REGLAS_ALERTAS, VERSION_REGLAS = load_reglas(version_reglas())
+
+# Al cargar la pagina: estadisticas de pares para cada version del dataset
+for _v, _huella in VERSIONES.items():
+    precalculador.programar(("pares", _huella, ()), calcular_pares, _v)
+    precalculador.programar(("bootstrap", _huella, ()), calcular_bootstrap, _v)
+    precalculador.programar(("modelo_costos", _huella, ()), calcular_modelo_costos, _v)
+
+
+@st.cache_resource
+def get_memo():
+    return MemoLRU(max_entradas=256)
+
+
+memo = get_memo()
 
 
 # =============================================
-# MODELO DE DIMENSIONAMIENTO
+# ESTADO DEL ESCENARIO EN LA URL
 # =============================================
-BENCHMARKS = {
-    "Lima Metropolitana": {"pob": 10_400_000, "aforo": 1_500, "nombre": "Gran Teatro Nacional"},
-    "Ica":                {"pob": 150_000,    "aforo": 230,   "nombre": "Auditorio Ica"},
-    "Nasca":              {"pob": 30_000,     "aforo": 200,   "nombre": "Auditorio Nasca (ref.)"},
+# Rangos de los controles (minimo, maximo, paso) en unidades de la UI
+RANGOS_ENTRADAS = {
+    "monto":     (1_000_000, 200_000_000, 1_000_000),
+    "poblacion": (5_000, 50_000, 500),
+    "radio_captacion": (0.5, 20.0, 0.5),
 }
+DEFAULTS_ESCENARIO = {
+    "monto": int(marcona_row.iloc[0]["monto_viable"]) if not marcona_row.empty else 10_000_000,
+    "poblacion": int(marcona_row.iloc[0]["poblacion_ref"]) if not marcona_row.empty else 21_409,
+    "radio_captacion": 3.0,
+    "tasa_part": 50,
+    "ratio_m2": 1.0,
+    "horizonte": 12,
+    "factor_multi": 15,
+    "ratio_asistencia": 1.0,
+    "aforo_propuesto": 450,
+}
+LISTA_METODOS = list(METODOS)
 
 
-def enfoque_educativo(mayor_alumnos, tasa_part=0.15, ratio_m2=1.0, factor_multi=0.15):
-    """
-    Enfoque basado en la demanda del colegio mayor, con un factor de multifuncionalidad.
-    Args:
-        - mayor_alumnos: Numero de alumnos del colegio mayor (ej. 587)
-        - tasa_part: Porcentaje de alumnos que participarian (ej. 15%)
-        - ratio_m2: Metros cuadrados por persona (ej. 1.0 m2/persona)
-        - factor_multi: Incremento porcentual por uso multifuncional (ej. 15% = +15% de demanda)
-    """
-    demanda_base = int(mayor_alumnos * tasa_part)
-    demanda_multi = int(demanda_base * (1 + factor_multi))
-    limite_minedu = 300
-    aforo = min(demanda_multi, limite_minedu)
-    return {
-        "enfoque": "A - Educativo (MINEDU)",
-        "aforo": aforo,
-        "area_m2": aforo * ratio_m2,
-        "detalle": (
-            f"{tasa_part:.0%} de {mayor_alumnos} alumnos = {demanda_base}, "
-            f"+{factor_multi:.0%} multi = {demanda_multi}, "
-            f"tope MINEDU = {limite_minedu}"
-        ),
-    }
-
+def ajustar_a_rango(valor, minimo, maximo, paso):
+    """Lleva un valor de la URL al rango y paso del control correspondiente."""
+    valor = min(max(valor, minimo), maximo)
+    valor = round(minimo + round((valor - minimo) / paso) * paso, 6)
+    return int(valor) if isinstance(paso, int) else valor
 
-def enfoque_poblacional(horizonte_anios=12, ratio_asistencia=0.01, ratio_m2=1.0):
-    anio_h = ANIO_BASE + horizonte_anios
-    pob_proy = proyectar_poblacion(POB_2026, ANIO_BASE, anio_h, TASA_CRECIMIENTO)
-    aforo = int(round(pob_proy * ratio_asistencia))
-    return {
-        "enfoque": "B - Poblacional",
-        "aforo": aforo,
-        "area_m2": aforo * ratio_m2,
-        "pob_proyectada": pob_proy,
-        "anio_horizonte": anio_h,
-        "detalle": f"{ratio_asistencia:.1%} de {pob_proy:,.0f} hab. ({anio_h})",
-    }
 
+def valores_url():
+    """Escenario leido de los query params (valores invalidos o ausentes -> default)."""
+    rangos = {**RANGOS_ENTRADAS, **RANGOS_SLIDERS}
+    valores = {}
+    for clave, default in DEFAULTS_ESCENARIO.items():
+        try:
+            valores[clave] = ajustar_a_rango(float(st.query_params[clave]), *rangos[clave])
+        except (KeyError, ValueError):
+            valores[clave] = default
+    try:
+        idx_metodo = int(st.query_params["metodo"]) - 1
+        valores["metodo"] = LISTA_METODOS[idx_metodo] if idx_metodo >= 0 else METODO_DEFAULT
+    except (KeyError, ValueError, IndexError):
+        valores["metodo"] = METODO_DEFAULT
+    return valores
 
-def enfoque_benchmark(aforo_propuesto=450, horizonte_anios=12, ratio_m2=1.0):
-    anio_h = ANIO_BASE + horizonte_anios
-    pob_proy = proyectar_poblacion(POB_2026, ANIO_BASE, anio_h, TASA_CRECIMIENTO)
-    pob_nasca, af_nasca = 30_000, 200
-    pob_ica, af_ica = 150_000, 400
-    log_pob = np.log(pob_proy)
-    log_nasca = np.log(pob_nasca)
-    log_ica = np.log(pob_ica)
-    aforo_interp = af_nasca + (af_ica - af_nasca) * (log_pob - log_nasca) / (log_ica - log_nasca)
-    aforo_interp = int(round(max(aforo_interp, 50)))
-    limite_3pct = pob_proy * 0.03
-    penalizado = aforo_propuesto > limite_3pct
-    score = 1.0 if not penalizado else max(0.3, limite_3pct / aforo_propuesto)
-    aforo_bench = int(round(aforo_interp * score))
-    return {
-        "enfoque": "C - Benchmark",
-        "aforo": aforo_bench,
-        "area_m2": aforo_bench * ratio_m2,
-        "penalizado": penalizado,
-        "score": score,
-        "detalle": (
-            f"Interpolado: {aforo_interp} (log Nasca-Ica), "
-            f"Limite 3%={int(limite_3pct)}, "
-            f"Score={'ALERTA ' if penalizado else 'OK '}{score:.2f}"
-        ),
-    }
 
+def cargar_estado_url():
+    """
+    Completa en cada rerun los controles que no estan en la sesion. Streamlit
+    borra el estado de los widgets al salir de la pagina; al volver se toman
+    del ultimo escenario guardado (`_escenario`, que no es un widget y se
+    conserva) y, al abrir la sesion, de la URL.
+    """
+    faltantes = [c for c in (*DEFAULTS_ESCENARIO, "metodo") if c not in st.session_state]
+    if not faltantes:
+        return
+    origen = st.session_state.get("_escenario") or valores_url()
+    for clave in faltantes:
+        st.session_state[clave] = origen[clave]
 
-def calcular_dimensionamiento(
-    mayor_alumnos, tasa_part, ratio_m2, horizonte, factor_multi,
-    ratio_asistencia, aforo_propuesto
-):
-    r_edu = enfoque_educativo(mayor_alumnos, tasa_part, ratio_m2, factor_multi)
-    r_pob = enfoque_poblacional(horizonte, ratio_asistencia, ratio_m2)
-    r_bch = enfoque_benchmark(aforo_propuesto, horizonte, ratio_m2)
-
-    aforos = [r_edu["aforo"], r_pob["aforo"], r_bch["aforo"]]
-    rango_min = min(aforos)
-    rango_max = max(aforos)
-    punto_eq = int(round(np.mean(aforos)))
-    area_eq = punto_eq * ratio_m2
-
-    anio_h = ANIO_BASE + horizonte
-    pob_proy = proyectar_poblacion(POB_2026, ANIO_BASE, anio_h, TASA_CRECIMIENTO)
-
-    alertas = []
-    if aforo_propuesto > 500:
-        alertas.append(
-            "ALERTA: El aforo excede estandares de sostenibilidad para un distrito "
-            "de ~20k habitantes. Riesgo de infraestructura subutilizada."
-        )
-    if aforo_propuesto > pob_proy * 0.03:
-        alertas.append(
-            f"ADVERTENCIA: El aforo ({aforo_propuesto}) supera el 3% de la poblacion "
-            f"proyectada ({pob_proy:,.0f}). Revisar justificacion."
-        )
 
-    return {
-        "enfoques": [r_edu, r_pob, r_bch],
-        "rango_min": rango_min,
-        "rango_max": rango_max,
-        "punto_equilibrio": punto_eq,
-        "area_equilibrio": area_eq,
-        "aforo_propuesto": aforo_propuesto,
-        "anio_horizonte": anio_h,
-        "pob_proyectada": pob_proy,
-        "alertas": alertas,
+def guardar_estado_url():
+    """Escribe el escenario actual en la URL para poder compartirlo y lo guarda para el regreso a la pagina."""
+    st.session_state["_escenario"] = {
+        clave: st.session_state[clave] for clave in (*DEFAULTS_ESCENARIO, "metodo")
     }
+    estado = {clave: str(st.session_state[clave]) for clave in DEFAULTS_ESCENARIO}
+    estado["metodo"] = str(LISTA_METODOS.index(st.session_state["metodo"]) + 1)
+    if st.query_params.to_dict() != estado:
+        st.query_params.from_dict(estado)
+
+
+cargar_estado_url()
 
 
 # =============================================
@@ -274,10 +445,10 @@ col_ctrl1, col_ctrl2, col_ctrl3 = st.columns(3, gap="medium")
 with col_ctrl1:
     monto_proyecto = st.number_input(
         "💰 Monto Total del Proyecto (S/)",
-        min_value=1_000_000,
-        max_value=200_000_000,
-        value=int(marcona_row.iloc[0]["monto_viable"]) if not marcona_row.empty else 10_000_000,
-        step=1_000_000,
+        min_value=RANGOS_ENTRADAS["monto"][0],
+        max_value=RANGOS_ENTRADAS["monto"][1],
+        step=RANGOS_ENTRADAS["monto"][2],
+        key="monto",
         help="Costo total estimado de inversión del Centro Cultural Marcona",
         format="%d"
     )
@@ -285,10 +456,10 @@ with col_ctrl1:
 with col_ctrl2:
     poblacion_proyecto = st.number_input(
         "👥 Población Beneficiaria Proyectada",
-        min_value=5_000,
-        max_value=50_000,
-        value=int(marcona_row.iloc[0]["poblacion_ref"]) if not marcona_row.empty else 21_409,
-        step=500,
+        min_value=RANGOS_ENTRADAS["poblacion"][0],
+        max_value=RANGOS_ENTRADAS["poblacion"][1],
+        step=RANGOS_ENTRADAS["poblacion"][2],
+        key="poblacion",
         help="Población proyectada del distrito de Marcona al 2026",
         format="%d"
     )
@@ -302,6 +473,34 @@ with col_ctrl3:
         help="Costo por beneficiario = Monto Total / Población"
     )
 
+# Filtros del conjunto de pares (mapas de bits precalculados por version)
+indice_filtros = load_indice_filtros(DATASET_ACTIVO, VERSIONES[DATASET_ACTIVO])
+with st.expander("🔎 Filtrar proyectos pares (estadísticas, intervalos y gráficos)"):
+    cols_filtro = st.columns(len(DIMENSIONES))
+    selecciones = {
+        dimension: col.multiselect(
+            etiqueta, indice_filtros.opciones(dimension), key=f"filtro_{dimension}", placeholder="Todos",
+        )
+        for col, (dimension, etiqueta) in zip(cols_filtro, DIMENSIONES.items())
+    }
+    filtro_pares = normalizar_filtro(selecciones)
+    n_filtrados = indice_filtros.conteo(filtro_pares)
+    if filtro_pares and n_filtrados < MIN_PARES:
+        st.warning(
+            f"El filtro deja {n_filtrados} proyectos (mínimo {MIN_PARES}); se usan todos los pares."
+        )
+        filtro_pares = ()
+    else:
+        st.caption(f"{n_filtrados} de {indice_filtros.n} proyectos pares seleccionados.")
+# El modelo de costos ignora la banda de monto: recortar la variable que se ajusta (el monto)
+# sesga la elasticidad hacia 0
+filtro_costos = quitar_dimension(filtro_pares, "banda_monto")
+
+stats_pares = consultar(
+    ("pares", VERSIONES[DATASET_ACTIVO], filtro_pares), calcular_pares, DATASET_ACTIVO, filtro_pares,
+    etiqueta="estadísticas de pares",
+)
+
 # Actualizar datos de Marcona con valores interactivos
 if not marcona_row.empty:
     marcona_actualizado = marcona_row.copy()
@@ -310,10 +509,8 @@ if not marcona_row.empty:
     marcona_actualizado.loc[marcona_actualizado.index[0], "ratio_costo"] = ratio_calculado
     
     # Recalcular ratio_costo_norm
-    min_ratio = otros["ratio_costo"].min()
-    max_ratio = otros["ratio_costo"].max()
     marcona_actualizado.loc[marcona_actualizado.index[0], "ratio_costo_norm"] = (
-        (ratio_calculado - min_ratio) / (max_ratio - min_ratio) if max_ratio > min_ratio else 0.5
+        ratio_normalizado(stats_pares, ratio_calculado)
     )
     
     mr = marcona_actualizado.iloc[0]
@@ -323,133 +520,147 @@ else:
 st.markdown("---")
 
 # FILA 1: Mapa + Indicadores Clave
+MODOS_MAPA = ["Agrupado por zoom", "Ventana visible", "Densidad hexagonal", "Todos los proyectos"]
+
 col_mapa, col_stats = st.columns([6, 4], gap="medium")
 
 with col_mapa:
     st.markdown('<p class="section-header">📍 Proyectos bibliotecarios a nivel nacional</p>', unsafe_allow_html=True)
     
-    # Crear mapa con leyenda
-    m = folium.Map(
-        location=[-9.19, -75.015],
-        zoom_start=5,
-        tiles="CartoDB positron",
+    modo_mapa = st.radio(
+        "Vista del mapa", MODOS_MAPA, horizontal=True, key="modo_mapa",
+        label_visibility="collapsed",
     )
     
-    # Agregar marcadores
-    for idx, row in df.iterrows():
-        if pd.isna(row["latitud"]) or pd.isna(row["longitud"]):
-            continue
-        es_m = bool(row.get("es_marcona", False))
+    if modo_mapa == "Agrupado por zoom":
+        # Clusters precalculados por nivel de zoom; el navegador solo recibe los del zoom actual
+        indice = load_indice_clusters(VERSIONES[DATASET_ACTIVO])
+        zoom_mapa = st.session_state.get("mapa_zoom", ZOOM_INICIAL)
+        clusters = nivel_para_zoom(indice, zoom_mapa)
         
-        popup_html = f"""
-        <div style="width: 300px; font-family: 'Inter', Arial, sans-serif;">
-            <h4 style="color: {'#c62828' if es_m else '#1565c0'}; 
-                       margin-bottom: 10px; font-size: 14px; font-weight: 600;">
-                {row['entidad']}
-            </h4>
-            <table style="font-size: 12px; width: 100%; border-collapse: collapse;">
-                <tr style="border-bottom: 1px solid #eee;">
-                    <td style="padding: 4px 0; font-weight: 600;">Población proyectada el 2026:</td>
-                    <td style="padding: 4px 0;">{row['poblacion_ref']:,.0f} hab.</td>
-                </tr>
-                <tr style="border-bottom: 1px solid #eee;">
-                    <td style="padding: 4px 0; font-weight: 600;">Ratio Costo:</td>
-                    <td style="padding: 4px 0;">S/ {row['ratio_costo']:,.0f} /hab</td>
-                </tr>
-                <tr>
-                    <td style="padding: 4px 0; font-weight: 600;">Tipo:</td>
-                    <td style="padding: 4px 0;">{row['tipo']}</td>
-                </tr>
-            </table>
-        </div>
-        """
+        from streamlit_folium import st_folium
+
+        m = mapa_base()
+        agregar_leyenda(m)
+        salida_mapa = st_folium(
+            m, key="mapa_clusters", width=None, height=450,
+            zoom=zoom_mapa, center=st.session_state.get("mapa_centro", CENTRO_PERU),
+            feature_group_to_add=capa_clusters(clusters, indice["proyectos"], marcona_row),
+            returned_objects=["zoom", "center"],
+        )
+        st.caption(
+            f"Zoom {zoom_mapa}: {len(clusters)} elementos dibujados "
+            f"({len(indice['proyectos'])} proyectos)"
+        )
+        
+        if salida_mapa and salida_mapa.get("center"):
+            st.session_state["mapa_centro"] = (salida_mapa["center"]["lat"], salida_mapa["center"]["lng"])
+        if salida_mapa and salida_mapa.get("zoom") and salida_mapa["zoom"] != zoom_mapa:
+            st.session_state["mapa_zoom"] = salida_mapa["zoom"]
+            st.rerun()
+    elif modo_mapa == "Ventana visible":
+        # Solo se envian los marcadores de la ventana visible mas un margen
+        indice = load_indice_clusters(VERSIONES[DATASET_ACTIVO])
+        indice_bbox = load_indice_bbox(VERSIONES[DATASET_ACTIVO])
+        zoom_mapa = st.session_state.get("mapa_zoom", ZOOM_INICIAL)
+        centro_mapa = st.session_state.get("mapa_centro", CENTRO_PERU)
+        caja_vista = st.session_state.get("mapa_caja") or caja_aproximada(centro_mapa, zoom_mapa)
         
-        if es_m:
-            folium.Marker(
-                [row["latitud"], row["longitud"]],
-                popup=folium.Popup(popup_html, max_width=350),
-                tooltip="<b>CENTRO CULTURAL MARCONA</b> (Propuesta)",
-                icon=folium.Icon(color="red", icon="star", prefix="fa"),
-            ).add_to(m)
+        # Se recarga solo si la vista sale de la zona ya cargada o cambia el zoom
+        caja_carga = st.session_state.get("mapa_caja_carga")
+        if (caja_carga is None or not contiene(caja_carga, caja_vista)
+                or st.session_state.get("mapa_zoom_carga") != zoom_mapa):
+            caja_carga = ampliar(caja_vista)
+            st.session_state["mapa_caja_carga"] = caja_carga
+            st.session_state["mapa_zoom_carga"] = zoom_mapa
+        
+        filas_vista = indice_bbox.consultar(caja_carga)
+        if len(filas_vista) <= MAX_ELEMENTOS:
+            elementos = proyectos_individuales(indice["proyectos"], filas_vista)
         else:
-            ratio_norm = row.get("ratio_costo_norm", 0.5)
-            
-            if ratio_norm < 0.1:
-                color = "#42a5f5"
-            elif ratio_norm < 0.5:
-                color = "#ffa726"
-            else:
-                color = "#ef5350"
-            
-            radius = 6 + ratio_norm * 8
-            
-            folium.CircleMarker(
-                [row["latitud"], row["longitud"]],
-                radius=radius,
-                popup=folium.Popup(popup_html, max_width=350),
-                tooltip=f"<b>{row['entidad'][:60]}</b><br>Ratio: S/ {row['ratio_costo']:,.0f}/hab",
-                color=color,
-                fill=True,
-                fill_color=color,
-                fill_opacity=0.75,
-                weight=2,
-            ).add_to(m)
-    
-    # Agregar leyenda al mapa
-    from branca.element import MacroElement
-    from jinja2 import Template
-    
-    template = """
-    {% macro html(this, kwargs) %}
-    <div style="position: fixed; 
-                bottom: 50px; right: 50px; 
-                background-color: white;
-                border: 2px solid #1565c0;
-                border-radius: 8px;
-                padding: 10px;
-                font-family: 'Inter', Arial, sans-serif;
-                font-size: 11px;
-                box-shadow: 0 2px 8px rgba(0,0,0,0.15);
-                z-index: 9999;">
-        <p style="margin: 0 0 8px 0; font-weight: bold; color: #0d47a1;">
-            Ratio Costo/Beneficiario
-        </p>
-        <div style="margin: 4px 0;">
-            <span style="display: inline-block; width: 12px; height: 12px; 
-                         background: #42a5f5; border-radius: 50%; margin-right: 6px;"></span>
-            Bajo (&lt; percentil 33)
-        </div>
-        <div style="margin: 4px 0;">
-            <span style="display: inline-block; width: 12px; height: 12px; 
-                         background: #ffa726; border-radius: 50%; margin-right: 6px;"></span>
-            Medio (percentil 33-66)
-        </div>
-        <div style="margin: 4px 0;">
-            <span style="display: inline-block; width: 12px; height: 12px; 
-                         background: #ef5350; border-radius: 50%; margin-right: 6px;"></span>
-            Alto (&gt; percentil 66)
-        </div>
-        <div style="margin: 8px 0 4px 0;">
-            <span style="color: #c62828; font-size: 14px; margin-right: 6px;">★</span>
-            <b>Centro Cultural Marcona</b>
-        </div>
-    </div>
-    {% endmacro %}
-    """
-    
-    macro = MacroElement()
-    macro._template = Template(template)
-    m.get_root().add_child(macro)
-    
-    st_folium(m, width=None, height=450, returned_objects=[])
+            elementos = filtrar_caja(nivel_para_zoom(indice, zoom_mapa), caja_carga)
+        
+        from streamlit_folium import st_folium
+
+        m = mapa_base()
+        agregar_leyenda(m)
+        salida_mapa = st_folium(
+            m, key="mapa_viewport", width=None, height=450,
+            zoom=zoom_mapa, center=centro_mapa,
+            feature_group_to_add=capa_clusters(elementos, indice["proyectos"], marcona_row),
+            returned_objects=["zoom", "center", "bounds"],
+        )
+        st.caption(
+            f"{len(filas_vista)} de {len(indice['proyectos'])} proyectos en la ventana (+margen) | "
+            f"{len(elementos)} elementos dibujados"
+        )
+        
+        if salida_mapa and salida_mapa.get("center"):
+            st.session_state["mapa_centro"] = (salida_mapa["center"]["lat"], salida_mapa["center"]["lng"])
+        caja_reportada = caja_desde_bounds((salida_mapa or {}).get("bounds"))
+        if caja_reportada is not None:
+            st.session_state["mapa_caja"] = caja_reportada
+        zoom_nuevo = (salida_mapa or {}).get("zoom") or zoom_mapa
+        st.session_state["mapa_zoom"] = zoom_nuevo
+        if zoom_nuevo != zoom_mapa or not contiene(caja_carga, st.session_state.get("mapa_caja") or caja_vista):
+            st.rerun()
+    elif modo_mapa == "Densidad hexagonal":
+        # Proyectos agregados en hexagonos: una sola capa, independiente del numero de proyectos
+        col_hex1, col_hex2 = st.columns([3, 2])
+        with col_hex1:
+            metrica_hex = st.selectbox(
+                "Métrica por hexágono", list(METRICAS_HEX), format_func=METRICAS_HEX.get,
+                key="metrica_hex",
+            )
+        with col_hex2:
+            tamano_hex = st.select_slider(
+                "Tamaño del hexágono (°)", options=[0.25, 0.5, 0.75, 1.0, 1.5], value=0.75,
+                key="tamano_hex",
+            )
+        components.html(
+            load_mapa_hexagonos_html(VERSIONES[DATASET_ACTIVO], tamano_hex, metrica_hex), height=450,
+        )
+        hexagonos = load_hexagonos(VERSIONES[DATASET_ACTIVO], tamano_hex)
+        st.caption(f"{len(hexagonos)} hexágonos con proyectos ({int(hexagonos['n'].sum())} proyectos)")
+        with st.expander("Agregados por hexágono"):
+            st.dataframe(resumen_hexagonos(hexagonos), hide_index=True)
+    else:
+        from streamlit_folium import st_folium
+
+        st_folium(load_mapa(VERSIONES[DATASET_ACTIVO]), key="mapa_todos", width=None, height=450,
+                  returned_objects=[])
 
 with col_stats:
     st.markdown('<p class="section-header">📊 Indicadores clave del proyecto</p>', unsafe_allow_html=True)
     
     if mr is not None:
-        promedio_ratio = otros["ratio_costo"].mean()
-        mediana_ratio = otros["ratio_costo"].median()
-        percentil = (otros["ratio_costo"] < mr["ratio_costo"]).sum() / len(otros) * 100
+        promedio_ratio = stats_pares["promedio"]
+        mediana_ratio = stats_pares["mediana"]
+        percentil = percentil_sketch(stats_pares["sketch"], mr["ratio_costo"])
+        
+        # Intervalos de confianza por bootstrap (remuestras cacheadas por version)
+        boot_pares = consultar(
+            ("bootstrap", VERSIONES[DATASET_ACTIVO], filtro_pares), calcular_bootstrap, DATASET_ACTIVO,
+            filtro_pares,
+            etiqueta="intervalos de confianza",
+        )
+        mediana_ic = boot_pares["mediana_ic"]
+        
+        # Medianas del mismo tipo y de la region de Marcona (sketches por grupo)
+        sketches_pares = calcular_sketches(DATASET_ACTIVO, filtro_pares)
+        medianas_grupo = [
+            (etiqueta, estadisticas_sketch(sketches_pares[dimension][valor]))
+            for etiqueta, dimension, valor in (
+                (f"tipo {mr['tipo']}", "tipo", mr["tipo"]), (f"región {REGION_MARCONA}", "region", REGION_MARCONA),
+            )
+            if valor in sketches_pares[dimension]
+        ]
+        texto_grupos = " | ".join(
+            f"Mediana {etiqueta}: S/ {st_grupo['mediana']:,.0f} (n={st_grupo['n']})"
+            for etiqueta, st_grupo in medianas_grupo
+        )
+        percentil_ic = intervalo_percentil(boot_pares, mr["ratio_costo"])
+        nivel_ic = f"IC {boot_pares['nivel']:.0%}"
         
         # Indicadores en cards
         st.markdown(f"""
@@ -461,6 +672,11 @@ with col_stats:
             <p style="font-size: 12px; color: #666; margin: 1px 0 0 0;">
                 Es el costo por habitante más representativo entre los proyectos analizados (mediana)
             </p>
+            <p style="font-size: 11px; color: #666; margin: 2px 0 0 0;">
+                {nivel_ic}: S/ {mediana_ic[0]:,.0f} – S/ {mediana_ic[1]:,.0f} |
+                Marcona en el percentil {percentil:.0f} ({nivel_ic}: {percentil_ic[0]:.0f} – {percentil_ic[1]:.0f})
+            </p>
+            <p style="font-size: 11px; color: #666; margin: 2px 0 0 0;">{texto_grupos}</p>
         </div>
         """, unsafe_allow_html=True)
 
@@ -476,8 +692,26 @@ with col_stats:
         </div>
         """, unsafe_allow_html=True)        
         
-        costo_referencial = mediana_ratio * mr["poblacion_ref"]
+        # Costo de referencia con economias de escala (modelo log-log por version y filtro)
+        modelo_costos = consultar(
+            ("modelo_costos", VERSIONES[DATASET_ACTIVO], filtro_costos), calcular_modelo_costos, DATASET_ACTIVO,
+            filtro_costos,
+            etiqueta="modelo de costos",
+        )
+        prediccion = predecir_costos(modelo_costos, mr["poblacion_ref"], mr["tipo"])
+        nota_filtro_costos = " (sin el filtro de monto)" if filtro_costos != filtro_pares else ""
+        costo_referencial = float(prediccion["costo"][0])
+        costo_pi = (float(prediccion["bajo"][0]), float(prediccion["alto"][0]))
         diferencia_costo = ((mr["monto_viable"] / costo_referencial - 1) * 100) if costo_referencial > 0 else 0
+        diferencia_pi = [(mr["monto_viable"] / c - 1) * 100 for c in costo_pi[::-1]]
+        alertas_costo = "".join(
+            f'<p style="font-size: 11px; color: {ESTILOS_SEVERIDAD[a["severidad"]][1]}; margin: 2px 0 0 0;">'
+            f'{ESTILOS_SEVERIDAD[a["severidad"]][0]} {a["mensaje"]}</p>'
+            for a in alertas_escenario(REGLAS_ALERTAS, {
+                "monto_viable": mr["monto_viable"], "costo_referencial": costo_referencial,
+                "costo_bajo": costo_pi[0], "costo_alto": costo_pi[1],
+            })
+        )
         
         st.markdown(f"""
         <div class="metric-card">
@@ -486,149 +720,37 @@ with col_stats:
                 S/ {costo_referencial:,.0f}
             </p>
             <p style="font-size: 12px; color: #666; margin: 1px 0 0 0;">
-                Basado en ratio típico (S/ {mediana_ratio:,.0f}/hab). 
+                Según la escala de los proyectos pares (elasticidad {modelo_costos['elasticidad']:.2f}: 
+                +10% de población ≈ {(1.1 ** modelo_costos['elasticidad'] - 1) * 100:+.1f}% de costo). 
                 <b style="color: {'#d32f2f' if diferencia_costo > 0 else '#388e3c'};">
                 {diferencia_costo:+.1f}%</b> vs monto actual
             </p>
+            <p style="font-size: 11px; color: #666; margin: 2px 0 0 0;">
+                Intervalo de predicción {modelo_costos['nivel']:.0%}: S/ {costo_pi[0]:,.0f} – S/ {costo_pi[1]:,.0f}
+                ({diferencia_pi[0]:+.0f}% a {diferencia_pi[1]:+.0f}% vs monto) | n={modelo_costos['n']}{nota_filtro_costos}
+            </p>
+            {alertas_costo}
         </div>
         """, unsafe_allow_html=True)
 
+
 # FILA 2: Gráficos Comparativos
 st.markdown('<p class="section-header">📈 Análisis Comparativo de Ratios</p>', unsafe_allow_html=True)
 
 col_g1, col_g2, col_g3 = st.columns(3, gap="medium")
 
+# Bases de pares cacheadas por version; en cada rerun solo se agrega Marcona
+fig_hist, fig_box, fig_scatter = superponer_marcona(
+    load_bases_comparacion(VERSIONES[DATASET_ACTIVO], filtro_pares), mr,
+)
+
 with col_g1:
-    # Distribución de ratios con marcona destacado
-    fig_hist = go.Figure()
-    
-    fig_hist.add_trace(go.Histogram(
-        x=otros["ratio_costo"],
-        name="Otros Proyectos",
-        marker_color="#64b5f6",
-        opacity=0.75,
-        nbinsx=25,
-        hovertemplate="<b>Rango:</b> %{x}<br><b>Frecuencia:</b> %{y}<extra></extra>",
-    ))
-    
-    if mr is not None:
-        fig_hist.add_vline(
-            x=mr["ratio_costo"],
-            line_dash="solid",
-            line_color="#c62828",
-            line_width=3,
-            annotation_text=f"<b>Marcona</b><br>S/ {mr['ratio_costo']:,.0f}",
-            annotation_position="top",
-            annotation=dict(font=dict(size=11, color="#c62828")),
-        )
-        
-        # Agregar punto en la línea vertical
-        fig_hist.add_trace(go.Scatter(
-            x=[mr["ratio_costo"]],
-            y=[5],
-            mode="markers",
-            marker=dict(size=14, color="#c62828", symbol="star", line=dict(color="white", width=2)),
-            showlegend=False,
-            hovertemplate=f"<b>Centro Cultural Marcona</b><br>Ratio: S/ {mr['ratio_costo']:,.0f}/hab<br>Monto: S/ {mr['monto_viable']:,.0f}<br>Población: {mr['poblacion_ref']:,.0f}<extra></extra>",
-        ))
-    
-    fig_hist.update_layout(
-        title=dict(
-            text="<b>Distribución de Ratios Costo/Beneficiario</b>",
-            font=dict(size=14, family="Inter"),
-        ),
-        xaxis_title="Ratio (S/. por habitante)",
-        yaxis_title="Número de Proyectos",
-        template="plotly_white",
-        height=300,
-        margin=dict(t=50, b=40, l=40, r=20),
-        showlegend=False,
-        font=dict(family="Inter", size=11),
-    )
     st.plotly_chart(fig_hist, width="stretch", key="fig_hist_ratio")
 
 with col_g2:
-    # Box plot por tipo con Marcona
-    fig_box = go.Figure()
-    
-    for tipo in df["tipo"].unique():
-        df_tipo = otros[otros["tipo"] == tipo]
-        fig_box.add_trace(go.Box(
-            y=df_tipo["ratio_costo"],
-            name=tipo,
-            marker_color="#66bb6a",
-            boxmean="sd",
-            hovertemplate="<b>" + tipo + "</b><br>Ratio: S/ %{y:,.0f}/hab<extra></extra>",
-        ))
-    
-    if mr is not None:
-        fig_box.add_trace(go.Scatter(
-            x=[mr["tipo"]],
-            y=[mr["ratio_costo"]],
-            mode="markers",
-            marker=dict(size=16, color="#c62828", symbol="star", line=dict(color="white", width=2)),
-            name="Marcona",
-            hovertemplate=f"<b>Marcona</b><br>Tipo: {mr['tipo']}<br>Ratio: S/ {mr['ratio_costo']:,.0f}/hab<br>Monto: S/ {mr['monto_viable']:,.0f}<br>Población: {mr['poblacion_ref']:,.0f}<extra></extra>",
-        ))
-    
-    fig_box.update_layout(
-        title=dict(
-            text="<b>Ratios por Tipo de Proyecto</b>",
-            font=dict(size=14, family="Inter"),
-        ),
-        yaxis_title="Ratio (S/. por habitante)",
-        template="plotly_white",
-        height=300,
-        margin=dict(t=50, b=40, l=40, r=20),
-        showlegend=False,
-        font=dict(family="Inter", size=11),
-    )
     st.plotly_chart(fig_box, key="fig_box_tipo")
 
 with col_g3:
-    # Scatter: Población vs Ratio
-    fig_scatter = go.Figure()
-    
-    fig_scatter.add_trace(go.Scatter(
-        x=otros["pob_dist"],
-        y=otros["ratio_costo"],
-        mode="markers",
-        marker=dict(
-            size=8,
-            color=otros["ratio_costo_norm"] if "ratio_costo_norm" in otros.columns else otros["ratio_costo"],
-            colorscale="RdYlBu_r",
-            showscale=False,
-            line=dict(color="white", width=0.5),
-        ),
-        name="Otros",
-        text=otros["nombre_pip"].str[:40],
-        hovertemplate="<b>%{text}</b><br>Población: %{x:,.0f} hab<br>Ratio: S/ %{y:,.0f}/hab<extra></extra>",
-    ))
-    
-    if mr is not None:
-        fig_scatter.add_trace(go.Scatter(
-            x=[mr["pob_dist"]],
-            y=[mr["ratio_costo"]],
-            mode="markers",
-            marker=dict(size=20, color="#c62828", symbol="star", line=dict(color="white", width=2)),
-            name="Marcona",
-            hovertemplate=f"<b>Centro Cultural Marcona</b><br>Población: {mr['pob_dist']:,.0f} hab<br>Ratio: S/ {mr['ratio_costo']:,.0f}/hab<br>Monto: S/ {mr['monto_viable']:,.0f}<extra></extra>",
-        ))
-    
-    fig_scatter.update_layout(
-        title=dict(
-            text="<b>Población Distrital vs Ratio</b>",
-            font=dict(size=14, family="Inter"),
-        ),
-        xaxis_title="Población Distrital (habitantes)",
-        yaxis_title="Ratio (S/. por habitante)",
-        template="plotly_white",
-        height=300,
-        margin=dict(t=50, b=40, l=40, r=20),
-        showlegend=False,
-        font=dict(family="Inter", size=11),
-        xaxis=dict(type="log"),
-    )
     st.plotly_chart(fig_scatter, key="fig_scatter_pob")
 
 # FILA 3: Recomendaciones Estratégicas
@@ -691,67 +813,132 @@ st.markdown("""
 </div>
 """, unsafe_allow_html=True)
 
-# Constantes del padrón educativo (del notebook)
-COLEGIO_MAYOR_ALUMNOS = 976
-COLEGIO_MAYOR_NOMBRE = "23544 CORONEL FRANCISCO BOLOGNESI"
+# Demanda por radio de captación alrededor del sitio propuesto (padrón local opcional)
+indice_colegios, error_padron = load_indice_colegios(version_padron())
+if error_padron is not None:
+    st.warning(
+        f"⚠️ No se pudo leer `data/padron_colegios.csv` ({error_padron}). "
+        f"Se usa la matrícula fija de {COLEGIO_MAYOR_NOMBRE} ({COLEGIO_MAYOR_ALUMNOS} alumnos)."
+    )
+sitio_propuesto = (
+    (float(marcona_row.iloc[0]["latitud"]), float(marcona_row.iloc[0]["longitud"]))
+    if not marcona_row.empty else None
+)
+captacion = None
+if indice_colegios is not None and sitio_propuesto is not None:
+    minimo, maximo, paso = RANGOS_ENTRADAS["radio_captacion"]
+    radio_captacion = st.slider(
+        "📍 Radio de captación escolar (km)", min_value=minimo, max_value=maximo, step=paso,
+        key="radio_captacion",
+        help="Se suman los alumnos de los colegios del padrón dentro de este radio del sitio propuesto",
+    )
+    captacion = indice_colegios.captacion(sitio_propuesto, radio_captacion)
+
+# Alumnos de referencia del enfoque educativo: con padron, el total de alumnos dentro del
+# radio de captacion (no solo el colegio mayor); sin padron, la matricula del colegio mayor
+if captacion is not None:
+    alumnos_referencia = captacion["alumnos"]
+    fuente_alumnos = f"{captacion['colegios']} colegios a ≤ {captacion['radio_km']:g} km"
+    if captacion["mayor"] is not None:
+        fuente_alumnos += f" (mayor: {captacion['mayor']['nombre']}, {captacion['mayor']['alumnos']})"
+else:
+    alumnos_referencia = COLEGIO_MAYOR_ALUMNOS
+    fuente_alumnos = COLEGIO_MAYOR_NOMBRE
+
+def slider_rango(etiqueta, param, ayuda):
+    minimo, maximo, paso = RANGOS_SLIDERS[param]
+    return st.slider(etiqueta, min_value=minimo, max_value=maximo, step=paso, help=ayuda, key=param)
+
 
 # Controles en columnas
 col_ctrl1, col_ctrl2, col_ctrl3 = st.columns(3, gap="medium")
 
 with col_ctrl1:
-    tasa_participacion = st.slider(
-        "📚 Participación Escolar (%)",
-        min_value=10, max_value=100, value=50, step=5,
-        help=f"% de alumnos del colegio mayor ({COLEGIO_MAYOR_ALUMNOS}) que asisten simultáneamente"
-    ) / 100
+    tasa_part_pct = slider_rango(
+        "📚 Participación Escolar (%)", "tasa_part",
+        f"% de los alumnos de referencia ({alumnos_referencia}) que asisten simultáneamente"
+    )
+    tasa_participacion = tasa_part_pct / 100
     
-    ratio_m2_persona = st.slider(
-        "📐 m² por Persona",
-        min_value=0.8, max_value=1.5, value=1.0, step=0.1,
-        help="Metros cuadrados por butaca (incluye circulación)"
+    ratio_m2_persona = slider_rango(
+        "📐 m² por Persona", "ratio_m2",
+        "Metros cuadrados por butaca (incluye circulación)"
     )
 
 with col_ctrl2:
-    horizonte_anos = st.slider(
-        "📅 Horizonte de Proyección (años)",
-        min_value=5, max_value=20, value=12, step=1,
-        help="Años hacia el futuro para calcular población proyectada"
+    horizonte_anos = slider_rango(
+        "📅 Horizonte de Proyección (años)", "horizonte",
+        "Años hacia el futuro para calcular población proyectada"
     )
     
-    factor_multi = st.slider(
-        "🔄 Factor Multifuncionalidad (%)",
-        min_value=0, max_value=50, value=15, step=5,
-        help="Incremento en demanda por usos múltiples del espacio"
-    ) / 100
+    factor_multi_pct = slider_rango(
+        "🔄 Factor Multifuncionalidad (%)", "factor_multi",
+        "Incremento en demanda por usos múltiples del espacio"
+    )
 
 with col_ctrl3:
-    ratio_asistencia = st.slider(
-        "👥 Ratio Asistencia Poblacional (%)",
-        min_value=0.5, max_value=5.0, value=1.0, step=0.5,
-        help="% de la población que asiste a un evento típico"
-    ) / 100
+    ratio_asistencia_pct = slider_rango(
+        "👥 Ratio Asistencia Poblacional (%)", "ratio_asistencia",
+        "% de la población que asiste a un evento típico"
+    )
     
-    aforo_propuesto = st.slider(
-        "🎯 Aforo Propuesto (butacas)",
-        min_value=100, max_value=800, value=450, step=10,
-        help="Propuesta inicial del área usuaria para comparar"
+    aforo_propuesto = slider_rango(
+        "🎯 Aforo Propuesto (butacas)", "aforo_propuesto",
+        "Propuesta inicial del área usuaria para comparar"
     )
 
-# Calcular dimensionamiento
-resultado = calcular_dimensionamiento(
-    mayor_alumnos=COLEGIO_MAYOR_ALUMNOS,
-    tasa_part=tasa_participacion,
-    ratio_m2=ratio_m2_persona,
-    horizonte=horizonte_anos,
-    factor_multi=factor_multi,
-    ratio_asistencia=ratio_asistencia,
-    aforo_propuesto=aforo_propuesto
+metodo_poblacion = st.selectbox(
+    "📈 Método de proyección poblacional",
+    LISTA_METODOS,
+    key="metodo",
+    help="Métodos del motor de proyección poblacional (resultado_motor.json)",
 )
 
-# Visualización
-col_graf, col_res = st.columns([6, 4], gap="medium")
+guardar_estado_url()
+st.caption("🔗 El escenario completo queda en la URL: copia el enlace para compartirlo.")
+
+escenario = {
+    "tasa_part": tasa_part_pct,
+    "ratio_m2": round(ratio_m2_persona, 6),
+    "horizonte": horizonte_anos,
+    "factor_multi": factor_multi_pct,
+    "ratio_asistencia": round(ratio_asistencia_pct, 6),
+    "aforo_propuesto": aforo_propuesto,
+}
+
+
+def clave_escenario(esc, metodo):
+    return ("dimensionamiento", VERSION_REGLAS, tuple(sorted(esc.items())), metodo, alumnos_referencia)
+
+
+# Calcular dimensionamiento (consulta al cache de precalculo)
+resultado = consultar(
+    clave_escenario(escenario, metodo_poblacion),
+    dimensionar_persistente, escenario, metodo_poblacion, alumnos_referencia, REGLAS_ALERTAS,
+    VERSION_REGLAS, etiqueta="dimensionamiento",
+)
+
+# Precalcular posiciones vecinas de los sliders y los otros metodos de poblacion
+for _esc in vecinos(escenario, RANGOS_SLIDERS):
+    precalculador.programar(
+        clave_escenario(_esc, metodo_poblacion),
+        dimensionar_persistente, _esc, metodo_poblacion, alumnos_referencia, REGLAS_ALERTAS, VERSION_REGLAS,
+    )
+for _metodo in METODOS:
+    precalculador.programar(
+        clave_escenario(escenario, _metodo),
+        dimensionar_persistente, escenario, _metodo, alumnos_referencia, REGLAS_ALERTAS, VERSION_REGLAS,
+    )
+
+_estado = precalculador.estado()
+if _estado["pendientes"]:
+    st.caption(f"⏳ Precalculando en segundo plano: {_estado['pendientes']} escenarios pendientes")
+
+
+def construir_fig_dim(resultado):
+    """Barras de los tres enfoques, equilibrio y propuesta, con el rango recomendado."""
+    import plotly.graph_objects as go
 
-with col_graf:
     enf = resultado["enfoques"]
     colores_enf = ["#42a5f5", "#66bb6a", "#ffa726"]
     
@@ -826,8 +1013,56 @@ with col_graf:
         margin=dict(t=80, b=40),
         font=dict(family="Inter", size=11),
     )
+    return fig_dim
+
+
+# Visualización
+col_graf, col_res = st.columns([6, 4], gap="medium")
+
+enf = resultado["enfoques"]
+
+with col_graf:
+    fig_dim = memo.obtener(
+        ("fig_dim",) + clave_escenario(escenario, metodo_poblacion)[1:],
+        construir_fig_dim, resultado,
+    )
     st.plotly_chart(fig_dim, key="fig_dimensionamiento")
 
+    _memo = memo.estadisticas()
+    st.caption(
+        f"🧠 Memo de escenarios: {_memo['tasa_acierto']:.0%} de aciertos "
+        f"({_memo['aciertos']}/{_memo['aciertos'] + _memo['fallos']}) | "
+        f"{_memo['entradas']} escenarios en memoria | {_memo['bytes'] / 1024:,.0f} KB"
+    )
+    if cache_disco is not None:
+        _disco = cache_disco.estadisticas()
+        st.caption(
+            f"💾 Cache en disco compartido: {_disco['entradas']} entradas | "
+            f"{_disco['bytes'] / 1e6:.1f} de {_disco['max_bytes'] / 1e6:.0f} MB"
+        )
+
+    with st.expander("👧 Población en edad escolar (6-18 años) por cohortes"):
+        import plotly.graph_objects as go
+
+        _escolar = demanda_escolar_anual(metodo_poblacion)
+        fig_escolar = go.Figure(go.Scatter(
+            x=[a for a, _ in _escolar], y=[v for _, v in _escolar],
+            mode="lines+markers", line=dict(color="#1976d2", width=2),
+            hovertemplate="%{x}: %{y:,.0f} hab. de 6-18 años<extra></extra>",
+        ))
+        fig_escolar.add_vline(x=resultado["anio_horizonte"], line_dash="dash", line_color="#d32f2f")
+        fig_escolar.update_layout(
+            height=260, margin=dict(l=40, r=20, t=20, b=30),
+            plot_bgcolor="white", yaxis_title="Habitantes", xaxis_title="Año",
+        )
+        st.plotly_chart(fig_escolar, key="fig_escolar")
+        st.caption(
+            "Proyección por edades simples (supervivencia y fecundidad de referencia, "
+            "migración por grupo de edad calibrada a los totales 0-14/15-64/65+ del método en "
+            f"{METODOS[metodo_poblacion]['anio_fin']}). El enfoque educativo escala la "
+            "matrícula del colegio mayor con el crecimiento de esta población al año horizonte."
+        )
+
 with col_res:
     st.markdown(f"""
     <div style="background: #f8f9fa; padding: 16px; border-radius: 8px; 
@@ -849,12 +1084,16 @@ with col_res:
                 <td style="text-align: right;">{tasa_participacion:.0%}</td>
             </tr>
             <tr>
-                <td style="padding: 3px 0;"><b>Colegio referencia:</b></td>
-                <td style="text-align: right;">{COLEGIO_MAYOR_NOMBRE}</td>
+                <td style="padding: 3px 0;"><b>Fuente de alumnos:</b></td>
+                <td style="text-align: right;">{fuente_alumnos}</td>
+            </tr>
+            <tr>
+                <td style="padding: 3px 0;"><b>Alumnos de referencia:</b></td>
+                <td style="text-align: right;">{alumnos_referencia}</td>
             </tr>
             <tr>
-                <td style="padding: 3px 0;"><b>Alumnos colegio mayor:</b></td>
-                <td style="text-align: right;">{COLEGIO_MAYOR_ALUMNOS}</td>
+                <td style="padding: 3px 0;"><b>Alumnos proyectados (cohortes):</b></td>
+                <td style="text-align: right;">{enf[0]['alumnos_proyectados']}</td>
             </tr>
         </table>
     </div>
@@ -912,18 +1151,80 @@ with col_res:
     
     if resultado.get("alertas"):
         for alerta in resultado["alertas"]:
-            icono = "⚠️" if "ALERTA" in alerta else "ℹ️"
-            color = "#ff6f00" if "ALERTA" in alerta else "#1976d2"
+            icono, color = ESTILOS_SEVERIDAD[alerta["severidad"]]
             st.markdown(f"""
                 <div style="background: #fff3e0; padding: 10px; border-radius: 6px; 
                             border-left: 3px solid {color}; margin-top: 8px;">
                     <p style="font-size: 10px; color: {color}; margin: 0;">
-                        {icono} {alerta}
+                        {icono} {alerta["severidad"].upper()}: {alerta["mensaje"]}
                     </p>
                 </div>
             """, unsafe_allow_html=True)
     
     st.markdown("</div>", unsafe_allow_html=True)
+
+
+# =============================================
+# DIMENSIONAMIENTO POR LOTE (OTROS DISTRITOS)
+# =============================================
+@st.cache_data(max_entries=16)
+def calcular_lote(contenido, escenario_items, filtro=(), huella_reglas=None):
+    """Tabla nacional para un CSV de distritos y el escenario de los sliders, con costo de referencia."""
+    import io
+
+    import pandas as pd
+
+    distritos = pd.read_csv(io.BytesIO(contenido))
+    tabla = dimensionar_lote(distritos, dict(escenario_items), marcar=False)
+    # Costo de referencia de cada distrito: una sola evaluacion del modelo de costos, con la
+    # poblacion del anio base (la misma base que `poblacion_ref` de los pares y que Marcona)
+    costos = predecir_costos(
+        calcular_modelo_costos(DATASET_ACTIVO, filtro), distritos["pob_base"].to_numpy(dtype=float), "DISTRITAL",
+    )
+    tabla = tabla.assign(
+        costo_referencial=costos["costo"].round(-3),
+        costo_bajo=costos["bajo"].round(-3),
+        costo_alto=costos["alto"].round(-3),
+    )
+    # Se marca una sola vez, con las columnas de costo (reglas de costo incluidas)
+    return marcar_tabla(tabla, load_reglas(huella_reglas)[0])
+
+
+@st.cache_data(max_entries=16)
+def mapa_lote_html(contenido, escenario_items, filtro=(), huella_reglas=None):
+    return mapa_lote(calcular_lote(contenido, escenario_items, filtro, huella_reglas)).get_root().render()
+
+
+with st.expander("🗺️ Dimensionamiento por lote: otros distritos"):
+    st.caption(
+        "CSV con `distrito, pob_base, tasa_crecimiento, mayor_alumnos` (opcionales: `latitud, "
+        "longitud, aforo_propuesto, anio_base, pob_0_14, pob_15_64, pob_65, monto_viable`; con "
+        "`pob_0_14_final, pob_15_64_final, pob_65_final, anio_final` la migración se calibra por grupo "
+        "de edad). Se aplican los "
+        "parámetros de los sliders a todos los distritos en una sola pasada."
+    )
+    archivo_lote = st.file_uploader("Tabla de distritos", type="csv", key="archivo_lote")
+    if archivo_lote is not None:
+        contenido_lote = archivo_lote.getvalue()
+        escenario_lote = tuple(sorted(escenario.items()))
+        try:
+            tabla_lote = calcular_lote(contenido_lote, escenario_lote, filtro_costos, VERSION_REGLAS)
+        except (ValueError, KeyError) as exc:
+            st.error(f"No se pudo procesar la tabla: {exc}")
+        else:
+            resumen_lote = resumen_nacional(tabla_lote)
+            c1, c2, c3 = st.columns(3)
+            c1.metric("Distritos", f"{resumen_lote['distritos']:,}")
+            c2.metric("Butacas (equilibrio)", f"{resumen_lote['butacas_equilibrio']:,}")
+            c3.metric("Distritos con alerta", f"{resumen_lote['con_alerta']:,}")
+            st.dataframe(tabla_lote, hide_index=True, height=300)
+            st.download_button(
+                "⬇️ Descargar tabla nacional", tabla_lote.to_csv(index=False).encode("utf-8"),
+                file_name="dimensionamiento_nacional.csv", mime="text/csv",
+            )
+            if {"latitud", "longitud"} <= set(tabla_lote.columns):
+                components.html(mapa_lote_html(contenido_lote, escenario_lote, filtro_costos, VERSION_REGLAS), height=450)
+
 # PIE DE PÁGINA
 st.markdown("""
 <div style="text-align: center; color: #999; font-size: 11px; 
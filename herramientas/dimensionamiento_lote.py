@@ -0,0 +1,69 @@
+"""
+Dimensionamiento por lote -- Todos los distritos desde la linea de comandos
+===========================================================================
+Aplica el modelo de dimensionamiento a una tabla de distritos (ver
+`modelo/lote.py` para las columnas) y guarda la tabla nacional en CSV.
+Con varios valores por parametro se evalua la grilla completa
+escenarios x distritos, opcionalmente repartida en procesos.
+
+Ejecucion:
+    python herramientas/dimensionamiento_lote.py distritos.csv --salida nacional.csv
+    python herramientas/dimensionamiento_lote.py distritos.csv --salida grilla.csv \\
+        --tasa-part 30 50 70 --horizonte 10 20 --procesos 4
+"""
+
+import argparse
+import itertools
+import sys
+import time
+from pathlib import Path
+
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from modelo.lote import dimensionar_grilla, dimensionar_lote, resumen_nacional  # noqa: E402
+
+PARAMETROS = {
+    "tasa_part": 50,
+    "ratio_m2": 1.0,
+    "horizonte": 12,
+    "factor_multi": 15,
+    "ratio_asistencia": 1.0,
+    "aforo_propuesto": 450,
+}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Dimensionamiento por lote de distritos")
+    parser.add_argument("distritos", help="CSV con distrito, pob_base, tasa_crecimiento, mayor_alumnos")
+    parser.add_argument("--salida", required=True, help="CSV de resultados")
+    for param, default in PARAMETROS.items():
+        parser.add_argument(f"--{param.replace('_', '-')}", type=type(default), nargs="+", default=[default],
+                            help=f"Valores en unidades de los sliders (por defecto {default})")
+    parser.add_argument("--procesos", type=int, default=1, help="Procesos para la grilla de escenarios")
+    args = parser.parse_args()
+
+    distritos = pd.read_csv(args.distritos)
+    valores = {param: getattr(args, param) for param in PARAMETROS}
+    escenarios = [dict(zip(valores, combinacion)) for combinacion in itertools.product(*valores.values())]
+
+    inicio = time.perf_counter()
+    if len(escenarios) == 1:
+        resultado = dimensionar_lote(distritos, escenarios[0])
+    else:
+        resultado = dimensionar_grilla(distritos, escenarios, procesos=args.procesos)
+        parametros = pd.DataFrame(escenarios).rename_axis("escenario").reset_index()
+        parametros = parametros.drop(columns=[c for c in parametros.columns if c in resultado.columns and c != "escenario"])
+        resultado = resultado.merge(parametros, on="escenario")
+    duracion = time.perf_counter() - inicio
+
+    resultado.to_csv(args.salida, index=False)
+    resumen = resumen_nacional(resultado)
+    print(f"{len(escenarios)} escenarios x {len(distritos)} distritos = {len(resultado)} filas "
+          f"en {duracion:.2f} s -> {args.salida}")
+    print(f"Butacas (equilibrio): {resumen['butacas_equilibrio']:,} | filas con alerta: {resumen['con_alerta']:,}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,164 @@
+"""
+Perfil de arranque en frio -- Imports y primer elemento en pantalla
+===================================================================
+Ejecuta cada pagina en un proceso Python nuevo (cache de modulos vacio, como
+un contenedor recien iniciado) con `-X importtime` y reporta:
+
+- tiempo de import por dependencia (acumulado por paquete de primer nivel),
+- tiempo hasta el primer elemento enviado al navegador (primer "paint"),
+- tiempo total del primer rerun,
+
+y los compara con el presupuesto documentado en el README. Termina con
+codigo 1 si alguna pagina lo excede, para poder usarlo en CI.
+
+Ejecucion:
+    python herramientas/perfil_arranque.py
+    python herramientas/perfil_arranque.py --repeticiones 3 --json arranque.json
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+from collections import defaultdict
+from pathlib import Path
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+PAGINAS = ["app.py", "pages/02_Presentacion.py"]
+
+# Presupuesto de arranque en frio (segundos, sin cache en disco)
+PRESUPUESTO = {
+    "app.py": {"primer_elemento": 2.5, "total": 10.0},
+    "pages/02_Presentacion.py": {"primer_elemento": 2.0, "total": 3.0},
+}
+# Dependencias que una pagina no debe importar
+PROHIBIDOS = {
+    "pages/02_Presentacion.py": ["folium", "streamlit_folium", "branca"],
+}
+DEPENDENCIAS = ["streamlit", "numpy", "pandas", "pyarrow", "plotly", "folium", "streamlit_folium",
+                "branca", "jinja2", "modelo"]
+
+
+# =============================================
+# PROCESO HIJO: una pagina en frio
+# =============================================
+def ejecutar_pagina(pagina, inicio):
+    """Corre la pagina con AppTest y mide el primer elemento y el total (desde `inicio`)."""
+    from streamlit.runtime.scriptrunner_utils.script_run_context import ScriptRunContext
+    from streamlit.testing.v1 import AppTest
+
+    marcas = {}
+    enqueue_original = ScriptRunContext.enqueue
+
+    def enqueue(self, msg):
+        if "primer_elemento" not in marcas and msg.WhichOneof("type") == "delta":
+            marcas["primer_elemento"] = time.time() - inicio
+        return enqueue_original(self, msg)
+
+    ScriptRunContext.enqueue = enqueue
+    t_streamlit = time.time() - inicio
+    at = AppTest.from_file(str(BASE_DIR / pagina), default_timeout=300).run()
+    return {
+        "streamlit_listo": t_streamlit,
+        "primer_elemento": marcas.get("primer_elemento"),
+        "total": time.time() - inicio,
+        "excepciones": [str(e.value) for e in at.exception][:3],
+        "modulos": sorted({m.split(".")[0] for m in sys.modules}),
+    }
+
+
+# =============================================
+# PROCESO PADRE
+# =============================================
+def imports_por_paquete(stderr):
+    """Suma el tiempo acumulado (s) de los imports de primer nivel por paquete raiz."""
+    tiempos = defaultdict(float)
+    for linea in stderr.splitlines():
+        if not linea.startswith("import time:") or "|" not in linea:
+            continue
+        _, acumulado, nombre = linea[len("import time:"):].split("|")
+        if nombre.startswith("  ") or not acumulado.strip().isdigit():
+            continue        # Sub-import: ya cuenta en el acumulado de su padre
+        tiempos[nombre.strip().split(".")[0]] += int(acumulado) / 1e6
+    return tiempos
+
+
+def perfilar(pagina):
+    inicio = time.time()
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", __file__, "--hijo", pagina, "--inicio", repr(inicio)],
+        cwd=BASE_DIR, capture_output=True, text=True,
+        env={**os.environ, "PYTHONPATH": str(BASE_DIR)},
+    )
+    if proc.returncode != 0:
+        raise RuntimeError(f"{pagina}: {proc.stderr[-2000:]}")
+    resultado = json.loads(proc.stdout.strip().splitlines()[-1])
+    resultado["imports"] = dict(imports_por_paquete(proc.stderr))
+    return resultado
+
+
+def resumir(pagina, corridas):
+    mediana = lambda clave: statistics.median(c[clave] for c in corridas if c[clave] is not None)
+    imports = {
+        dep: statistics.median(c["imports"].get(dep, 0.0) for c in corridas)
+        for dep in DEPENDENCIAS
+    }
+    resumen = {
+        "pagina": pagina,
+        "primer_elemento": mediana("primer_elemento"),
+        "total": mediana("total"),
+        "imports": {dep: t for dep, t in imports.items() if t >= 0.005},
+        "excepciones": corridas[-1]["excepciones"],
+    }
+    presupuesto = PRESUPUESTO.get(pagina, {})
+    excesos = [
+        f"{clave} {resumen[clave]:.2f}s > {limite:.2f}s"
+        for clave, limite in presupuesto.items() if resumen[clave] > limite
+    ]
+    excesos += [
+        f"importa {dep}" for dep in PROHIBIDOS.get(pagina, []) if dep in corridas[-1]["modulos"]
+    ]
+    resumen["excesos"] = excesos
+    return resumen
+
+
+def imprimir(resumen):
+    print(f"\n{resumen['pagina']}")
+    print(f"  primer elemento: {resumen['primer_elemento']:.2f} s | primer rerun: {resumen['total']:.2f} s")
+    for dep, t in sorted(resumen["imports"].items(), key=lambda x: -x[1]):
+        print(f"  import {dep:<18}{t:6.2f} s")
+    if resumen["excepciones"]:
+        print(f"  excepciones: {resumen['excepciones']}")
+    print("  presupuesto: " + ("OK" if not resumen["excesos"] else "EXCEDIDO -> " + "; ".join(resumen["excesos"])))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Perfil de arranque en frio por pagina")
+    parser.add_argument("--paginas", nargs="+", default=PAGINAS)
+    parser.add_argument("--repeticiones", type=int, default=1, help="Procesos en frio por pagina")
+    parser.add_argument("--json", help="Guardar los resultados en este archivo")
+    parser.add_argument("--hijo", help=argparse.SUPPRESS)
+    parser.add_argument("--inicio", type=float, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.hijo:
+        print(json.dumps(ejecutar_pagina(args.hijo, args.inicio)))
+        return
+
+    resumenes = []
+    for pagina in args.paginas:
+        corridas = [perfilar(pagina) for _ in range(args.repeticiones)]
+        resumenes.append(resumir(pagina, corridas))
+        imprimir(resumenes[-1])
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(resumenes, f, indent=2, ensure_ascii=False)
+    sys.exit(1 if any(r["excesos"] for r in resumenes) else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,340 @@
+"""
+Prueba de carga -- Sesiones concurrentes sobre un servidor Streamlit
+====================================================================
+Levanta un solo `streamlit run app.py` y conecta N clientes por websocket
+(`/_stcore/stream`, el mismo protocolo protobuf que usa el navegador). Cada
+cliente es una sesion del servidor: carga el dashboard y la presentacion y
+repite acciones de un usuario (mover sliders, cambiar el monto o la
+poblacion, cambiar de metodo, navegar filigramas y cambiar de pagina). Todas
+las sesiones comparten el proceso, los caches y el GIL del servidor, como en
+un despliegue real.
+
+Para cada N se arranca un servidor nuevo y una sesion de calentamiento carga
+los datos y caches compartidos antes de medir. Se reporta:
+    - latencia de rerun (envio del BackMsg -> `script_finished`) p50/p95/max
+    - memoria que agrega cada sesion al servidor (RSS del proceso)
+    - CPU del proceso del servidor (nucleos usados y % de la maquina)
+
+Una sesion cuyo rerun muestra una excepcion, deja la pagina sin widgets o
+pierde la conexion se cuenta como fallida y sus latencias no entran en las
+estadisticas. Los clientes corren en el proceso de esta herramienta (asyncio);
+en una maquina de un nucleo compiten por CPU con el servidor.
+
+Ejecucion:
+    python herramientas/prueba_carga.py --sesiones 1 5 10 20 --acciones 15
+    python herramientas/prueba_carga.py --sesiones 10 --json resultados_carga.json
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import statistics
+import subprocess
+import sys
+import time
+import urllib.request
+from pathlib import Path
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+APP_PATH = str(BASE_DIR / "app.py")
+
+TIMEOUT_RERUN = 120
+TIMEOUT_ARRANQUE = 120
+PAGINA_DASHBOARD = "dashboard"
+PAGINA_PRESENTACION = "presentacion"
+WIDGETS = ("slider", "number_input", "selectbox", "button")
+
+
+class SesionFallida(Exception):
+    """El rerun no dejo la pagina en un estado utilizable."""
+
+
+# =============================================
+# SERVIDOR
+# =============================================
+def iniciar_servidor(puerto):
+    proceso = subprocess.Popen(
+        [sys.executable, "-m", "streamlit", "run", APP_PATH,
+         "--server.headless", "true", "--server.port", str(puerto),
+         "--server.fileWatcherType", "none", "--browser.gatherUsageStats", "false"],
+        cwd=BASE_DIR, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE,
+    )
+    limite = time.monotonic() + TIMEOUT_ARRANQUE
+    while time.monotonic() < limite:
+        if proceso.poll() is not None:
+            raise RuntimeError(f"El servidor termino al arrancar: {proceso.stderr.read().decode()[-2000:]}")
+        try:
+            with urllib.request.urlopen(f"http://127.0.0.1:{puerto}/_stcore/health", timeout=2) as r:
+                if r.status == 200:
+                    return proceso
+        except OSError:
+            pass
+        time.sleep(0.5)
+    proceso.kill()
+    raise RuntimeError("El servidor no respondio a tiempo")
+
+
+def detener_servidor(proceso):
+    proceso.terminate()
+    try:
+        proceso.wait(10)
+    except subprocess.TimeoutExpired:
+        proceso.kill()
+
+
+def rss_mb(pid):
+    """Memoria residente del proceso (Linux)."""
+    with open(f"/proc/{pid}/statm") as f:
+        return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 1e6
+
+
+def cpu_s(pid):
+    """Tiempo de CPU (usuario + sistema) del proceso (Linux)."""
+    with open(f"/proc/{pid}/stat") as f:
+        campos = f.read().rsplit(")", 1)[1].split()
+    return (int(campos[11]) + int(campos[12])) / os.sysconf("SC_CLK_TCK")
+
+
+# =============================================
+# CLIENTE (UNA SESION DEL SERVIDOR)
+# =============================================
+class Sesion:
+    """Cliente websocket que reproduce lo que envia el navegador en cada rerun."""
+
+    def __init__(self, puerto):
+        self.url = f"ws://127.0.0.1:{puerto}/_stcore/stream"
+        self.ws = None
+        self.paginas = {}           # nombre -> page_script_hash
+        self.estados = {}           # pagina -> {id: WidgetState} (valores elegidos por el usuario)
+        self.widgets = {}           # pagina -> [(tipo, proto)] del ultimo rerun
+
+    async def conectar(self):
+        import websockets
+
+        self.ws = await websockets.connect(self.url, subprotocols=["streamlit"], max_size=None)
+
+    async def cerrar(self):
+        if self.ws is not None:
+            await self.ws.close()
+
+    async def rerun(self, pagina=PAGINA_DASHBOARD, disparo=None):
+        """Rerun cronometrado de `pagina`; `disparo` es el WidgetState de un boton pulsado."""
+        from streamlit.proto.BackMsg_pb2 import BackMsg
+        from streamlit.proto.ForwardMsg_pb2 import ForwardMsg
+
+        mensaje = BackMsg()
+        mensaje.rerun_script.query_string = ""
+        if pagina in self.paginas:
+            mensaje.rerun_script.page_script_hash = self.paginas[pagina]
+        estados = list(self.estados.get(pagina, {}).values()) + ([disparo] if disparo else [])
+        mensaje.rerun_script.widget_states.widgets.extend(estados)
+
+        inicio = time.perf_counter()
+        await self.ws.send(mensaje.SerializeToString())
+        widgets, excepcion = [], None
+        while True:
+            respuesta = ForwardMsg()
+            respuesta.ParseFromString(await asyncio.wait_for(self.ws.recv(), TIMEOUT_RERUN))
+            tipo = respuesta.WhichOneof("type")
+            if tipo == "navigation":
+                for app_page in respuesta.navigation.app_pages:
+                    nombre = PAGINA_PRESENTACION if "Presentacion" in app_page.url_pathname else PAGINA_DASHBOARD
+                    self.paginas.setdefault(nombre, app_page.page_script_hash)
+            elif tipo == "delta" and respuesta.delta.WhichOneof("type") == "new_element":
+                elemento = respuesta.delta.new_element
+                clase = elemento.WhichOneof("type")
+                if clase == "exception":
+                    excepcion = f"{elemento.exception.type}: {elemento.exception.message}"
+                elif clase in WIDGETS:
+                    widgets.append((clase, getattr(elemento, clase)))
+            elif tipo == "script_finished":
+                break
+        latencia = time.perf_counter() - inicio
+
+        if excepcion:
+            raise SesionFallida(f"{pagina}: {excepcion}")
+        clave = "slider" if pagina == PAGINA_DASHBOARD else "button"
+        if not any(clase == clave for clase, _ in widgets):
+            raise SesionFallida(f"{pagina}: la pagina quedo sin widgets")
+        self.widgets[pagina] = widgets
+        return latencia
+
+    def fijar(self, pagina, widget, campo, valor):
+        from streamlit.proto.WidgetStates_pb2 import WidgetState
+
+        estado = WidgetState(id=widget.id)
+        if campo == "double_array_value":
+            estado.double_array_value.data.append(valor)
+        else:
+            setattr(estado, campo, valor)
+        self.estados.setdefault(pagina, {})[widget.id] = estado
+
+
+def valor_aleatorio(widget, rng):
+    pasos = int(round((widget.max - widget.min) / widget.step))
+    return round(widget.min + rng.randint(0, pasos) * widget.step, 6)
+
+
+def accion_dashboard(sesion, rng):
+    """Elige un widget del dashboard y le asigna un valor valido al azar."""
+    widgets = sesion.widgets[PAGINA_DASHBOARD]
+    opcion = rng.random()
+    if opcion < 0.6:
+        _, slider = rng.choice([w for w in widgets if w[0] == "slider"])
+        sesion.fijar(PAGINA_DASHBOARD, slider, "double_array_value", valor_aleatorio(slider, rng))
+    elif opcion < 0.9:
+        _, entrada = rng.choice([w for w in widgets if w[0] == "number_input"])
+        valor = valor_aleatorio(entrada, rng)
+        if entrada.data_type == entrada.INT:
+            sesion.fijar(PAGINA_DASHBOARD, entrada, "int_value", int(valor))
+        else:
+            sesion.fijar(PAGINA_DASHBOARD, entrada, "double_value", valor)
+    else:
+        _, selector = next(w for w in widgets if w[0] == "selectbox")
+        sesion.fijar(PAGINA_DASHBOARD, selector, "string_value", rng.choice(list(selector.options)))
+
+
+def boton_presentacion(sesion, rng):
+    """WidgetState de un boton habilitado de la presentacion, pulsado."""
+    from streamlit.proto.WidgetStates_pb2 import WidgetState
+
+    _, boton = rng.choice([w for w in sesion.widgets[PAGINA_PRESENTACION] if w[0] == "button" and not w[1].disabled])
+    return WidgetState(id=boton.id, trigger_value=True)
+
+
+async def usuario(puerto, idx, acciones, semilla, inicio):
+    """Una sesion: carga ambas paginas y luego ejecuta acciones al azar."""
+    rng = random.Random(semilla + idx)
+    sesion = Sesion(puerto)
+    latencias = []
+    try:
+        await sesion.conectar()
+        await inicio.wait()
+        latencias.append(await sesion.rerun(PAGINA_DASHBOARD))
+        latencias.append(await sesion.rerun(PAGINA_PRESENTACION))
+        pagina = PAGINA_PRESENTACION
+        for _ in range(acciones):
+            if rng.random() < 0.7:
+                pagina = PAGINA_DASHBOARD
+                accion_dashboard(sesion, rng)
+                latencias.append(await sesion.rerun(pagina))
+            else:
+                # Desde el dashboard la accion es cambiar de pagina; en la presentacion, pulsar un boton
+                disparo = boton_presentacion(sesion, rng) if pagina == PAGINA_PRESENTACION else None
+                pagina = PAGINA_PRESENTACION
+                latencias.append(await sesion.rerun(pagina, disparo))
+        return {"latencias": latencias, "error": None}
+    except Exception as exc:
+        return {"latencias": [], "error": f"{type(exc).__name__}: {exc}"}
+    finally:
+        await sesion.cerrar()
+
+
+# =============================================
+# EJECUCION POR NIVEL DE CONCURRENCIA
+# =============================================
+def percentil(valores, q):
+    ordenados = sorted(valores)
+    idx = min(len(ordenados) - 1, max(0, int(round(q / 100 * (len(ordenados) - 1)))))
+    return ordenados[idx]
+
+
+async def medir(puerto, pid, n_sesiones, acciones, semilla):
+    # Calentamiento: datos y caches compartidos del servidor, fuera de la medicion
+    calentamiento = await usuario(puerto, -1, 0, semilla, _evento_listo())
+    if calentamiento["error"]:
+        raise RuntimeError(f"Calentamiento fallido: {calentamiento['error']}")
+    mem_base = rss_mb(pid)
+
+    inicio = asyncio.Event()
+    tareas = [asyncio.create_task(usuario(puerto, i, acciones, semilla, inicio)) for i in range(n_sesiones)]
+    await asyncio.sleep(0.5)        # Conexiones abiertas antes de empezar
+    cpu_inicio, inicio_pared = cpu_s(pid), time.perf_counter()
+    inicio.set()
+    resultados = await asyncio.gather(*tareas)
+    pared = time.perf_counter() - inicio_pared
+    cpu = cpu_s(pid) - cpu_inicio
+    # Las sesiones cerradas conservan su estado en el servidor hasta que expiran
+    mem_total = rss_mb(pid) - mem_base
+    return resultados, pared, cpu, mem_total
+
+
+def _evento_listo():
+    evento = asyncio.Event()
+    evento.set()
+    return evento
+
+
+def ejecutar_nivel(n_sesiones, acciones, semilla, puerto):
+    servidor = iniciar_servidor(puerto)
+    try:
+        resultados, pared, cpu, mem_total = asyncio.run(medir(puerto, servidor.pid, n_sesiones, acciones, semilla))
+    finally:
+        detener_servidor(servidor)
+
+    completas = [r for r in resultados if r["error"] is None]
+    latencias = [l for r in completas for l in r["latencias"]]
+    return {
+        "sesiones": n_sesiones,
+        "fallidas": n_sesiones - len(completas),
+        "reruns": len(latencias),
+        "p50_ms": percentil(latencias, 50) * 1000 if latencias else None,
+        "p95_ms": percentil(latencias, 95) * 1000 if latencias else None,
+        "max_ms": max(latencias) * 1000 if latencias else None,
+        "media_ms": statistics.fmean(latencias) * 1000 if latencias else None,
+        "reruns_por_s": len(latencias) / pared if pared > 0 else None,
+        "mem_por_sesion_mb": mem_total / n_sesiones,
+        "nucleos_usados": cpu / pared if pared > 0 else None,
+        "saturacion_cpu_pct": cpu / pared / (os.cpu_count() or 1) * 100 if pared > 0 else None,
+        "errores": [r["error"] for r in resultados if r["error"]][:10],
+    }
+
+
+def _fmt(valor, formato):
+    return "-" if valor is None else format(valor, formato)
+
+
+def imprimir_tabla(resultados):
+    print(f"\n{'N':>4} {'fallas':>6} {'reruns':>7} {'p50 ms':>8} {'p95 ms':>8} {'max ms':>8} "
+          f"{'rerun/s':>8} {'MB/ses':>7} {'nucleos':>8} {'CPU %':>6}")
+    for r in resultados:
+        print(f"{r['sesiones']:>4} {r['fallidas']:>6} {r['reruns']:>7} {_fmt(r['p50_ms'], '>8.0f')} "
+              f"{_fmt(r['p95_ms'], '>8.0f')} {_fmt(r['max_ms'], '>8.0f')} {_fmt(r['reruns_por_s'], '>8.1f')} "
+              f"{_fmt(r['mem_por_sesion_mb'], '>7.1f')} {_fmt(r['nucleos_usados'], '>8.2f')} "
+              f"{_fmt(r['saturacion_cpu_pct'], '>6.1f')}")
+    print(f"\nNucleos disponibles: {os.cpu_count()}. Un solo servidor atiende todas las sesiones; "
+          f"'nucleos' y 'CPU %' son del proceso del servidor y 'MB/ses' es la memoria que agrega "
+          f"cada sesion a ese proceso.")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Prueba de carga con sesiones concurrentes en un servidor")
+    parser.add_argument("--sesiones", type=int, nargs="+", default=[1, 5, 10, 20],
+                        help="Niveles de concurrencia a probar")
+    parser.add_argument("--acciones", type=int, default=10, help="Acciones por sesion")
+    parser.add_argument("--semilla", type=int, default=2026)
+    parser.add_argument("--puerto", type=int, default=8599, help="Puerto del servidor de prueba")
+    parser.add_argument("--json", help="Ruta para guardar los resultados")
+    args = parser.parse_args()
+    try:
+        import websockets  # noqa: F401
+    except ImportError:
+        parser.error("Se necesita el paquete `websockets` (pip install websockets)")
+
+    resultados = []
+    for n in args.sesiones:
+        print(f"Ejecutando {n} sesiones x {args.acciones} acciones...", flush=True)
+        resultados.append(ejecutar_nivel(n, args.acciones, args.semilla, args.puerto))
+        for error in resultados[-1]["errores"]:
+            print(f"  sesion fallida: {error}")
+
+    imprimir_tabla(resultados)
+    if args.json:
+        Path(args.json).write_text(json.dumps(resultados, indent=2), encoding="utf-8")
+        print(f"Resultados guardados en {args.json}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,6 @@
+"""
+Modelo del Centro Cultural Marcona
+==================================
+Calculos del dashboard (carga de datos, dimensionamiento y estadisticas
+de pares) separados de la capa Streamlit para poder reutilizarlos.
+"""
@@ -0,0 +1,184 @@
+"""
+Motor de reglas de alerta (dimensionamiento y costos)
+=====================================================
+Las reglas viven en `data/reglas_alertas.json`; cada una tiene:
+
+    id          nombre corto; en tablas da la columna `alerta_<id>`
+    severidad   "info", "advertencia" o "alerta"
+    condicion   {"variable", "operador", "umbral"}
+                o {"variable", "operador", "referencia", "factor"}
+                (variable OP factor * referencia); {"todas": [...]} = AND
+    mensaje     plantilla de str.format con variables del escenario por nombre
+                y formatos numericos, enteros o reales (se validan al cargar las
+                reglas; un formato entero redondea un valor real)
+
+Las condiciones se evaluan como expresiones booleanas de numpy sobre
+columnas completas, de modo que el mismo juego de reglas marca un escenario
+de los sliders, miles de simulaciones o la tabla nacional de distritos sin
+recorrer filas en Python. Las reglas cuyas variables no estan en los datos
+se omiten; una regla necesita las variables de su condicion y las de su mensaje.
+"""
+
+import hashlib
+import json
+import string
+from functools import reduce
+
+import numpy as np
+
+from modelo.datos import REGLAS_ALERTAS_PATH
+
+SEVERIDADES = ("info", "advertencia", "alerta")     # De menor a mayor
+OPERADORES = {
+    ">": np.greater,
+    ">=": np.greater_equal,
+    "<": np.less,
+    "<=": np.less_equal,
+    "==": np.equal,
+    "!=": np.not_equal,
+}
+
+
+def _variables(condicion):
+    if "todas" in condicion:
+        return {v for c in condicion["todas"] for v in _variables(c)}
+    return {condicion["variable"]} | ({condicion["referencia"]} if "referencia" in condicion else set())
+
+
+def _formato_valido(valor, formato):
+    try:
+        format(valor, formato)
+        return True
+    except ValueError:
+        return False
+
+
+class _FormatoMensaje(string.Formatter):
+    """str.format que acepta formatos enteros (`{aforo:d}`) con valores reales y al reves."""
+
+    def format_field(self, valor, formato):
+        try:
+            return super().format_field(valor, formato)
+        except ValueError:
+            if isinstance(valor, (bool, np.bool_)) or not isinstance(valor, (int, float, np.number)):
+                raise
+            otro = int(round(valor)) if isinstance(valor, (float, np.floating)) else float(valor)
+            return super().format_field(otro, formato)
+
+
+FORMATO_MENSAJE = _FormatoMensaje()
+
+
+def _campos_mensaje(regla):
+    """Variables de la plantilla del mensaje; error si str.format no podria resolverla."""
+    campos = set()
+    try:
+        partes = list(string.Formatter().parse(regla["mensaje"]))
+    except ValueError as e:
+        raise ValueError(f"Mensaje mal formado en {regla['id']}: {e}")
+    for _, campo, formato, conversion in partes:
+        if campo is None:
+            continue
+        if not campo.isidentifier():
+            raise ValueError(f"Campo invalido en el mensaje de {regla['id']}: {{{campo}}}")
+        if conversion not in (None, "r", "s", "a"):
+            raise ValueError(f"Conversion invalida en el mensaje de {regla['id']}: !{conversion}")
+        if not any(_formato_valido(cero, formato) for cero in (0, 0.0)):
+            raise ValueError(f"Formato invalido en el mensaje de {regla['id']}: {{{campo}:{formato}}}")
+        campos.add(campo)
+    return campos
+
+
+def variables_regla(regla):
+    """Variables que deben estar en los datos para evaluar la regla y armar su mensaje."""
+    return _variables(regla["condicion"]) | _campos_mensaje(regla)
+
+
+def validar_reglas(reglas):
+    """Revisa ids, severidades, operadores y plantillas; devuelve las reglas sin cambios."""
+    ids = set()
+    for regla in reglas:
+        faltantes = [c for c in ("id", "severidad", "condicion", "mensaje") if c not in regla]
+        if faltantes:
+            raise ValueError(f"Regla {regla.get('id', '?')} sin los campos: {', '.join(faltantes)}")
+        if regla["id"] in ids:
+            raise ValueError(f"Regla duplicada: {regla['id']}")
+        ids.add(regla["id"])
+        if regla["severidad"] not in SEVERIDADES:
+            raise ValueError(f"Severidad desconocida en {regla['id']}: {regla['severidad']}")
+        pendientes = [regla["condicion"]]
+        while pendientes:
+            condicion = pendientes.pop()
+            if "todas" in condicion:
+                pendientes.extend(condicion["todas"])
+            elif condicion.get("operador") not in OPERADORES:
+                raise ValueError(f"Operador desconocido en {regla['id']}: {condicion.get('operador')}")
+            elif "umbral" not in condicion and "referencia" not in condicion:
+                raise ValueError(f"La condicion de {regla['id']} necesita `umbral` o `referencia`")
+        _campos_mensaje(regla)
+    return reglas
+
+
+def leer_reglas(ruta=REGLAS_ALERTAS_PATH):
+    """(reglas validadas, huella) leidas de los mismos bytes del archivo."""
+    contenido = ruta.read_bytes()
+    return validar_reglas(json.loads(contenido)["reglas"]), hashlib.sha1(contenido).hexdigest()[:12]
+
+
+def cargar_reglas(ruta=REGLAS_ALERTAS_PATH):
+    return leer_reglas(ruta)[0]
+
+
+def version_reglas(ruta=REGLAS_ALERTAS_PATH):
+    """Huella corta del archivo de reglas, para usar como clave de cache."""
+    return hashlib.sha1(ruta.read_bytes()).hexdigest()[:12]
+
+
+def aplicables(reglas, columnas):
+    """Reglas cuyas variables (condicion y mensaje) estan todas en `columnas`."""
+    columnas = set(columnas)
+    return [r for r in reglas if variables_regla(r) <= columnas]
+
+
+def _evaluar(condicion, datos):
+    if "todas" in condicion:
+        return np.logical_and.reduce([_evaluar(c, datos) for c in condicion["todas"]])
+    izquierda = np.asarray(datos[condicion["variable"]], dtype=float)
+    if "referencia" in condicion:
+        derecha = condicion.get("factor", 1.0) * np.asarray(datos[condicion["referencia"]], dtype=float)
+    else:
+        derecha = condicion["umbral"]
+    return OPERADORES[condicion["operador"]](izquierda, derecha)
+
+
+def evaluar_reglas(reglas, datos):
+    """
+    {id: arreglo booleano} de las reglas aplicables. `datos` es un DataFrame o
+    un dict de arreglos/escalares (se combinan con broadcasting).
+    """
+    return {r["id"]: _evaluar(r["condicion"], datos) for r in aplicables(reglas, datos.keys())}
+
+
+def severidad_maxima(reglas, marcas):
+    """Severidad mas alta disparada en cada posicion ("" si ninguna)."""
+    nivel = {r["id"]: SEVERIDADES.index(r["severidad"]) + 1 for r in reglas}
+    rangos = [np.where(m, nivel[i], 0) for i, m in marcas.items()]
+    maximo = reduce(np.maximum, rangos) if rangos else np.zeros(0, dtype=int)
+    return np.asarray(("",) + SEVERIDADES, dtype=object)[maximo]
+
+
+def marcar_tabla(tabla, reglas):
+    """Agrega `alerta_<id>` por regla aplicable y `severidad` (la mas alta de la fila)."""
+    marcas = {i: np.broadcast_to(m, len(tabla)) for i, m in evaluar_reglas(reglas, tabla).items()}
+    columnas = {f"alerta_{i}": m for i, m in marcas.items()}
+    columnas["severidad"] = severidad_maxima(reglas, marcas) if marcas else np.full(len(tabla), "", dtype=object)
+    return tabla.assign(**columnas)
+
+
+def alertas_escenario(reglas, valores):
+    """Alertas disparadas por un escenario escalar: [{"id", "severidad", "mensaje"}] por regla."""
+    marcas = evaluar_reglas(reglas, valores)
+    return [
+        {"id": r["id"], "severidad": r["severidad"], "mensaje": FORMATO_MENSAJE.format(r["mensaje"], **valores)}
+        for r in reglas if r["id"] in marcas and bool(marcas[r["id"]])
+    ]
@@ -0,0 +1,136 @@
+"""
+Cache persistente en disco (SQLite) compartido entre procesos
+==============================================================
+Backend opcional para despliegues con varias replicas de Streamlit detras de
+un proxy: todas las replicas de la misma maquina leen y escriben el mismo
+archivo, de modo que una replica nueva o reiniciada arranca con el cache
+caliente. Se activa con variables de entorno:
+
+    CCM_CACHE_DISCO=/ruta/cache_ccm.sqlite   # sin definir = desactivado
+    CCM_CACHE_DISCO_MB=256                   # tamano maximo (por defecto 256 MB)
+
+Las claves incluyen la huella del dataset, asi que un CSV nuevo nunca lee
+entradas viejas, y el cache antepone a todas la huella del codigo que las
+produce (`version_codigo`), asi que un despliegue nuevo tampoco. Las entradas
+menos usadas (p. ej. las de versiones anteriores) se desalojan al superar el
+tamano.
+"""
+
+import hashlib
+import os
+import pickle
+import sqlite3
+import threading
+import time
+from pathlib import Path
+
+ENV_RUTA = "CCM_CACHE_DISCO"
+ENV_TAMANO = "CCM_CACHE_DISCO_MB"
+TAMANO_DEFAULT_MB = 256
+
+
+class CacheDisco:
+    """Almacen clave -> objeto (pickle) con desalojo LRU por tamano total."""
+
+    def __init__(self, ruta, max_bytes=TAMANO_DEFAULT_MB * 1024 * 1024, version=""):
+        self.ruta = Path(ruta)
+        self.version = version
+        self.ruta.parent.mkdir(parents=True, exist_ok=True)
+        self.max_bytes = max_bytes
+        self._local = threading.local()
+        with self._conexion() as con:
+            con.execute(
+                "CREATE TABLE IF NOT EXISTS entradas ("
+                " clave TEXT PRIMARY KEY, valor BLOB NOT NULL,"
+                " tamano INTEGER NOT NULL, ultimo_acceso REAL NOT NULL)"
+            )
+            con.execute("CREATE INDEX IF NOT EXISTS idx_acceso ON entradas(ultimo_acceso)")
+
+    def _conexion(self):
+        # Una conexion por hilo (el pool de precalculo tambien escribe aqui)
+        con = getattr(self._local, "con", None)
+        if con is None:
+            con = sqlite3.connect(self.ruta, timeout=30, isolation_level=None)
+            con.execute("PRAGMA journal_mode=WAL")
+            con.execute("PRAGMA synchronous=NORMAL")
+            self._local.con = con
+        return con
+
+    def leer(self, clave):
+        """Devuelve (encontrado, valor)."""
+        con = self._conexion()
+        fila = con.execute("SELECT valor FROM entradas WHERE clave = ?", (clave,)).fetchone()
+        if fila is None:
+            return False, None
+        con.execute("UPDATE entradas SET ultimo_acceso = ? WHERE clave = ?", (time.time(), clave))
+        try:
+            return True, pickle.loads(fila[0])
+        except Exception:
+            con.execute("DELETE FROM entradas WHERE clave = ?", (clave,))
+            return False, None
+
+    def escribir(self, clave, valor):
+        datos = pickle.dumps(valor, protocol=pickle.HIGHEST_PROTOCOL)
+        if len(datos) > self.max_bytes:
+            return
+        con = self._conexion()
+        con.execute(
+            "INSERT OR REPLACE INTO entradas (clave, valor, tamano, ultimo_acceso) VALUES (?, ?, ?, ?)",
+            (clave, sqlite3.Binary(datos), len(datos), time.time()),
+        )
+        self._desalojar(con)
+
+    def obtener(self, partes_clave, fn, *args, **kwargs):
+        """Lee la entrada de `partes_clave`; si no existe la calcula con `fn` y la guarda."""
+        clave = clave_cache((self.version, *partes_clave))
+        encontrado, valor = self.leer(clave)
+        if encontrado:
+            return valor
+        valor = fn(*args, **kwargs)
+        try:
+            self.escribir(clave, valor)
+        except (sqlite3.Error, pickle.PicklingError, TypeError):
+            pass
+        return valor
+
+    def estadisticas(self):
+        fila = self._conexion().execute("SELECT COUNT(*), COALESCE(SUM(tamano), 0) FROM entradas").fetchone()
+        return {"entradas": fila[0], "bytes": fila[1], "max_bytes": self.max_bytes, "ruta": str(self.ruta)}
+
+    def _desalojar(self, con):
+        total = con.execute("SELECT COALESCE(SUM(tamano), 0) FROM entradas").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        # Libera hasta el 90% del maximo, empezando por las entradas menos usadas
+        objetivo = total - int(self.max_bytes * 0.9)
+        liberado = 0
+        claves = []
+        for clave, tamano in con.execute("SELECT clave, tamano FROM entradas ORDER BY ultimo_acceso"):
+            claves.append((clave,))
+            liberado += tamano
+            if liberado >= objetivo:
+                break
+        con.executemany("DELETE FROM entradas WHERE clave = ?", claves)
+
+
+def clave_cache(partes):
+    """Clave estable a partir de una tupla de partes (espacio, huella, parametros...)."""
+    return hashlib.sha1(repr(partes).encode("utf-8")).hexdigest()
+
+
+def version_codigo(rutas):
+    """Huella corta del contenido de los archivos fuente que calculan las entradas."""
+    h = hashlib.sha1()
+    for ruta in sorted(Path(r) for r in rutas):
+        h.update(ruta.name.encode("utf-8"))
+        h.update(ruta.read_bytes())
+    return h.hexdigest()[:12]
+
+
+def abrir_cache_disco(version=""):
+    """CacheDisco configurado por entorno, o None si no esta activado."""
+    ruta = os.environ.get(ENV_RUTA)
+    if not ruta:
+        return None
+    max_mb = float(os.environ.get(ENV_TAMANO, TAMANO_DEFAULT_MB))
+    return CacheDisco(ruta, max_bytes=int(max_mb * 1024 * 1024), version=version)
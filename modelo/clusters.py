@@ -0,0 +1,89 @@
+"""
+Indice de clusters multi-zoom para el mapa nacional
+===================================================
+Agrupa los proyectos en una grilla de pixeles Web Mercator por nivel de zoom.
+Como cada nivel duplica la resolucion del anterior, las celdas de un zoom
+quedan contenidas en las del zoom inferior (indice jerarquico). El indice se
+calcula una vez por version del dataset con operaciones vectorizadas.
+"""
+
+import numpy as np
+import pandas as pd
+
+ZOOM_MIN = 0
+ZOOM_MAX = 18
+TAMANO_CELDA_PX = 60        # Lado de la celda de agrupacion, en pixeles de pantalla
+ZOOM_DETALLE = 11           # Desde este zoom se dibujan siempre los proyectos individuales
+MAX_ELEMENTOS = 300         # Tope de elementos que se envian al navegador
+
+
+def pixeles_mercator(lat, lon, zoom):
+    """Coordenadas en pixeles del mundo Web Mercator (tiles de 256 px)."""
+    escala = 256 * 2.0 ** zoom
+    x = (np.asarray(lon) + 180.0) / 360.0 * escala
+    sen = np.sin(np.radians(np.clip(lat, -85.05112878, 85.05112878)))
+    y = (0.5 - np.log((1 + sen) / (1 - sen)) / (4 * np.pi)) * escala
+    return x, y
+
+
+def agrupar_nivel(proyectos, zoom):
+    """
+    Clusters de un nivel de zoom: centroide, cantidad de proyectos, mediana del
+    ratio y, si el cluster tiene un solo proyecto, su indice en `proyectos`.
+    """
+    x, y = pixeles_mercator(proyectos["latitud"].to_numpy(), proyectos["longitud"].to_numpy(), zoom)
+    celda = (np.floor(x / TAMANO_CELDA_PX).astype(np.int64) << 32) + np.floor(y / TAMANO_CELDA_PX).astype(np.int64)
+    _, grupo = np.unique(celda, return_inverse=True)
+
+    agrupado = proyectos.assign(_grupo=grupo, _fila=np.arange(len(proyectos))).groupby("_grupo")
+    clusters = agrupado.agg(
+        latitud=("latitud", "mean"),
+        longitud=("longitud", "mean"),
+        n=("latitud", "size"),
+        mediana_ratio=("ratio_costo", "median"),
+        mediana_norm=("ratio_costo_norm", "median"),
+        fila=("_fila", "first"),
+    ).reset_index(drop=True)
+    clusters.loc[clusters["n"] > 1, "fila"] = -1
+    return clusters
+
+
+def construir_indice(df):
+    """
+    Indice {zoom: clusters} para todos los niveles. Marcona queda fuera: se
+    dibuja siempre como marcador propio.
+    """
+    proyectos = df[(df["es_marcona"] == False) & df["latitud"].notna() & df["longitud"].notna()]
+    proyectos = proyectos.reset_index(drop=True)
+    niveles = {zoom: agrupar_nivel(proyectos, zoom) for zoom in range(ZOOM_MIN, ZOOM_MAX + 1)}
+    return {"proyectos": proyectos, "niveles": niveles}
+
+
+def proyectos_individuales(proyectos, filas=None):
+    """Proyectos sueltos con el mismo formato que un nivel de clusters (n = 1)."""
+    filas = np.arange(len(proyectos)) if filas is None else np.asarray(filas)
+    seleccion = proyectos.iloc[filas]
+    return pd.DataFrame({
+        "latitud": seleccion["latitud"].to_numpy(),
+        "longitud": seleccion["longitud"].to_numpy(),
+        "n": 1,
+        "mediana_ratio": seleccion["ratio_costo"].to_numpy(),
+        "mediana_norm": seleccion["ratio_costo_norm"].to_numpy(),
+        "fila": filas,
+    })
+
+
+def nivel_para_zoom(indice, zoom):
+    """
+    Clusters a dibujar para el zoom actual. Desde ZOOM_DETALLE se muestran los
+    proyectos individuales; si un nivel supera MAX_ELEMENTOS se usa el nivel
+    inferior mas cercano que respete el tope.
+    """
+    zoom = int(min(max(zoom, ZOOM_MIN), ZOOM_MAX))
+    if zoom >= ZOOM_DETALLE and len(indice["proyectos"]) <= MAX_ELEMENTOS:
+        return proyectos_individuales(indice["proyectos"])
+    for nivel in range(zoom, ZOOM_MIN - 1, -1):
+        clusters = indice["niveles"][nivel]
+        if len(clusters) <= MAX_ELEMENTOS:
+            return clusters
+    return indice["niveles"][ZOOM_MIN]
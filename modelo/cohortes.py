@@ -0,0 +1,160 @@
+"""
+Proyeccion por componentes demograficos (cohortes)
+==================================================
+Motor de proyeccion por edades simples (0 a EDAD_MAX, con grupo abierto) en
+forma de matriz de Leslie: cada anio la poblacion de edad a sobrevive a la
+edad a+1, los nacimientos salen de la fecundidad por edad y se aplica una tasa
+de migracion neta. En lugar de multiplicar por la matriz (EDAD_MAX+1)^2 se
+aplica su estructura (subdiagonal de supervivencia + primera fila de
+fecundidad) como desplazamiento de arreglos, vectorizado sobre todos los
+distritos a la vez: arreglos de forma (distritos, edades).
+
+Las tasas por defecto son un esquema de referencia (mortalidad Gompertz-Makeham
+y fecundidad con pico a los 25-29 anios); la migracion neta se calibra por
+distrito para reproducir la poblacion del metodo de proyeccion elegido: su total
+o, si se conocen, sus totales finales por grandes grupos de edad.
+"""
+
+import numpy as np
+
+EDAD_MAX = 100
+EDADES = np.arange(EDAD_MAX + 1)
+EDADES_ESCOLARES = np.arange(6, 19)          # 6 a 18 anios (metadatos del motor)
+GRUPOS = ((0, 14), (15, 64), (65, EDAD_MAX))
+PROPORCION_MUJERES = 0.49
+
+
+def supervivencia_referencia(e0=77.0):
+    """Probabilidad de sobrevivir de la edad a a la a+1 (Gompertz-Makeham), ajustada a e0."""
+    mortalidad_infantil = 0.012 * (77.0 / e0) ** 4
+    tasa = 0.0004 + 0.00003 * np.exp(0.095 * EDADES)
+    q = 1 - np.exp(-tasa)
+    q[0] = mortalidad_infantil
+    q[-1] = 1.0
+    return np.clip(1 - q, 0.0, 1.0)
+
+
+def fecundidad_referencia(tgf=2.1):
+    """Nacimientos por persona (ambos sexos) y edad, con tasa global de fecundidad `tgf`."""
+    forma = np.exp(-0.5 * ((EDADES - 28.0) / 6.0) ** 2)
+    forma[(EDADES < 15) | (EDADES > 49)] = 0.0
+    return tgf * PROPORCION_MUJERES * forma / forma.sum()
+
+
+def estructura_desde_grupos(totales_grupos, supervivencia=None, crecimiento=0.01):
+    """
+    Poblacion por edades simples a partir de totales por grandes grupos
+    (0-14, 15-64, 65+), forma (distritos, 3) -> (distritos, EDAD_MAX+1). Dentro de
+    cada grupo se reparte segun una piramide estable l(a)*exp(-r*a).
+    """
+    totales_grupos = np.atleast_2d(np.asarray(totales_grupos, dtype=float))
+    supervivencia = supervivencia_referencia() if supervivencia is None else supervivencia
+    lx = np.concatenate([[1.0], np.cumprod(supervivencia[:-1])])
+    pesos = lx * np.exp(-crecimiento * EDADES)
+    poblacion = np.zeros((totales_grupos.shape[0], EDAD_MAX + 1))
+    for g, (desde, hasta) in enumerate(GRUPOS):
+        tramo = pesos[desde:hasta + 1] / pesos[desde:hasta + 1].sum()
+        poblacion[:, desde:hasta + 1] = totales_grupos[:, g:g + 1] * tramo
+    return poblacion
+
+
+def proyectar_cohortes(poblacion, anios, supervivencia=None, fecundidad=None, migracion=0.0):
+    """
+    Proyeccion anual por cohortes.
+    Args:
+        - poblacion: (distritos, EDAD_MAX+1) poblacion del anio base
+        - anios: numero de anios a proyectar
+        - supervivencia, fecundidad: (EDAD_MAX+1,) o (distritos, EDAD_MAX+1)
+        - migracion: tasa neta anual, escalar, (distritos,) o (distritos, EDAD_MAX+1)
+    Returns:
+        (distritos, anios+1, EDAD_MAX+1) con la poblacion de cada anio
+    """
+    poblacion = np.atleast_2d(np.asarray(poblacion, dtype=float))
+    s = np.broadcast_to(supervivencia_referencia() if supervivencia is None else supervivencia, poblacion.shape)
+    f = np.broadcast_to(fecundidad_referencia() if fecundidad is None else fecundidad, poblacion.shape)
+    m = np.asarray(migracion, dtype=float)
+    m = np.broadcast_to(m[:, None] if m.ndim == 1 else m, poblacion.shape)
+
+    serie = np.empty((poblacion.shape[0], anios + 1, poblacion.shape[1]))
+    serie[:, 0] = poblacion
+    actual = poblacion
+    for t in range(1, anios + 1):
+        siguiente = np.empty_like(actual)
+        nacimientos = (actual * f).sum(axis=1)
+        siguiente[:, 0] = nacimientos * s[:, 0]
+        siguiente[:, 1:] = actual[:, :-1] * s[:, :-1]
+        siguiente[:, -1] += actual[:, -1] * s[:, -1]          # grupo abierto
+        actual = siguiente * (1 + m)
+        serie[:, t] = actual
+    return serie
+
+
+def migracion_por_edad(tasas, tramos):
+    """Tasas por tramo de edad (distritos, tramos) -> tasas por edad simple (distritos, EDAD_MAX+1)."""
+    tasas = np.asarray(tasas, dtype=float)
+    por_edad = np.zeros((tasas.shape[0], EDAD_MAX + 1))
+    for g, (desde, hasta) in enumerate(tramos):
+        por_edad[:, desde:hasta + 1] = tasas[:, g:g + 1]
+    return por_edad
+
+
+def calibrar_migracion(poblacion, anios, totales_objetivo, supervivencia=None, fecundidad=None,
+                       tramos=None, iteraciones=12):
+    """
+    Tasas de migracion neta de cada distrito que llevan su poblacion del anio
+    `anios` (escalar o uno por distrito) a `totales_objetivo`. Sin `tramos`, una
+    tasa uniforme por distrito calibrada al total: objetivo y resultado (distritos,).
+    Con `tramos` (p. ej. GRUPOS), una tasa por tramo de edad calibrada al total de
+    cada tramo: objetivo y resultado (distritos, tramos). Newton con jacobiano por
+    diferencias finitas, vectorizado sobre distritos.
+    """
+    poblacion = np.atleast_2d(np.asarray(poblacion, dtype=float))
+    por_total = tramos is None
+    tramos = ((0, EDAD_MAX),) if por_total else tramos
+    objetivo = np.asarray(totales_objetivo, dtype=float).reshape(poblacion.shape[0], len(tramos))
+    anios = np.broadcast_to(np.asarray(anios, dtype=int), (poblacion.shape[0],))
+    filas = np.arange(poblacion.shape[0])
+
+    def error(tasas):
+        serie = proyectar_cohortes(poblacion, int(anios.max()), supervivencia, fecundidad,
+                                   migracion_por_edad(tasas, tramos))
+        final = serie[filas, anios]
+        totales = np.column_stack([final[:, desde:hasta + 1].sum(axis=1) for desde, hasta in tramos])
+        return totales / objetivo - 1
+
+    tasas = np.zeros_like(objetivo)
+    h = 1e-6
+    for _ in range(iteraciones):
+        e = error(tasas)
+        if np.all(np.abs(e) < 1e-12):
+            break
+        jacobiano = np.stack(
+            [(error(tasas + h * np.eye(len(tramos))[j]) - e) / h for j in range(len(tramos))], axis=2
+        )
+        tasas = tasas - (np.linalg.pinv(jacobiano) @ e[:, :, None])[:, :, 0]
+    return tasas[:, 0] if por_total else tasas
+
+
+def demanda_escolar(serie, edades=EDADES_ESCOLARES):
+    """Poblacion en edad escolar por anio: (distritos, anios+1)."""
+    return serie[:, :, edades].sum(axis=2)
+
+
+def proyectar_distritos(totales_grupos, tasas_crecimiento, anios, grupos_objetivo=None,
+                        anios_objetivo=None):
+    """
+    Proyeccion de todos los distritos con estructura por edades desde grandes
+    grupos. Sin `grupos_objetivo`, la migracion (uniforme por edad) se calibra para
+    que el total crezca a la tasa de cada distrito. Con `grupos_objetivo`
+    (distritos, 3), se calibra una tasa por grupo para reproducir esos totales
+    0-14/15-64/65+ a los `anios_objetivo` anios (por defecto `anios`) y se sigue
+    proyectando con ellas. Devuelve (serie por edades, tasas de migracion).
+    """
+    base = estructura_desde_grupos(totales_grupos)
+    if grupos_objetivo is None:
+        objetivo = base.sum(axis=1) * (1 + np.asarray(tasas_crecimiento, dtype=float)) ** anios
+        migracion = calibrar_migracion(base, anios, objetivo)
+        return proyectar_cohortes(base, anios, migracion=migracion), migracion
+    anios_objetivo = anios if anios_objetivo is None else anios_objetivo
+    migracion = calibrar_migracion(base, anios_objetivo, grupos_objetivo, tramos=GRUPOS)
+    return proyectar_cohortes(base, anios, migracion=migracion_por_edad(migracion, GRUPOS)), migracion
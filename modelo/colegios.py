@@ -0,0 +1,78 @@
+"""
+Demanda educativa por radio de captacion
+========================================
+Padron local de colegios (`data/padron_colegios.csv`) con una fila por
+colegio y columnas:
+
+    nombre, latitud, longitud, alumnos
+
+El indice ordena los colegios por latitud una sola vez (reutiliza
+`IndiceBBox`): cada consulta filtra la caja que envuelve el circulo de
+captacion y solo calcula distancias (haversine) para esos candidatos.
+"""
+
+import numpy as np
+
+from modelo.viewport import IndiceBBox
+
+RADIO_TIERRA_KM = 6371.0
+COLUMNAS_PADRON = ("nombre", "latitud", "longitud", "alumnos")
+
+
+def distancia_km(lat0, lon0, lat, lon):
+    """Distancia haversine (km) desde (lat0, lon0) a arreglos de puntos."""
+    lat0, lon0 = np.radians(lat0), np.radians(lon0)
+    lat, lon = np.radians(np.asarray(lat, dtype=float)), np.radians(np.asarray(lon, dtype=float))
+    a = np.sin((lat - lat0) / 2) ** 2 + np.cos(lat0) * np.cos(lat) * np.sin((lon - lon0) / 2) ** 2
+    return 2 * RADIO_TIERRA_KM * np.arcsin(np.sqrt(np.clip(a, 0.0, 1.0)))
+
+
+def caja_radio(sitio, radio_km):
+    """Caja (sur, oeste, norte, este) que contiene el circulo de `radio_km` alrededor de `sitio`."""
+    lat, lon = sitio
+    d_lat = np.degrees(radio_km / RADIO_TIERRA_KM)
+    d_lon = d_lat / max(np.cos(np.radians(lat)), 1e-6)
+    return lat - d_lat, lon - d_lon, lat + d_lat, lon + d_lon
+
+
+def validar_padron(padron):
+    """Padron con las columnas esperadas y solo colegios con coordenadas y matricula."""
+    faltantes = [c for c in COLUMNAS_PADRON if c not in padron.columns]
+    if faltantes:
+        raise ValueError(f"El padron de colegios no tiene las columnas: {', '.join(faltantes)}")
+    padron = padron[padron["latitud"].notna() & padron["longitud"].notna() & padron["alumnos"].notna()]
+    return padron.reset_index(drop=True)
+
+
+class IndiceColegios:
+    """Consultas de colegios dentro de un radio, sobre un padron validado."""
+
+    def __init__(self, padron):
+        self.padron = validar_padron(padron)
+        self.lat = self.padron["latitud"].to_numpy(dtype=float)
+        self.lon = self.padron["longitud"].to_numpy(dtype=float)
+        self.alumnos = self.padron["alumnos"].to_numpy(dtype=float)
+        self.bbox = IndiceBBox(self.lat, self.lon)
+
+    def consultar(self, sitio, radio_km):
+        """(indices, distancias en km) de los colegios a menos de `radio_km` del sitio."""
+        candidatos = self.bbox.consultar(caja_radio(sitio, radio_km))
+        dist = distancia_km(sitio[0], sitio[1], self.lat[candidatos], self.lon[candidatos])
+        dentro = dist <= radio_km
+        return candidatos[dentro], dist[dentro]
+
+    def captacion(self, sitio, radio_km):
+        """Alumnos y colegios dentro del radio, con el colegio de mayor matricula."""
+        filas, dist = self.consultar(sitio, radio_km)
+        if len(filas) == 0:
+            return {"alumnos": 0, "colegios": 0, "radio_km": radio_km, "mayor": None}
+        mayor = filas[np.argmax(self.alumnos[filas])]
+        return {
+            "alumnos": int(self.alumnos[filas].sum()),
+            "colegios": int(len(filas)),
+            "radio_km": radio_km,
+            "mayor": {
+                "nombre": str(self.padron.at[mayor, "nombre"]),
+                "alumnos": int(self.alumnos[mayor]),
+            },
+        }
@@ -0,0 +1,208 @@
+"""
+Sketches de cuantiles en flujo (KLL) para las estadisticas de pares
+===================================================================
+Cada sketch guarda a lo sumo ~3*k valores en niveles (compactadores): el
+nivel h contiene elementos con peso 2^h. Cuando un nivel se llena se ordena
+y se promueve al siguiente uno de cada dos elementos (con desfase aleatorio).
+El error de rango es ~1.7% con k=200 (99% de confianza), sin importar
+cuantos proyectos entren; mientras haya pocos valores el sketch es exacto.
+
+Los sketches se actualizan incrementalmente con los proyectos nuevos y se
+pueden fusionar (p. ej. por region -> total). Se mantienen por `tipo`, por
+region y en total; `estadisticas_sketch` devuelve el mismo formato que
+`estadisticas_pares` para que el panel de indicadores los lea sin cambios.
+"""
+
+import copy
+import json
+
+import numpy as np
+import pandas as pd
+
+K_DEFAULT = 200
+
+
+class SketchKLL:
+    """Sketch de cuantiles fusionable con min, max, suma y conteo exactos."""
+
+    def __init__(self, k=K_DEFAULT, semilla=0):
+        self.k = k
+        self.niveles = [np.empty(0)]
+        self.n = 0
+        self.suma = 0.0
+        self.minimo = np.inf
+        self.maximo = -np.inf
+        self._rng = np.random.default_rng(semilla)
+        self._cdf = None
+
+    def capacidad(self, nivel):
+        altura = len(self.niveles)
+        return max(2, int(np.ceil(self.k * (2 / 3) ** (altura - 1 - nivel))))
+
+    def actualizar(self, valores):
+        """Agrega un lote de valores (los NaN se ignoran)."""
+        valores = np.asarray(valores, dtype=float).ravel()
+        valores = valores[~np.isnan(valores)]
+        if valores.size == 0:
+            return self
+        self.n += int(valores.size)
+        self.suma += float(valores.sum())
+        self.minimo = min(self.minimo, float(valores.min()))
+        self.maximo = max(self.maximo, float(valores.max()))
+        self.niveles[0] = np.concatenate([self.niveles[0], valores])
+        self._compactar()
+        return self
+
+    def _compactar(self):
+        h = 0
+        while h < len(self.niveles):
+            if len(self.niveles[h]) > self.capacidad(h):
+                if h + 1 == len(self.niveles):
+                    self.niveles.append(np.empty(0))
+                nivel = np.sort(self.niveles[h])
+                # Con cantidad impar, un elemento se queda en el nivel
+                resto, par = (nivel[-1:], nivel[:-1]) if len(nivel) % 2 else (nivel[:0], nivel)
+                promovidos = par[self._rng.integers(2)::2]
+                self.niveles[h] = resto
+                self.niveles[h + 1] = np.concatenate([self.niveles[h + 1], promovidos])
+                h = 0           # La altura pudo crecer: las capacidades cambian
+                continue
+            h += 1
+        self._cdf = None
+
+    def fusionar(self, otro):
+        """Nuevo sketch con los datos de ambos (no modifica los originales)."""
+        fusion = SketchKLL(self.k, semilla=int(self._rng.integers(2 ** 31)))
+        altura = max(len(self.niveles), len(otro.niveles))
+        fusion.niveles = [
+            np.concatenate([s.niveles[h] for s in (self, otro) if h < len(s.niveles)])
+            for h in range(altura)
+        ]
+        fusion.n = self.n + otro.n
+        fusion.suma = self.suma + otro.suma
+        fusion.minimo = min(self.minimo, otro.minimo)
+        fusion.maximo = max(self.maximo, otro.maximo)
+        fusion._compactar()
+        return fusion
+
+    def _distribucion(self):
+        """Valores ordenados y peso acumulado (se recalcula solo tras una actualizacion)."""
+        if self._cdf is None:
+            valores = np.concatenate(self.niveles)
+            pesos = np.concatenate([np.full(len(nivel), 2.0 ** h) for h, nivel in enumerate(self.niveles)])
+            orden = np.argsort(valores, kind="stable")
+            self._cdf = valores[orden], np.cumsum(pesos[orden])
+        return self._cdf
+
+    def rango(self, x):
+        """Fraccion aproximada de valores estrictamente menores que x."""
+        valores, acumulado = self._distribucion()
+        if len(valores) == 0:
+            return 0.0
+        i = np.searchsorted(valores, x, side="left")
+        return float(acumulado[i - 1] / acumulado[-1]) if i > 0 else 0.0
+
+    def cuantil(self, q):
+        """Valor aproximado en el cuantil q (0-1); q=0.5 da la mediana."""
+        valores, acumulado = self._distribucion()
+        if len(valores) == 0:
+            return float("nan")
+        # Mediana exacta de numpy mientras no hubo compactaciones
+        if len(self.niveles) == 1:
+            return float(np.quantile(valores, q))
+        i = np.searchsorted(acumulado, q * acumulado[-1], side="left")
+        return float(valores[min(i, len(valores) - 1)])
+
+    def error_rango(self):
+        """Cota del error de rango al 99% (0 mientras el sketch es exacto); ajuste empirico de KLL."""
+        return 0.0 if len(self.niveles) == 1 else 2.446 / self.k ** 0.9433
+
+    def a_dict(self):
+        return {
+            "k": self.k, "n": self.n, "suma": self.suma, "minimo": self.minimo, "maximo": self.maximo,
+            "niveles": [nivel.tolist() for nivel in self.niveles],
+        }
+
+    @classmethod
+    def desde_dict(cls, datos):
+        sketch = cls(datos["k"])
+        sketch.niveles = [np.asarray(nivel, dtype=float) for nivel in datos["niveles"]]
+        sketch.n, sketch.suma = datos["n"], datos["suma"]
+        sketch.minimo, sketch.maximo = datos["minimo"], datos["maximo"]
+        return sketch
+
+
+# =============================================
+# SKETCHES POR TIPO, REGION Y TOTAL
+# =============================================
+def construir_sketches(pares, k=K_DEFAULT):
+    """Sketches de `ratio_costo` de los pares: total, por `tipo` y por `region`."""
+    sketches = {"total": SketchKLL(k), "tipo": {}, "region": {}}
+    return actualizar_sketches(sketches, pares)
+
+
+def actualizar_sketches(sketches, nuevos):
+    """Incorpora proyectos nuevos (DataFrame con ratio_costo, tipo, region) en su lugar."""
+    k = sketches["total"].k
+    sketches["total"].actualizar(nuevos["ratio_costo"].to_numpy())
+    for dimension in ("tipo", "region"):
+        for valor, grupo in nuevos.groupby(dimension)["ratio_costo"]:
+            sketches[dimension].setdefault(valor, SketchKLL(k)).actualizar(grupo.to_numpy())
+    return sketches
+
+
+def sketches_incrementales(previos, pares_previos, pares_actuales):
+    """
+    Sketches de una version nueva del dataset a partir de los de la anterior:
+    si todas las filas anteriores siguen iguales solo se agregan las nuevas;
+    si alguna cambio o se elimino, se reconstruyen. Devuelve (sketches, incremental).
+    """
+    columnas = ["nombre_pip", "ratio_costo", "tipo", "region"]
+    huella_previa = pd.util.hash_pandas_object(pares_previos[columnas], index=False)
+    huella_actual = pd.util.hash_pandas_object(pares_actuales[columnas], index=False)
+    if not huella_previa.isin(huella_actual).all():
+        return construir_sketches(pares_actuales, previos["total"].k), False
+    nuevos = pares_actuales[~huella_actual.isin(huella_previa).to_numpy()]
+    return actualizar_sketches(copy.deepcopy(previos), nuevos), True
+
+
+def estadisticas_sketch(sketch):
+    """Resumen con las mismas claves que `estadisticas_pares` (sin `ordenados`)."""
+    return {
+        "n": sketch.n,
+        "promedio": sketch.suma / sketch.n if sketch.n else float("nan"),
+        "mediana": sketch.cuantil(0.5),
+        "minimo": sketch.minimo,
+        "maximo": sketch.maximo,
+        "error_rango": sketch.error_rango(),
+        "sketch": sketch,
+    }
+
+
+def percentil_sketch(sketch, ratio):
+    """% aproximado de pares con ratio estrictamente menor que `ratio` (como `percentil_ratio`)."""
+    return sketch.rango(ratio) * 100
+
+
+def guardar_sketches(sketches, ruta, version):
+    """Persiste los sketches junto con la huella del dataset del que salen."""
+    datos = {
+        "version": version,
+        "total": sketches["total"].a_dict(),
+        "tipo": {t: s.a_dict() for t, s in sketches["tipo"].items()},
+        "region": {r: s.a_dict() for r, s in sketches["region"].items()},
+    }
+    with open(ruta, "w", encoding="utf-8") as f:
+        json.dump(datos, f, ensure_ascii=False)
+
+
+def cargar_sketches(ruta):
+    """(version, sketches) desde un archivo de `guardar_sketches`."""
+    with open(ruta, "r", encoding="utf-8") as f:
+        datos = json.load(f)
+    sketches = {
+        "total": SketchKLL.desde_dict(datos["total"]),
+        "tipo": {t: SketchKLL.desde_dict(s) for t, s in datos["tipo"].items()},
+        "region": {r: SketchKLL.desde_dict(s) for r, s in datos["region"].items()},
+    }
+    return datos["version"], sketches
@@ -0,0 +1,74 @@
+"""
+Carga de datos del dashboard (inversiones y motor de proyeccion).
+"""
+
+import hashlib
+import json
+from pathlib import Path
+
+import pandas as pd
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+DATA_DIR = BASE_DIR / "data"
+
+# Versiones del dataset de inversiones disponibles (la ultima es la activa)
+DATASETS = {
+    "v2": DATA_DIR / "inversiones_mapav2.csv",
+    "v3": DATA_DIR / "inversiones_mapav3.csv",
+}
+DATASET_ACTIVO = "v3"
+
+MOTOR_PATH = DATA_DIR / "resultado_motor.json"
+PADRON_COLEGIOS_PATH = DATA_DIR / "padron_colegios.csv"     # Opcional
+REGLAS_ALERTAS_PATH = DATA_DIR / "reglas_alertas.json"
+
+
+def version_dataset(version=DATASET_ACTIVO):
+    """Huella corta del contenido del CSV, para usar como clave de cache."""
+    contenido = DATASETS[version].read_bytes()
+    return f"{version}-{hashlib.sha1(contenido).hexdigest()[:12]}"
+
+
+def version_motor():
+    """Huella corta del JSON del motor de proyeccion."""
+    return hashlib.sha1(MOTOR_PATH.read_bytes()).hexdigest()[:12]
+
+
+def version_padron():
+    """Huella corta del padron de colegios, o None si no existe."""
+    if not PADRON_COLEGIOS_PATH.exists():
+        return None
+    return hashlib.sha1(PADRON_COLEGIOS_PATH.read_bytes()).hexdigest()[:12]
+
+
+def cargar_inversiones(version=DATASET_ACTIVO):
+    return pd.read_csv(DATASETS[version])
+
+
+def cargar_motor():
+    with open(MOTOR_PATH, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def cargar_padron_colegios():
+    """Padron local de colegios, o None si el archivo no existe."""
+    if not PADRON_COLEGIOS_PATH.exists():
+        return None
+    return pd.read_csv(PADRON_COLEGIOS_PATH)
+
+
+def region_proyecto(df):
+    """Departamento de cada proyecto, tomado de `nombre_pip` ("... DEPARTAMENTO DE X")."""
+    region = df["nombre_pip"].str.upper().str.extract(r"DEPARTAMENTO\s+(?:DE\s+)?([A-ZÑÁÉÍÓÚ ]+?)\s*$")[0]
+    return region.fillna("SIN DATO")
+
+
+def separar_marcona(df):
+    """Devuelve (fila de Marcona, resto de proyectos)."""
+    return df[df["es_marcona"] == True], df[df["es_marcona"] == False]
+
+
+def cargar_pares(version=DATASET_ACTIVO):
+    """Proyectos pares (todos menos Marcona) de una version, con su departamento en `region`."""
+    _, otros = separar_marcona(cargar_inversiones(version))
+    return otros.assign(region=region_proyecto(otros))
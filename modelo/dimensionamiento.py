@@ -0,0 +1,251 @@
+"""
+Modelo de dimensionamiento del auditorio/SUM (tres enfoques + equilibrio).
+"""
+
+from functools import lru_cache
+
+import numpy as np
+
+from modelo.alertas import alertas_escenario, cargar_reglas
+from modelo.cohortes import demanda_escolar, proyectar_distritos
+from modelo.datos import cargar_motor
+
+MOTOR = cargar_motor()
+REGLAS_ALERTAS = cargar_reglas()
+
+# -- Parametros de poblacion por metodo del motor de proyeccion --
+METODOS = {
+    nombre: {
+        "pob_base": est["Población total inicial"],
+        "pob_final": est["Población total final"],
+        "tasa": est["Tasa de crecimiento anual (%)"] / 100,
+        "anio_base": est["Año inicial"],
+        "anio_fin": est["Año final"],
+        "pob_0_14": est["Población 0-14 años inicial"],
+        "grupos_base": [est[f"Población {g} años inicial"] for g in ("0-14", "15-64", "65+")],
+        "grupos_final": [est[f"Población {g} años final"] for g in ("0-14", "15-64", "65+")],
+    }
+    for nombre, est in MOTOR["estadisticas"].items()
+}
+METODO_DEFAULT = "Método 2 (INEI + Proporciones Censo)"
+
+# Cambia cuando cambia la logica del modelo (invalida resultados guardados en cache)
+VERSION_MODELO = 4
+HORIZONTE_COHORTES = 20
+
+# -- Constantes de poblacion (Metodo 2 - INEI) --
+MET2 = METODOS[METODO_DEFAULT]
+POB_2026 = MET2["pob_base"]             # 21,409
+POB_2038 = MET2["pob_final"]            # 30,214
+TASA_CRECIMIENTO = MET2["tasa"]         # 0.0291
+ANIO_BASE = MET2["anio_base"]           # 2026
+ANIO_FIN = MET2["anio_fin"]             # 2038
+POB_0_14 = MET2["pob_0_14"]             # 5,364
+
+# Colegio con mayor matricula del distrito (padron educativo del notebook)
+COLEGIO_MAYOR_ALUMNOS = 976
+COLEGIO_MAYOR_NOMBRE = "23544 CORONEL FRANCISCO BOLOGNESI"
+
+# Rangos de los sliders del escenario (minimo, maximo, paso), en unidades de la UI;
+# los campos en porcentaje se dividen entre 100 antes de entrar al modelo
+RANGOS_SLIDERS = {
+    "tasa_part":        (10, 100, 5),
+    "ratio_m2":         (0.8, 1.5, 0.1),
+    "horizonte":        (5, 20, 1),
+    "factor_multi":     (0, 50, 5),
+    "ratio_asistencia": (0.5, 5.0, 0.5),
+    "aforo_propuesto":  (100, 800, 10),
+}
+SLIDERS_PORCENTAJE = {"tasa_part", "factor_multi", "ratio_asistencia"}
+
+# -- Constantes de los enfoques (las usa tambien `modelo.lote`) --
+LIMITE_MINEDU = 300                 # Tope del aforo educativo
+LIMITE_POBLACION = 0.03             # Aforo propuesto maximo como fraccion de la poblacion
+SCORE_MINIMO = 0.3                  # Penalizacion maxima del benchmark
+AFORO_MINIMO_BENCHMARK = 50
+BENCH_NASCA = (30_000, 200)         # (poblacion, aforo) de los extremos de la interpolacion
+BENCH_ICA = (150_000, 400)
+
+BENCHMARKS = {
+    "Lima Metropolitana": {"pob": 10_400_000, "aforo": 1_500, "nombre": "Gran Teatro Nacional"},
+    "Ica":                {"pob": 150_000,    "aforo": 230,   "nombre": "Auditorio Ica"},
+    "Nasca":              {"pob": 30_000,     "aforo": 200,   "nombre": "Auditorio Nasca (ref.)"},
+}
+
+
+def proyectar_poblacion(pob_base, anio_base, anio_destino, tasa):
+    """Proyeccion geometrica de poblacion."""
+    t = anio_destino - anio_base
+    return int(round(pob_base * (1 + tasa) ** t))
+
+
+def poblacion_horizonte(horizonte_anios, metodo=METODO_DEFAULT):
+    """(anio horizonte, poblacion proyectada) segun el metodo elegido."""
+    p = METODOS[metodo]
+    anio_h = p["anio_base"] + horizonte_anios
+    return anio_h, proyectar_poblacion(p["pob_base"], p["anio_base"], anio_h, p["tasa"])
+
+
+@lru_cache(maxsize=32)
+def proyeccion_cohortes(metodo=METODO_DEFAULT, anios=HORIZONTE_COHORTES):
+    """
+    Proyeccion por edades simples del distrito para un metodo del motor: la
+    estructura inicial sale de sus grandes grupos de edad y la migracion de cada
+    grupo se calibra a sus totales del anio final del motor. Forma (anios+1, edades).
+    """
+    p = METODOS[metodo]
+    serie, _ = proyectar_distritos(
+        [p["grupos_base"]], None, anios, [p["grupos_final"]], p["anio_fin"] - p["anio_base"]
+    )
+    return serie[0]
+
+
+def demanda_escolar_anual(metodo=METODO_DEFAULT, anios=HORIZONTE_COHORTES):
+    """Poblacion de 6 a 18 anios anio por anio: lista de (anio, poblacion)."""
+    escolar = demanda_escolar(proyeccion_cohortes(metodo, anios)[None])[0]
+    anio_base = METODOS[metodo]["anio_base"]
+    return [(anio_base + t, int(round(v))) for t, v in enumerate(escolar)]
+
+
+def validar_horizonte(horizonte_anios):
+    """Horizonte entero dentro de la proyeccion por cohortes (0..HORIZONTE_COHORTES)."""
+    horizonte = int(horizonte_anios)
+    if horizonte != horizonte_anios or not 0 <= horizonte <= HORIZONTE_COHORTES:
+        raise ValueError(f"El horizonte debe ser un entero entre 0 y {HORIZONTE_COHORTES} anios")
+    return horizonte
+
+
+def factor_escolar(metodo, horizonte_anios):
+    """Crecimiento de la poblacion en edad escolar entre el anio base y el horizonte."""
+    horizonte = validar_horizonte(horizonte_anios)
+    escolar = demanda_escolar(proyeccion_cohortes(metodo, HORIZONTE_COHORTES)[None])[0]
+    return float(escolar[horizonte] / escolar[0]) if escolar[0] > 0 else 1.0
+
+
+def enfoque_educativo(alumnos_referencia, tasa_part=0.15, ratio_m2=1.0, factor_multi=0.15,
+                      factor_escolar=1.0):
+    """
+    Enfoque basado en la demanda escolar, con un factor de multifuncionalidad.
+    Args:
+        - alumnos_referencia: Alumnos del colegio mayor (ej. 587) o, con padron de
+          colegios, total de alumnos dentro del radio de captacion
+        - tasa_part: Porcentaje de alumnos que participarian (ej. 15%)
+        - ratio_m2: Metros cuadrados por persona (ej. 1.0 m2/persona)
+        - factor_multi: Incremento porcentual por uso multifuncional (ej. 15% = +15% de demanda)
+        - factor_escolar: Crecimiento de la poblacion de 6-18 anios al horizonte (cohortes)
+    """
+    alumnos = int(round(alumnos_referencia * factor_escolar))
+    demanda_base = int(alumnos * tasa_part)
+    demanda_multi = int(demanda_base * (1 + factor_multi))
+    aforo = min(demanda_multi, LIMITE_MINEDU)
+    proyeccion = f" ({alumnos_referencia} x{factor_escolar:.2f} cohortes)" if factor_escolar != 1.0 else ""
+    return {
+        "enfoque": "A - Educativo (MINEDU)",
+        "aforo": aforo,
+        "area_m2": aforo * ratio_m2,
+        "alumnos_proyectados": alumnos,
+        "detalle": (
+            f"{tasa_part:.0%} de {alumnos} alumnos{proyeccion} = {demanda_base}, "
+            f"+{factor_multi:.0%} multi = {demanda_multi}, "
+            f"tope MINEDU = {LIMITE_MINEDU}"
+        ),
+    }
+
+
+def enfoque_poblacional(horizonte_anios=12, ratio_asistencia=0.01, ratio_m2=1.0,
+                        metodo=METODO_DEFAULT):
+    anio_h, pob_proy = poblacion_horizonte(horizonte_anios, metodo)
+    aforo = int(round(pob_proy * ratio_asistencia))
+    return {
+        "enfoque": "B - Poblacional",
+        "aforo": aforo,
+        "area_m2": aforo * ratio_m2,
+        "pob_proyectada": pob_proy,
+        "anio_horizonte": anio_h,
+        "detalle": f"{ratio_asistencia:.1%} de {pob_proy:,.0f} hab. ({anio_h})",
+    }
+
+
+def enfoque_benchmark(aforo_propuesto=450, horizonte_anios=12, ratio_m2=1.0,
+                      metodo=METODO_DEFAULT):
+    anio_h, pob_proy = poblacion_horizonte(horizonte_anios, metodo)
+    pob_nasca, af_nasca = BENCH_NASCA
+    pob_ica, af_ica = BENCH_ICA
+    log_pob = np.log(pob_proy)
+    log_nasca = np.log(pob_nasca)
+    log_ica = np.log(pob_ica)
+    aforo_interp = af_nasca + (af_ica - af_nasca) * (log_pob - log_nasca) / (log_ica - log_nasca)
+    aforo_interp = int(round(max(aforo_interp, AFORO_MINIMO_BENCHMARK)))
+    limite_3pct = pob_proy * LIMITE_POBLACION
+    penalizado = aforo_propuesto > limite_3pct
+    score = 1.0 if not penalizado else max(SCORE_MINIMO, limite_3pct / aforo_propuesto)
+    aforo_bench = int(round(aforo_interp * score))
+    return {
+        "enfoque": "C - Benchmark",
+        "aforo": aforo_bench,
+        "area_m2": aforo_bench * ratio_m2,
+        "penalizado": penalizado,
+        "score": score,
+        "detalle": (
+            f"Interpolado: {aforo_interp} (log Nasca-Ica), "
+            f"Limite 3%={int(limite_3pct)}, "
+            f"Score={'ALERTA ' if penalizado else 'OK '}{score:.2f}"
+        ),
+    }
+
+
+def calcular_dimensionamiento(
+    alumnos_referencia, tasa_part, ratio_m2, horizonte, factor_multi,
+    ratio_asistencia, aforo_propuesto, metodo=METODO_DEFAULT, reglas=None
+):
+    r_edu = enfoque_educativo(
+        alumnos_referencia, tasa_part, ratio_m2, factor_multi, factor_escolar(metodo, horizonte)
+    )
+    r_pob = enfoque_poblacional(horizonte, ratio_asistencia, ratio_m2, metodo)
+    r_bch = enfoque_benchmark(aforo_propuesto, horizonte, ratio_m2, metodo)
+
+    aforos = [r_edu["aforo"], r_pob["aforo"], r_bch["aforo"]]
+    rango_min = min(aforos)
+    rango_max = max(aforos)
+    punto_eq = int(round(np.mean(aforos)))
+    area_eq = punto_eq * ratio_m2
+
+    anio_h, pob_proy = poblacion_horizonte(horizonte, metodo)
+
+    alertas = alertas_escenario(REGLAS_ALERTAS if reglas is None else reglas, {
+        "aforo_propuesto": aforo_propuesto,
+        "pob_proyectada": pob_proy,
+        "punto_equilibrio": punto_eq,
+    })
+
+    return {
+        "enfoques": [r_edu, r_pob, r_bch],
+        "rango_min": rango_min,
+        "rango_max": rango_max,
+        "punto_equilibrio": punto_eq,
+        "area_equilibrio": area_eq,
+        "aforo_propuesto": aforo_propuesto,
+        "anio_horizonte": anio_h,
+        "pob_proyectada": pob_proy,
+        "metodo": metodo,
+        "alertas": alertas,
+    }
+
+
+def dimensionar_escenario(escenario, metodo, alumnos_referencia, reglas=None):
+    """
+    Dimensionamiento a partir de un escenario en unidades de los sliders
+    (porcentajes enteros), tal como lo guarda la UI y el precalculo. Sin
+    `reglas` se usan las cargadas al importar el modulo.
+    """
+    return calcular_dimensionamiento(
+        alumnos_referencia=alumnos_referencia,
+        tasa_part=escenario["tasa_part"] / 100,
+        ratio_m2=escenario["ratio_m2"],
+        horizonte=int(escenario["horizonte"]),
+        factor_multi=escenario["factor_multi"] / 100,
+        ratio_asistencia=escenario["ratio_asistencia"] / 100,
+        aforo_propuesto=int(escenario["aforo_propuesto"]),
+        metodo=metodo,
+        reglas=reglas,
+    )
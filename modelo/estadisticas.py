@@ -0,0 +1,66 @@
+"""
+Estadisticas de pares (ratio costo/beneficiario del resto de proyectos).
+"""
+
+import numpy as np
+
+
+def estadisticas_pares(ratios):
+    """
+    Resumen de los ratios de los proyectos pares. Guarda los ratios ordenados
+    para responder percentiles con una busqueda binaria.
+    """
+    ordenados = np.sort(np.asarray(ratios, dtype=float))
+    return {
+        "n": int(ordenados.size),
+        "promedio": float(ordenados.mean()),
+        "mediana": float(np.median(ordenados)),
+        "minimo": float(ordenados[0]),
+        "maximo": float(ordenados[-1]),
+        "ordenados": ordenados,
+    }
+
+
+def percentil_ratio(stats, ratio):
+    """% de pares con ratio estrictamente menor que `ratio` (para sketches: `percentil_sketch`)."""
+    return float(np.searchsorted(stats["ordenados"], ratio, side="left")) / stats["n"] * 100
+
+
+def ratio_normalizado(stats, ratio):
+    """Ratio escalado al rango min-max de los pares (como `ratio_costo_norm`)."""
+    rango = stats["maximo"] - stats["minimo"]
+    return (ratio - stats["minimo"]) / rango if rango > 0 else 0.5
+
+
+# =============================================
+# INTERVALOS DE CONFIANZA (BOOTSTRAP)
+# =============================================
+N_REMUESTRAS = 5000
+NIVEL_CONFIANZA = 0.90
+
+
+def bootstrap_pares(ratios, n_remuestras=N_REMUESTRAS, nivel=NIVEL_CONFIANZA, semilla=0):
+    """
+    Remuestreo con reemplazo de los ratios de los pares, todas las remuestras
+    en una sola matriz (n_remuestras, n). Guarda cada remuestra ordenada para
+    que el intervalo del percentil de cualquier ratio salga sin remuestrear.
+    """
+    ratios = np.asarray(ratios, dtype=float)
+    rng = np.random.default_rng(semilla)
+    muestras = np.sort(ratios[rng.integers(0, ratios.size, size=(n_remuestras, ratios.size))], axis=1)
+    medianas = np.median(muestras, axis=1)
+    alfa = (1 - nivel) / 2
+    return {
+        "n_remuestras": n_remuestras,
+        "nivel": nivel,
+        "mediana_ic": tuple(float(q) for q in np.quantile(medianas, [alfa, 1 - alfa])),
+        "muestras": muestras,
+    }
+
+
+def intervalo_percentil(boot, ratio):
+    """Intervalo del percentil de `ratio` entre los pares (misma definicion que `percentil_ratio`)."""
+    percentiles = (boot["muestras"] < ratio).sum(axis=1) / boot["muestras"].shape[1] * 100
+    alfa = (1 - boot["nivel"]) / 2
+    return tuple(float(q) for q in np.quantile(percentiles, [alfa, 1 - alfa]))
+
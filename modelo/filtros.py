@@ -0,0 +1,107 @@
+"""
+Filtros del conjunto de pares con indices de mapas de bits
+==========================================================
+Por cada dimension (tipo, departamento, banda de poblacion, banda de monto)
+y cada valor posible se precalcula un mapa de bits empaquetado (np.packbits)
+con los pares que lo cumplen. Un filtro se resuelve con operaciones de bits:
+OR entre los valores elegidos de una dimension y AND entre dimensiones; una
+dimension sin valores elegidos no restringe.
+"""
+
+import numpy as np
+import pandas as pd
+
+BANDAS_POBLACION = [
+    (0, 10_000, "< 10 mil"),
+    (10_000, 50_000, "10-50 mil"),
+    (50_000, 200_000, "50-200 mil"),
+    (200_000, np.inf, "≥ 200 mil"),
+]
+BANDAS_MONTO = [
+    (0, 1_000_000, "< S/ 1 M"),
+    (1_000_000, 5_000_000, "S/ 1-5 M"),
+    (5_000_000, np.inf, "≥ S/ 5 M"),
+]
+DIMENSIONES = {
+    "tipo": "Tipo",
+    "region": "Departamento",
+    "banda_poblacion": "Población beneficiaria",
+    "banda_monto": "Monto viable",
+}
+MIN_PARES = 3       # Con menos pares las estadisticas no son representativas
+
+
+def banda(valores, bandas):
+    """Etiqueta de banda [desde, hasta) de cada valor."""
+    valores = np.asarray(valores, dtype=float)
+    etiquetas = np.array([b[2] for b in bandas], dtype=object)
+    cortes = np.array([b[1] for b in bandas[:-1]])
+    return etiquetas[np.searchsorted(cortes, valores, side="right")]
+
+
+def columnas_filtro(pares):
+    """Valor de cada dimension por par (requiere la columna `region`)."""
+    return pd.DataFrame({
+        "tipo": pares["tipo"].to_numpy(),
+        "region": pares["region"].to_numpy(),
+        "banda_poblacion": banda(pares["poblacion_ref"], BANDAS_POBLACION),
+        "banda_monto": banda(pares["monto_viable"], BANDAS_MONTO),
+    })
+
+
+def normalizar_filtro(selecciones):
+    """Clave canonica (tupla ordenada) de {dimension: valores elegidos}; () = sin filtro."""
+    return tuple(
+        (dimension, tuple(sorted(valores)))
+        for dimension, valores in sorted(selecciones.items()) if valores
+    )
+
+
+def quitar_dimension(filtro, dimension):
+    """Filtro canonico sin las selecciones de `dimension`."""
+    return tuple((d, valores) for d, valores in filtro if d != dimension)
+
+
+class IndiceFiltros:
+    """Mapas de bits {dimension: {valor: bits empaquetados}} sobre un conjunto de pares."""
+
+    def __init__(self, pares):
+        self.n = len(pares)
+        columnas = columnas_filtro(pares)
+        self.mapas = {
+            dimension: {
+                valor: np.packbits(columnas[dimension].to_numpy() == valor)
+                for valor in pd.unique(columnas[dimension])
+            }
+            for dimension in DIMENSIONES
+        }
+        orden_bandas = {
+            "banda_poblacion": [b[2] for b in BANDAS_POBLACION],
+            "banda_monto": [b[2] for b in BANDAS_MONTO],
+        }
+        self._opciones = {
+            dimension: (
+                [v for v in orden_bandas[dimension] if v in valores] if dimension in orden_bandas
+                else sorted(valores)
+            )
+            for dimension, valores in self.mapas.items()
+        }
+
+    def opciones(self, dimension):
+        return self._opciones[dimension]
+
+    def bits(self, filtro):
+        """Mapa de bits empaquetado de un filtro normalizado."""
+        resultado = np.packbits(np.ones(self.n, dtype=bool))
+        for dimension, valores in filtro:
+            mapas = [self.mapas[dimension][v] for v in valores if v in self.mapas[dimension]]
+            union = np.bitwise_or.reduce(mapas) if mapas else np.zeros_like(resultado)
+            resultado &= union
+        return resultado
+
+    def mascara(self, filtro):
+        """Mascara booleana (n,) de los pares que cumplen el filtro."""
+        return np.unpackbits(self.bits(filtro), count=self.n).astype(bool)
+
+    def conteo(self, filtro):
+        return int(np.unpackbits(self.bits(filtro), count=self.n).sum())
@@ -0,0 +1,170 @@
+"""
+Graficos comparativos de ratios (histograma, cajas por tipo y dispersion)
+=========================================================================
+La parte de los pares depende solo de la version del dataset: se construye
+una vez como especificacion serializable (dict de plotly) con el histograma
+ya agrupado en barras y las cajas calculadas desde sus cuartiles, de modo que
+no se envian al navegador los ratios de cada proyecto. En cada rerun solo se
+agregan las trazas del proyecto destacado (estrella y linea vertical) sobre
+una copia superficial de la especificacion (sin importar plotly).
+"""
+
+import numpy as np
+
+N_BINS = 25
+COLOR_MARCONA = "#c62828"
+ESTRELLA = dict(symbol="star", color=COLOR_MARCONA, line=dict(color="white", width=2))
+
+
+def _layout(titulo, **extra):
+    return dict(
+        title=dict(text=f"<b>{titulo}</b>", font=dict(size=14, family="Inter")),
+        template="plotly_white",
+        height=300,
+        margin=dict(t=50, b=40, l=40, r=20),
+        showlegend=False,
+        font=dict(family="Inter", size=11),
+        **extra,
+    )
+
+
+def estadisticas_caja(valores):
+    """Cuartiles, bigotes (1.5 IQR), media, desviacion y atipicos de una caja."""
+    valores = np.sort(np.asarray(valores, dtype=float))
+    q1, mediana, q3 = np.percentile(valores, [25, 50, 75])
+    iqr = q3 - q1
+    dentro = valores[(valores >= q1 - 1.5 * iqr) & (valores <= q3 + 1.5 * iqr)]
+    return {
+        "q1": q1, "median": mediana, "q3": q3,
+        "lowerfence": dentro.min(), "upperfence": dentro.max(),
+        "mean": valores.mean(), "sd": valores.std(ddof=1) if len(valores) > 1 else 0.0,
+        "atipicos": valores[(valores < dentro.min()) | (valores > dentro.max())],
+    }
+
+
+def figura_base_histograma(ratios):
+    import plotly.graph_objects as go
+
+    conteos, bordes = np.histogram(ratios, bins=N_BINS)
+    rangos = [f"{a:,.0f} - {b:,.0f}" for a, b in zip(bordes[:-1], bordes[1:])]
+    fig = go.Figure(go.Bar(
+        x=(bordes[:-1] + bordes[1:]) / 2,
+        y=conteos,
+        width=np.diff(bordes),
+        customdata=rangos,
+        name="Otros Proyectos",
+        marker_color="#64b5f6",
+        opacity=0.75,
+        hovertemplate="<b>Rango:</b> %{customdata}<br><b>Frecuencia:</b> %{y}<extra></extra>",
+    ))
+    fig.update_layout(**_layout(
+        "Distribución de Ratios Costo/Beneficiario",
+        xaxis_title="Ratio (S/. por habitante)", yaxis_title="Número de Proyectos", bargap=0,
+    ))
+    return fig.to_plotly_json()
+
+
+def figura_base_cajas(otros, tipos):
+    import plotly.graph_objects as go
+
+    fig = go.Figure()
+    for tipo in tipos:
+        valores = otros.loc[otros["tipo"] == tipo, "ratio_costo"].dropna()
+        if valores.empty:
+            fig.add_trace(go.Box(x=[tipo], y=[None], name=tipo, marker_color="#66bb6a"))
+            continue
+        caja = estadisticas_caja(valores)
+        atipicos = caja.pop("atipicos")
+        fig.add_trace(go.Box(
+            x=[tipo],
+            **{k: [v] for k, v in caja.items()},
+            name=tipo,
+            marker_color="#66bb6a",
+            boxmean="sd",
+            hoverinfo="y",
+        ))
+        if len(atipicos):
+            fig.add_trace(go.Scatter(
+                x=[tipo] * len(atipicos), y=atipicos, mode="markers",
+                marker=dict(color="#66bb6a", size=5),
+                hovertemplate="<b>" + tipo + "</b><br>Ratio: S/ %{y:,.0f}/hab<extra></extra>",
+            ))
+    fig.update_layout(**_layout("Ratios por Tipo de Proyecto", yaxis_title="Ratio (S/. por habitante)"))
+    return fig.to_plotly_json()
+
+
+def figura_base_dispersion(otros):
+    import plotly.graph_objects as go
+
+    color = otros["ratio_costo_norm"] if "ratio_costo_norm" in otros.columns else otros["ratio_costo"]
+    fig = go.Figure(go.Scatter(
+        x=otros["pob_dist"].to_numpy(),
+        y=otros["ratio_costo"].to_numpy(),
+        mode="markers",
+        marker=dict(
+            size=8, color=color.to_numpy(), colorscale="RdYlBu_r", showscale=False,
+            line=dict(color="white", width=0.5),
+        ),
+        name="Otros",
+        text=otros["nombre_pip"].str[:40].to_numpy(),
+        hovertemplate="<b>%{text}</b><br>Población: %{x:,.0f} hab<br>Ratio: S/ %{y:,.0f}/hab<extra></extra>",
+    ))
+    fig.update_layout(**_layout(
+        "Población Distrital vs Ratio",
+        xaxis_title="Población Distrital (habitantes)", yaxis_title="Ratio (S/. por habitante)",
+        xaxis=dict(type="log"),
+    ))
+    return fig.to_plotly_json()
+
+
+def bases_comparacion(otros, tipos):
+    """Especificaciones de las tres figuras solo con los pares (una vez por version)."""
+    return {
+        "hist": figura_base_histograma(otros["ratio_costo"].dropna().to_numpy()),
+        "box": figura_base_cajas(otros, tipos),
+        "scatter": figura_base_dispersion(otros),
+    }
+
+
+def _con_trazas(base, trazas, shapes=(), annotations=()):
+    """Copia superficial de `base` con trazas y formas extra (no modifica la base cacheada)."""
+    layout = dict(base["layout"])
+    if shapes:
+        layout["shapes"] = list(layout.get("shapes", ())) + list(shapes)
+    if annotations:
+        layout["annotations"] = list(layout.get("annotations", ())) + list(annotations)
+    return {"data": list(base["data"]) + list(trazas), "layout": layout}
+
+
+def superponer_marcona(bases, mr):
+    """(fig_hist, fig_box, fig_scatter) con el proyecto destacado sobre las bases."""
+    if mr is None:
+        return bases["hist"], bases["box"], bases["scatter"]
+    ratio = mr["ratio_costo"]
+    fig_hist = _con_trazas(
+        bases["hist"],
+        [dict(
+            type="scatter", x=[ratio], y=[5], mode="markers", marker=dict(size=14, **ESTRELLA),
+            showlegend=False,
+            hovertemplate=f"<b>Centro Cultural Marcona</b><br>Ratio: S/ {ratio:,.0f}/hab<br>Monto: S/ {mr['monto_viable']:,.0f}<br>Población: {mr['poblacion_ref']:,.0f}<extra></extra>",
+        )],
+        shapes=[dict(
+            type="line", xref="x", yref="y domain", x0=ratio, x1=ratio, y0=0, y1=1,
+            line=dict(color=COLOR_MARCONA, width=3, dash="solid"),
+        )],
+        annotations=[dict(
+            xref="x", yref="y domain", x=ratio, y=1, yanchor="bottom", showarrow=False,
+            text=f"<b>Marcona</b><br>S/ {ratio:,.0f}", font=dict(size=11, color=COLOR_MARCONA),
+        )],
+    )
+    fig_box = _con_trazas(bases["box"], [dict(
+        type="scatter", x=[mr["tipo"]], y=[ratio], mode="markers", marker=dict(size=16, **ESTRELLA),
+        name="Marcona",
+        hovertemplate=f"<b>Marcona</b><br>Tipo: {mr['tipo']}<br>Ratio: S/ {ratio:,.0f}/hab<br>Monto: S/ {mr['monto_viable']:,.0f}<br>Población: {mr['poblacion_ref']:,.0f}<extra></extra>",
+    )])
+    fig_scatter = _con_trazas(bases["scatter"], [dict(
+        type="scatter", x=[mr["pob_dist"]], y=[ratio], mode="markers", marker=dict(size=20, **ESTRELLA),
+        name="Marcona",
+        hovertemplate=f"<b>Centro Cultural Marcona</b><br>Población: {mr['pob_dist']:,.0f} hab<br>Ratio: S/ {ratio:,.0f}/hab<br>Monto: S/ {mr['monto_viable']:,.0f}<extra></extra>",
+    )])
+    return fig_hist, fig_box, fig_scatter
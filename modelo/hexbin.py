@@ -0,0 +1,112 @@
+"""
+Capa de densidad hexagonal del mapa nacional
+============================================
+Agrega los proyectos en hexagonos (coordenadas axiales, orientacion "pointy")
+sobre una proyeccion equirectangular local. Por hexagono se calcula la
+cantidad de proyectos, la suma de `monto_viable`, la suma de `poblacion_ref`
+y la mediana del ratio. La capa resultante es un solo GeoJSON cuyo tamano
+depende del numero de hexagonos ocupados, no del numero de proyectos.
+"""
+
+import numpy as np
+import pandas as pd
+
+TAMANO_HEX_GRADOS = 0.75    # Radio del hexagono (centro a vertice), en grados
+
+METRICAS_HEX = {
+    "n": "Cantidad de proyectos",
+    "monto_total": "Inversión total (S/)",
+    "costo_por_hab": "Inversión por habitante (S/)",
+    "mediana_ratio": "Mediana del ratio (S/ por hab.)",
+}
+
+
+def _redondear_hex(q, r):
+    """Redondeo vectorizado de coordenadas axiales fraccionarias al hexagono mas cercano."""
+    x, z = q, r
+    y = -x - z
+    rx, ry, rz = np.rint(x), np.rint(y), np.rint(z)
+    dx, dy, dz = np.abs(rx - x), np.abs(ry - y), np.abs(rz - z)
+    corregir_x = (dx > dy) & (dx > dz)
+    corregir_z = ~corregir_x & (dz >= dy)
+    rx = np.where(corregir_x, -ry - rz, rx)
+    rz = np.where(corregir_z, -rx - ry, rz)
+    return rx.astype(np.int64), rz.astype(np.int64)
+
+
+def agregar_hexagonos(df, tamano=TAMANO_HEX_GRADOS):
+    """Agregados por hexagono (q, r) con su centro en lat/lon."""
+    proyectos = df[df["latitud"].notna() & df["longitud"].notna()]
+    lat = proyectos["latitud"].to_numpy()
+    # Escala de longitud a la latitud media para que los hexagonos sean regulares en pantalla
+    cos_lat = np.cos(np.radians(np.nanmean(lat))) if len(lat) else 1.0
+    x = proyectos["longitud"].to_numpy() * cos_lat
+    y = lat
+    q = (np.sqrt(3) / 3 * x - y / 3) / tamano
+    r = (2 / 3 * y) / tamano
+    q_hex, r_hex = _redondear_hex(q, r)
+
+    agregados = proyectos.assign(q=q_hex, r=r_hex).groupby(["q", "r"]).agg(
+        n=("monto_viable", "size"),
+        monto_total=("monto_viable", "sum"),
+        poblacion_total=("poblacion_ref", "sum"),
+        mediana_ratio=("ratio_costo", "median"),
+    ).reset_index()
+    agregados["costo_por_hab"] = agregados["monto_total"] / agregados["poblacion_total"]
+    agregados["centro_y"] = tamano * 1.5 * agregados["r"]
+    agregados["centro_x"] = tamano * np.sqrt(3) * (agregados["q"] + agregados["r"] / 2)
+    agregados["latitud"] = agregados["centro_y"]
+    agregados["longitud"] = agregados["centro_x"] / cos_lat
+    agregados.attrs["cos_lat"] = float(cos_lat)
+    agregados.attrs["tamano"] = tamano
+    return agregados
+
+
+def geojson_hexagonos(agregados, metrica="n"):
+    """FeatureCollection con un poligono por hexagono y sus agregados como propiedades."""
+    tamano = agregados.attrs["tamano"]
+    cos_lat = agregados.attrs["cos_lat"]
+    angulos = np.radians(60 * np.arange(6) + 30)
+    dx = tamano * np.cos(angulos)
+    dy = tamano * np.sin(angulos)
+    # Vertices de todos los hexagonos en una sola operacion: (n_hex, 6)
+    lon_v = (agregados["centro_x"].to_numpy()[:, None] + dx) / cos_lat
+    lat_v = agregados["centro_y"].to_numpy()[:, None] + dy
+
+    valores = agregados[metrica].to_numpy(dtype=float)
+    escala = np.log1p(valores) / np.log1p(valores.max()) if len(valores) and valores.max() > 0 else valores
+
+    features = []
+    for i, fila in enumerate(agregados.itertuples(index=False)):
+        anillo = np.column_stack([lon_v[i], lat_v[i]]).round(5).tolist()
+        anillo.append(anillo[0])
+        features.append({
+            "type": "Feature",
+            "geometry": {"type": "Polygon", "coordinates": [anillo]},
+            "properties": {
+                "n": int(fila.n),
+                "monto_total": float(fila.monto_total),
+                "poblacion_total": float(fila.poblacion_total),
+                "costo_por_hab": float(fila.costo_por_hab),
+                "mediana_ratio": float(fila.mediana_ratio),
+                "intensidad": float(escala[i]),
+            },
+        })
+    return {"type": "FeatureCollection", "features": features}
+
+
+def color_intensidad(intensidad):
+    """Escala secuencial azul (baja) -> rojo (alta) para la capa de densidad."""
+    paleta = ["#e3f2fd", "#90caf9", "#42a5f5", "#ffa726", "#ef5350", "#b71c1c"]
+    return paleta[min(int(intensidad * len(paleta)), len(paleta) - 1)]
+
+
+def resumen_hexagonos(agregados):
+    """Tabla legible de los hexagonos (para mostrar debajo del mapa)."""
+    return pd.DataFrame({
+        "Proyectos": agregados["n"],
+        "Inversión total (S/)": agregados["monto_total"].round(0),
+        "Población (hab.)": agregados["poblacion_total"],
+        "S/ por hab.": agregados["costo_por_hab"].round(1),
+        "Mediana ratio": agregados["mediana_ratio"].round(1),
+    }).sort_values("Inversión total (S/)", ascending=False)
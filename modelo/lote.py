@@ -0,0 +1,165 @@
+"""
+Dimensionamiento por lote (todos los distritos en una pasada)
+=============================================================
+Misma logica que `calcular_dimensionamiento` (enfoques educativo, poblacional
+y benchmark, equilibrio y alertas) aplicada a una tabla de distritos con
+operaciones vectorizadas. Columnas de entrada:
+
+    distrito, pob_base, tasa_crecimiento, mayor_alumnos       (obligatorias)
+    anio_base, latitud, longitud, aforo_propuesto, monto_viable (opcionales)
+    pob_0_14, pob_15_64, pob_65                                (opcionales)
+    pob_0_14_final, pob_15_64_final, pob_65_final, anio_final  (opcionales)
+
+`tasa_crecimiento` es anual en fraccion (0.0291 = 2.91%). Si estan los tres
+grupos de edad, la matricula se escala con la proyeccion por cohortes de cada
+distrito, como en el enfoque educativo de Marcona. Con los grupos finales (del
+anio `anio_final`, por defecto 2038) la migracion se calibra por grupo de edad
+en lugar de al total. Las alertas salen del mismo
+juego de reglas que el escenario de los sliders (`modelo.alertas`), evaluado
+sobre la tabla completa.
+
+Para grillas grandes (escenarios x distritos), `dimensionar_grilla` reparte
+los escenarios en bloques entre procesos.
+"""
+
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from modelo.alertas import marcar_tabla
+from modelo.cohortes import demanda_escolar, proyectar_distritos
+from modelo.dimensionamiento import (
+    AFORO_MINIMO_BENCHMARK, ANIO_BASE, ANIO_FIN, BENCH_ICA, BENCH_NASCA, HORIZONTE_COHORTES, LIMITE_MINEDU,
+    LIMITE_POBLACION, REGLAS_ALERTAS, SCORE_MINIMO, validar_horizonte,
+)
+
+COLUMNAS_OBLIGATORIAS = ("distrito", "pob_base", "tasa_crecimiento", "mayor_alumnos")
+COLUMNAS_EDADES = ("pob_0_14", "pob_15_64", "pob_65")
+COLUMNAS_EDADES_FINAL = ("pob_0_14_final", "pob_15_64_final", "pob_65_final")
+
+
+def validar_distritos(distritos):
+    faltantes = [c for c in COLUMNAS_OBLIGATORIAS if c not in distritos.columns]
+    if faltantes:
+        raise ValueError(f"La tabla de distritos no tiene las columnas: {', '.join(faltantes)}")
+    return distritos.reset_index(drop=True)
+
+
+def factores_escolares(distritos, horizonte):
+    """Crecimiento de la poblacion de 6-18 anios al horizonte, por distrito (1.0 sin edades)."""
+    horizonte = validar_horizonte(horizonte)
+    if not all(c in distritos.columns for c in COLUMNAS_EDADES):
+        return np.ones(len(distritos))
+    grupos_final, anios_final = None, None
+    if all(c in distritos.columns for c in COLUMNAS_EDADES_FINAL):
+        # Con los grupos finales del motor la migracion se calibra por grupo de edad
+        grupos_final = distritos[list(COLUMNAS_EDADES_FINAL)].to_numpy(dtype=float)
+        anio_base = distritos["anio_base"] if "anio_base" in distritos.columns else ANIO_BASE
+        anio_final = distritos["anio_final"] if "anio_final" in distritos.columns else ANIO_FIN
+        anios_final = np.broadcast_to(np.asarray(anio_final - anio_base, dtype=int), (len(distritos),))
+    serie, _ = proyectar_distritos(
+        distritos[list(COLUMNAS_EDADES)].to_numpy(dtype=float),
+        distritos["tasa_crecimiento"].to_numpy(dtype=float), HORIZONTE_COHORTES,
+        grupos_final, anios_final,
+    )
+    escolar = demanda_escolar(serie)
+    return np.where(escolar[:, 0] > 0, escolar[:, horizonte] / np.maximum(escolar[:, 0], 1e-12), 1.0)
+
+
+def dimensionar_lote(distritos, escenario, factores=None, marcar=True):
+    """
+    Tabla con los tres enfoques, el equilibrio y las alertas de cada distrito.
+    `escenario` va en unidades de los sliders, como en `dimensionar_escenario`.
+    Con `marcar=False` no se evaluan las reglas (quien agregue columnas las marca al final).
+    """
+    d = validar_distritos(distritos)
+    tasa_part = escenario["tasa_part"] / 100
+    ratio_m2 = escenario["ratio_m2"]
+    horizonte = validar_horizonte(escenario["horizonte"])
+    factor_multi = escenario["factor_multi"] / 100
+    ratio_asistencia = escenario["ratio_asistencia"] / 100
+    propuesto = (
+        d["aforo_propuesto"].to_numpy(dtype=float) if "aforo_propuesto" in d.columns
+        else np.full(len(d), float(escenario["aforo_propuesto"]))
+    )
+    anio_base = d["anio_base"].to_numpy() if "anio_base" in d.columns else np.full(len(d), ANIO_BASE)
+    factores = factores_escolares(d, horizonte) if factores is None else factores
+
+    # Poblacion al horizonte (proyeccion geometrica, como `proyectar_poblacion`)
+    pob_proy = np.rint(d["pob_base"].to_numpy(dtype=float) * (1 + d["tasa_crecimiento"].to_numpy(dtype=float)) ** horizonte)
+
+    # A - Educativo
+    alumnos = np.rint(d["mayor_alumnos"].to_numpy(dtype=float) * factores)
+    demanda_base = np.floor(alumnos * tasa_part)
+    demanda_multi = np.floor(demanda_base * (1 + factor_multi))
+    aforo_edu = np.minimum(demanda_multi, LIMITE_MINEDU)
+
+    # B - Poblacional
+    aforo_pob = np.rint(pob_proy * ratio_asistencia)
+
+    # C - Benchmark (interpolacion log Nasca-Ica, penalizada sobre el 3%)
+    (pob_nasca, af_nasca), (pob_ica, af_ica) = BENCH_NASCA, BENCH_ICA
+    interp = af_nasca + (af_ica - af_nasca) * (np.log(np.maximum(pob_proy, 1)) - np.log(pob_nasca)) / (np.log(pob_ica) - np.log(pob_nasca))
+    interp = np.rint(np.maximum(interp, AFORO_MINIMO_BENCHMARK))
+    limite_3pct = pob_proy * LIMITE_POBLACION
+    penalizado = propuesto > limite_3pct
+    score = np.where(penalizado, np.maximum(SCORE_MINIMO, limite_3pct / np.maximum(propuesto, 1)), 1.0)
+    aforo_bch = np.rint(interp * score)
+
+    aforos = np.column_stack([aforo_edu, aforo_pob, aforo_bch])
+    equilibrio = np.rint(aforos.mean(axis=1))
+
+    resultado = pd.DataFrame({
+        "distrito": d["distrito"],
+        "anio_horizonte": anio_base + horizonte,
+        "pob_proyectada": pob_proy.astype(np.int64),
+        "factor_escolar": factores.round(3),
+        "aforo_educativo": aforo_edu.astype(np.int64),
+        "aforo_poblacional": aforo_pob.astype(np.int64),
+        "aforo_benchmark": aforo_bch.astype(np.int64),
+        "rango_min": aforos.min(axis=1).astype(np.int64),
+        "rango_max": aforos.max(axis=1).astype(np.int64),
+        "punto_equilibrio": equilibrio.astype(np.int64),
+        "area_equilibrio": equilibrio * ratio_m2,
+        "aforo_propuesto": propuesto.astype(np.int64),
+    })
+    for columna in ("latitud", "longitud", "monto_viable"):
+        if columna in d.columns:
+            resultado[columna] = d[columna].to_numpy()
+    return marcar_tabla(resultado, REGLAS_ALERTAS) if marcar else resultado
+
+
+def _bloque(distritos, escenarios, factores_por_horizonte):
+    tablas = []
+    for i, escenario in escenarios:
+        tabla = dimensionar_lote(distritos, escenario, factores_por_horizonte[validar_horizonte(escenario["horizonte"])])
+        tablas.append(tabla.assign(escenario=i))
+    return pd.concat(tablas, ignore_index=True)
+
+
+def dimensionar_grilla(distritos, escenarios, procesos=1, escenarios_por_bloque=64):
+    """
+    Todos los escenarios x todos los distritos. La proyeccion por cohortes se
+    calcula una vez por horizonte; con `procesos` > 1 los bloques de escenarios
+    se reparten en un ProcessPoolExecutor.
+    """
+    distritos = validar_distritos(distritos)
+    factores = {h: factores_escolares(distritos, h) for h in {validar_horizonte(e["horizonte"]) for e in escenarios}}
+    numerados = list(enumerate(escenarios))
+    bloques = [numerados[i:i + escenarios_por_bloque] for i in range(0, len(numerados), escenarios_por_bloque)]
+    if procesos <= 1 or len(bloques) <= 1:
+        tablas = [_bloque(distritos, b, factores) for b in bloques]
+    else:
+        with ProcessPoolExecutor(max_workers=procesos) as pool:
+            tablas = list(pool.map(_bloque, [distritos] * len(bloques), bloques, [factores] * len(bloques)))
+    return pd.concat(tablas, ignore_index=True)
+
+
+def resumen_nacional(resultado):
+    """Totales del lote para mostrar sobre la tabla."""
+    return {
+        "distritos": int(len(resultado)),
+        "butacas_equilibrio": int(resultado["punto_equilibrio"].sum()),
+        "con_alerta": int((resultado["severidad"] != "").sum()),
+    }
@@ -0,0 +1,259 @@
+"""
+Mapa nacional de proyectos bibliotecarios (folium).
+
+folium (y branca/jinja2) se importan dentro de cada funcion: cargar este modulo
+no los importa, y las vistas que sirven el HTML desde cache no los necesitan.
+"""
+
+import numpy as np
+import pandas as pd
+
+from modelo.hexbin import color_intensidad
+
+CENTRO_PERU = [-9.19, -75.015]
+ZOOM_INICIAL = 5
+
+LEYENDA_TEMPLATE = """
+{% macro html(this, kwargs) %}
+<div style="position: fixed; 
+            bottom: 50px; right: 50px; 
+            background-color: white;
+            border: 2px solid #1565c0;
+            border-radius: 8px;
+            padding: 10px;
+            font-family: 'Inter', Arial, sans-serif;
+            font-size: 11px;
+            box-shadow: 0 2px 8px rgba(0,0,0,0.15);
+            z-index: 9999;">
+    <p style="margin: 0 0 8px 0; font-weight: bold; color: #0d47a1;">
+        Ratio Costo/Beneficiario
+    </p>
+    <div style="margin: 4px 0;">
+        <span style="display: inline-block; width: 12px; height: 12px; 
+                     background: #42a5f5; border-radius: 50%; margin-right: 6px;"></span>
+        Bajo (&lt; percentil 33)
+    </div>
+    <div style="margin: 4px 0;">
+        <span style="display: inline-block; width: 12px; height: 12px; 
+                     background: #ffa726; border-radius: 50%; margin-right: 6px;"></span>
+        Medio (percentil 33-66)
+    </div>
+    <div style="margin: 4px 0;">
+        <span style="display: inline-block; width: 12px; height: 12px; 
+                     background: #ef5350; border-radius: 50%; margin-right: 6px;"></span>
+        Alto (&gt; percentil 66)
+    </div>
+    <div style="margin: 8px 0 4px 0;">
+        <span style="color: #c62828; font-size: 14px; margin-right: 6px;">★</span>
+        <b>Centro Cultural Marcona</b>
+    </div>
+</div>
+{% endmacro %}
+"""
+
+
+def popup_html(row):
+    """Ficha HTML del popup de un proyecto."""
+    es_m = bool(row.get("es_marcona", False))
+    return f"""
+    <div style="width: 300px; font-family: 'Inter', Arial, sans-serif;">
+        <h4 style="color: {'#c62828' if es_m else '#1565c0'}; 
+                   margin-bottom: 10px; font-size: 14px; font-weight: 600;">
+            {row['entidad']}
+        </h4>
+        <table style="font-size: 12px; width: 100%; border-collapse: collapse;">
+            <tr style="border-bottom: 1px solid #eee;">
+                <td style="padding: 4px 0; font-weight: 600;">Población proyectada el 2026:</td>
+                <td style="padding: 4px 0;">{row['poblacion_ref']:,.0f} hab.</td>
+            </tr>
+            <tr style="border-bottom: 1px solid #eee;">
+                <td style="padding: 4px 0; font-weight: 600;">Ratio Costo:</td>
+                <td style="padding: 4px 0;">S/ {row['ratio_costo']:,.0f} /hab</td>
+            </tr>
+            <tr>
+                <td style="padding: 4px 0; font-weight: 600;">Tipo:</td>
+                <td style="padding: 4px 0;">{row['tipo']}</td>
+            </tr>
+        </table>
+    </div>
+    """
+
+
+def color_ratio(ratio_norm):
+    """Color del circulo segun `ratio_costo_norm` (bajo / medio / alto)."""
+    if ratio_norm < 0.1:
+        return "#42a5f5"
+    elif ratio_norm < 0.5:
+        return "#ffa726"
+    return "#ef5350"
+
+
+def agregar_marcador(destino, row):
+    """Marcador de un proyecto: estrella para Marcona, circulo coloreado por ratio para el resto."""
+    import folium
+
+    es_m = bool(row.get("es_marcona", False))
+    popup = popup_html(row)
+    if es_m:
+        folium.Marker(
+            [row["latitud"], row["longitud"]],
+            popup=folium.Popup(popup, max_width=350),
+            tooltip="<b>CENTRO CULTURAL MARCONA</b> (Propuesta)",
+            icon=folium.Icon(color="red", icon="star", prefix="fa"),
+        ).add_to(destino)
+    else:
+        ratio_norm = row.get("ratio_costo_norm", 0.5)
+        color = color_ratio(ratio_norm)
+        radius = 6 + ratio_norm * 8
+
+        folium.CircleMarker(
+            [row["latitud"], row["longitud"]],
+            radius=radius,
+            popup=folium.Popup(popup, max_width=350),
+            tooltip=f"<b>{row['entidad'][:60]}</b><br>Ratio: S/ {row['ratio_costo']:,.0f}/hab",
+            color=color,
+            fill=True,
+            fill_color=color,
+            fill_opacity=0.75,
+            weight=2,
+        ).add_to(destino)
+
+
+def agregar_leyenda(m):
+    from branca.element import MacroElement
+    from jinja2 import Template
+
+    macro = MacroElement()
+    macro._template = Template(LEYENDA_TEMPLATE)
+    m.get_root().add_child(macro)
+
+
+def mapa_base():
+    """Mapa vacio centrado en Peru (sin marcadores ni leyenda)."""
+    import folium
+
+    return folium.Map(location=CENTRO_PERU, zoom_start=ZOOM_INICIAL, tiles="CartoDB positron")
+
+
+def construir_mapa(df):
+    """Mapa con todos los proyectos con coordenadas y la leyenda de ratios."""
+    m = mapa_base()
+    for _, row in df.iterrows():
+        if pd.isna(row["latitud"]) or pd.isna(row["longitud"]):
+            continue
+        agregar_marcador(m, row)
+    agregar_leyenda(m)
+    return m
+
+
+def marcador_cluster(destino, cluster):
+    """Circulo agregado: cantidad de proyectos y mediana del ratio del grupo."""
+    import folium
+
+    n = int(cluster.n)
+    color = color_ratio(cluster.mediana_norm)
+    tooltip = f"<b>{n} proyectos</b><br>Mediana: S/ {cluster.mediana_ratio:,.0f}/hab"
+    folium.CircleMarker(
+        [cluster.latitud, cluster.longitud],
+        radius=10 + 4 * np.log2(n),
+        tooltip=tooltip,
+        color=color,
+        fill=True,
+        fill_color=color,
+        fill_opacity=0.55,
+        weight=2,
+    ).add_to(destino)
+    folium.Marker(
+        [cluster.latitud, cluster.longitud],
+        tooltip=tooltip,
+        icon=folium.DivIcon(
+            icon_size=(30, 14), icon_anchor=(15, 7),
+            html=(f"<div style='font-size:11px; font-weight:700; color:#0d47a1; "
+                  f"text-align:center;'>{n}</div>"),
+        ),
+    ).add_to(destino)
+
+
+def capa_clusters(clusters, proyectos, marcona):
+    """
+    FeatureGroup con los clusters de un nivel: grupos agregados y proyectos
+    sueltos con su marcador normal, mas la estrella de Marcona.
+    """
+    import folium
+
+    capa = folium.FeatureGroup(name="Proyectos")
+    for cluster in clusters.itertuples(index=False):
+        if cluster.fila >= 0:
+            agregar_marcador(capa, proyectos.iloc[int(cluster.fila)])
+        else:
+            marcador_cluster(capa, cluster)
+    for _, row in marcona.iterrows():
+        agregar_marcador(capa, row)
+    return capa
+
+
+def mapa_hexagonos(geojson, marcona, titulo_metrica):
+    """Mapa con la capa de densidad hexagonal (un solo GeoJson) y la estrella de Marcona."""
+    import folium
+
+    m = mapa_base()
+    folium.GeoJson(
+        geojson,
+        name="Densidad",
+        style_function=lambda f: {
+            "fillColor": color_intensidad(f["properties"]["intensidad"]),
+            "color": "#1565c0",
+            "weight": 0.6,
+            "fillOpacity": 0.65,
+        },
+        tooltip=folium.GeoJsonTooltip(
+            fields=["n", "monto_total", "poblacion_total", "mediana_ratio"],
+            aliases=["Proyectos:", "Inversión total (S/):", "Población (hab.):", "Mediana ratio (S/ por hab.):"],
+            localize=True,
+        ),
+    ).add_to(m)
+    for _, row in marcona.iterrows():
+        agregar_marcador(m, row)
+    titulo = folium.Element(
+        f"<div style='position: fixed; bottom: 50px; right: 50px; z-index: 9999; background: white; "
+        f"border: 2px solid #1565c0; border-radius: 8px; padding: 8px 10px; font-size: 11px; "
+        f"font-family: Inter, Arial, sans-serif;'><b style='color:#0d47a1;'>{titulo_metrica}</b><br>"
+        f"Color: bajo (azul) → alto (rojo)</div>"
+    )
+    m.get_root().html.add_child(titulo)
+    return m
+
+
+COLORES_SEVERIDAD = {"alerta": "#ef5350", "advertencia": "#ffa726", "info": "#42a5f5", "": "#66bb6a"}
+
+
+def color_lote(fila):
+    """Color segun la severidad mas alta de las alertas del distrito (verde sin alertas)."""
+    return COLORES_SEVERIDAD[fila.severidad]
+
+
+def mapa_lote(resultado):
+    """Mapa con un circulo por distrito del lote (tamano segun el punto de equilibrio)."""
+    import folium
+
+    m = mapa_base()
+    capa = folium.FeatureGroup(name="Dimensionamiento por distrito")
+    con_coordenadas = resultado[resultado["latitud"].notna() & resultado["longitud"].notna()]
+    for fila in con_coordenadas.itertuples(index=False):
+        color = color_lote(fila)
+        folium.CircleMarker(
+            [fila.latitud, fila.longitud],
+            radius=4 + np.sqrt(max(fila.punto_equilibrio, 0)) / 2,
+            tooltip=(
+                f"<b>{fila.distrito}</b><br>Equilibrio: {fila.punto_equilibrio} butacas "
+                f"({fila.rango_min}-{fila.rango_max})<br>Población {fila.anio_horizonte}: "
+                f"{fila.pob_proyectada:,.0f}"
+            ),
+            color=color,
+            fill=True,
+            fill_color=color,
+            fill_opacity=0.7,
+            weight=1,
+        ).add_to(capa)
+    capa.add_to(m)
+    return m
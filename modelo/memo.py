@@ -0,0 +1,64 @@
+"""
+Memo LRU acotado para resultados y figuras de escenarios.
+"""
+
+import pickle
+import threading
+from collections import OrderedDict
+
+
+class MemoLRU:
+    """
+    Cache LRU con limite de entradas y de memoria aproximada (tamano serializado
+    de cada valor). Guarda aciertos y fallos para reportar la tasa de acierto.
+    """
+
+    def __init__(self, max_entradas=256, max_bytes=64 * 1024 * 1024):
+        self.max_entradas = max_entradas
+        self.max_bytes = max_bytes
+        self._datos = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.aciertos = 0
+        self.fallos = 0
+
+    def obtener(self, clave, fn, *args, **kwargs):
+        with self._lock:
+            if clave in self._datos:
+                self._datos.move_to_end(clave)
+                self.aciertos += 1
+                return self._datos[clave][0]
+            self.fallos += 1
+        valor = fn(*args, **kwargs)
+        self.guardar(clave, valor)
+        return valor
+
+    def guardar(self, clave, valor):
+        tamano = _tamano_aproximado(valor)
+        with self._lock:
+            if clave in self._datos:
+                self._bytes -= self._datos.pop(clave)[1]
+            self._datos[clave] = (valor, tamano)
+            self._bytes += tamano
+            while self._datos and (len(self._datos) > self.max_entradas or self._bytes > self.max_bytes):
+                _, (_, liberado) = self._datos.popitem(last=False)
+                self._bytes -= liberado
+
+    def estadisticas(self):
+        with self._lock:
+            entradas, tamano, aciertos, fallos = len(self._datos), self._bytes, self.aciertos, self.fallos
+        consultas = aciertos + fallos
+        return {
+            "entradas": entradas,
+            "bytes": tamano,
+            "aciertos": aciertos,
+            "fallos": fallos,
+            "tasa_acierto": aciertos / consultas if consultas else 0.0,
+        }
+
+
+def _tamano_aproximado(valor):
+    try:
+        return len(pickle.dumps(valor, protocol=pickle.HIGHEST_PROTOCOL))
+    except Exception:
+        return 0
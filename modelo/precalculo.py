@@ -0,0 +1,103 @@
+"""
+Precalculo en segundo plano
+===========================
+Pool de hilos compartido por el servidor que calcula por adelantado los
+resultados que probablemente se pediran (posiciones vecinas de los sliders,
+todos los metodos de poblacion, estadisticas de pares por version del
+dataset). El rerun de Streamlit solo consulta el cache.
+"""
+
+import threading
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+
+
+class Precalculador:
+    """Cache de resultados indexado por clave, alimentado por un pool de hilos."""
+
+    def __init__(self, max_workers=2, max_entradas=2_000):
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="precalculo")
+        self._futuros = OrderedDict()
+        self._lock = threading.RLock()     # El callback de un futuro ya resuelto corre dentro de `programar`
+        self.max_entradas = max_entradas
+
+    def programar(self, clave, fn, *args, **kwargs):
+        """Encola el calculo de `clave` si aun no esta en cache ni en curso (o si fallo)."""
+        with self._lock:
+            futuro = self._futuros.get(clave)
+            if futuro is None or futuro.cancelled() or _fallido(futuro):
+                futuro = self._pool.submit(fn, *args, **kwargs)
+                self._futuros[clave] = futuro
+                futuro.add_done_callback(lambda f: self._descartar_fallido(clave, f))
+                self._recortar()
+            else:
+                self._futuros.move_to_end(clave)
+            return futuro
+
+    def listo(self, clave):
+        with self._lock:
+            futuro = self._futuros.get(clave)
+        return futuro is not None and futuro.done() and not futuro.cancelled() and not _fallido(futuro)
+
+    def _descartar_fallido(self, clave, futuro):
+        """Un calculo que termino con error no queda en cache: el proximo pedido lo reintenta."""
+        if not _fallido(futuro):
+            return
+        with self._lock:
+            if self._futuros.get(clave) is futuro:
+                del self._futuros[clave]
+
+    def obtener(self, clave, fn, *args, **kwargs):
+        """
+        Devuelve el resultado de `clave`. Si el calculo sigue en cola detras de
+        otros precalculos, se retira de la cola y se resuelve en el hilo actual
+        para no esperar a trabajos menos urgentes.
+        """
+        with self._lock:
+            futuro = self.programar(clave, fn, *args, **kwargs)
+            propio = futuro.cancel()
+            if propio:
+                # Los pedidos simultaneos de la misma clave esperan este calculo en lugar de repetirlo
+                futuro = Future()
+                futuro.set_running_or_notify_cancel()
+                self._futuros[clave] = futuro
+        if propio:
+            try:
+                futuro.set_result(fn(*args, **kwargs))
+            except Exception as exc:
+                futuro.set_exception(exc)
+                self._descartar_fallido(clave, futuro)
+        return futuro.result()
+
+    def estado(self):
+        """Conteo de entradas listas y pendientes (para el indicador de la UI)."""
+        with self._lock:
+            futuros = list(self._futuros.values())
+        listos = sum(f.done() for f in futuros)
+        return {"listos": listos, "pendientes": len(futuros) - listos}
+
+    def _recortar(self):
+        # Descarta primero las entradas mas antiguas ya resueltas
+        exceso = len(self._futuros) - self.max_entradas
+        for clave in list(self._futuros):
+            if exceso <= 0:
+                break
+            if self._futuros[clave].done():
+                del self._futuros[clave]
+                exceso -= 1
+
+
+def _fallido(futuro):
+    return futuro.done() and not futuro.cancelled() and futuro.exception() is not None
+
+
+def vecinos(escenario, rangos):
+    """
+    Escenarios a un paso de distancia del actual en cada slider.
+    `rangos` mapea parametro -> (minimo, maximo, paso), en unidades del slider.
+    """
+    for param, (minimo, maximo, paso) in rangos.items():
+        for signo in (-1, 1):
+            valor = round(escenario[param] + signo * paso, 6)
+            if minimo <= valor <= maximo:
+                yield {**escenario, param: valor}
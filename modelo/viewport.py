@@ -0,0 +1,89 @@
+"""
+Carga de marcadores por ventana visible del mapa
+================================================
+Indice de caja envolvente (bounding box) sobre `latitud`/`longitud`: los
+proyectos se ordenan por latitud una sola vez y cada consulta hace una
+busqueda binaria en latitud y un filtro vectorizado en longitud. El mapa
+solo recibe los marcadores dentro de la ventana visible mas un margen.
+
+No hay carga incremental: `st_folium` reemplaza completa la capa de
+`feature_group_to_add` en cada rerun, asi que al salir de la zona cargada se
+vuelve a enviar la capa entera de la nueva zona (nunca solo la diferencia).
+"""
+
+import numpy as np
+
+from modelo.clusters import pixeles_mercator
+
+MARGEN = 0.25               # Fraccion del ancho/alto de la ventana que se carga de mas
+
+
+class IndiceBBox:
+    """Indice de consultas por rectangulo (sur, oeste, norte, este) en grados."""
+
+    def __init__(self, lat, lon):
+        lat = np.asarray(lat, dtype=float)
+        lon = np.asarray(lon, dtype=float)
+        self.orden = np.argsort(lat, kind="stable")
+        self.lat = lat[self.orden]
+        self.lon = lon[self.orden]
+
+    def consultar(self, caja):
+        """Indices (posiciones originales) de los puntos dentro de `caja`."""
+        sur, oeste, norte, este = caja
+        i0 = np.searchsorted(self.lat, sur, side="left")
+        i1 = np.searchsorted(self.lat, norte, side="right")
+        lon = self.lon[i0:i1]
+        if oeste <= este:
+            dentro = (lon >= oeste) & (lon <= este)
+        else:
+            # La ventana cruza el antimeridiano
+            dentro = (lon >= oeste) | (lon <= este)
+        return np.sort(self.orden[i0:i1][dentro])
+
+
+def caja_desde_bounds(bounds):
+    """
+    Convierte los `bounds` que devuelve st_folium a (sur, oeste, norte, este),
+    o None si el mapa aun no los reporto.
+    """
+    so, ne = (bounds or {}).get("_southWest") or {}, (bounds or {}).get("_northEast") or {}
+    caja = (so.get("lat"), so.get("lng"), ne.get("lat"), ne.get("lng"))
+    return None if any(v is None for v in caja) else caja
+
+
+def caja_aproximada(centro, zoom, ancho_px=800, alto_px=450):
+    """Ventana estimada a partir del centro y el zoom (antes de que el mapa reporte bounds)."""
+    escala = 256 * 2.0 ** zoom
+    x, y = pixeles_mercator(np.array([centro[0]]), np.array([centro[1]]), zoom)
+    oeste = (x[0] - ancho_px / 2) / escala * 360 - 180
+    este = (x[0] + ancho_px / 2) / escala * 360 - 180
+
+    def lat_desde_y(py):
+        return float(np.degrees(np.arctan(np.sinh(np.pi * (1 - 2 * py / escala)))))
+
+    return lat_desde_y(y[0] + alto_px / 2), float(oeste), lat_desde_y(y[0] - alto_px / 2), float(este)
+
+
+def ampliar(caja, margen=MARGEN):
+    """Caja agrandada en `margen` veces su alto/ancho por cada lado."""
+    sur, oeste, norte, este = caja
+    d_lat = (norte - sur) * margen
+    d_lon = (este - oeste) * margen
+    return max(sur - d_lat, -90.0), oeste - d_lon, min(norte + d_lat, 90.0), este + d_lon
+
+
+def contiene(exterior, interior):
+    """True si `interior` cabe completo dentro de `exterior`."""
+    return (exterior[0] <= interior[0] and exterior[1] <= interior[1]
+            and exterior[2] >= interior[2] and exterior[3] >= interior[3])
+
+
+def filtrar_caja(puntos, caja):
+    """Filas de un DataFrame con `latitud`/`longitud` que caen dentro de `caja`."""
+    sur, oeste, norte, este = caja
+    lat = puntos["latitud"].to_numpy()
+    lon = puntos["longitud"].to_numpy()
+    en_lon = (lon >= oeste) & (lon <= este) if oeste <= este else (lon >= oeste) | (lon <= este)
+    return puntos[(lat >= sur) & (lat <= norte) & en_lon]
+
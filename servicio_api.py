@@ -0,0 +1,425 @@
+"""
+Servicio API local -- Dimensionamiento y ratios de costo
+=========================================================
+Servidor HTTP asincrono (solo libreria estandar) que expone los mismos
+calculos del dashboard para otras herramientas internas (hojas de calculo,
+pipeline de formulacion).
+
+Ejecucion:
+    python servicio_api.py --host 127.0.0.1 --puerto 8600
+
+Endpoints (JSON; los GET aceptan los mismos campos como query params):
+    GET  /salud
+    GET  /estadisticas                 ?version=v3
+    GET|POST /dimensionamiento         parametros de calcular_dimensionamiento
+    GET|POST /ratio                    monto, poblacion[, tipo, version]
+    POST /lote/dimensionamiento        {"escenarios": [{...}, ...]}
+    POST /lote/ratio                   {"consultas": [{...}, ...]}
+"""
+
+import argparse
+import asyncio
+import json
+import math
+import time
+from functools import lru_cache
+from urllib.parse import parse_qsl, urlsplit
+
+from modelo.costos import ajustar_modelo_costos, predecir_costos
+from modelo.cuantiles import construir_sketches, estadisticas_sketch, percentil_sketch
+from modelo.datos import DATASETS, DATASET_ACTIVO, cargar_inversiones, cargar_pares
+from modelo.dimensionamiento import (
+    COLEGIO_MAYOR_ALUMNOS, METODOS, METODO_DEFAULT, RANGOS_SLIDERS, SLIDERS_PORCENTAJE,
+    calcular_dimensionamiento,
+)
+from modelo.estadisticas import bootstrap_pares, intervalo_percentil, ratio_normalizado
+
+# Valores por defecto (los mismos que los sliders del dashboard)
+DEFAULTS_DIMENSIONAMIENTO = {
+    "mayor_alumnos": COLEGIO_MAYOR_ALUMNOS,
+    "tasa_part": 0.50,
+    "ratio_m2": 1.0,
+    "horizonte": 12,
+    "factor_multi": 0.15,
+    "ratio_asistencia": 0.01,
+    "aforo_propuesto": 450,
+    "metodo": METODO_DEFAULT,
+}
+CAMPOS_ENTEROS = {"mayor_alumnos", "horizonte", "aforo_propuesto"}
+# Rangos validos en unidades del modelo (los porcentajes de los sliders como fraccion)
+RANGOS_DIMENSIONAMIENTO = {
+    "mayor_alumnos": (1, 50_000),
+    **{
+        campo: (minimo / 100, maximo / 100) if campo in SLIDERS_PORCENTAJE else (minimo, maximo)
+        for campo, (minimo, maximo, _) in RANGOS_SLIDERS.items()
+    },
+}
+TIPO_DEFAULT = "DISTRITAL"          # Tipo de proyecto del costo de referencia en /ratio
+
+MAX_LOTE = 10_000
+MAX_CACHE = 65_536
+TAMANO_MAX_CUERPO = 8 * 1024 * 1024
+
+ESTADOS_HTTP = {
+    200: "OK", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed",
+    413: "Payload Too Large", 500: "Internal Server Error", 503: "Service Unavailable",
+}
+
+
+class ErrorAPI(Exception):
+    def __init__(self, estado, mensaje):
+        super().__init__(mensaje)
+        self.estado = estado
+
+
+# =============================================
+# CALCULOS CON CACHE EN PROCESO
+# =============================================
+@lru_cache(maxsize=None)
+def stats_version(version):
+    """Estadisticas de pares desde el sketch KLL total, el mismo estimador del dashboard."""
+    return estadisticas_sketch(construir_sketches(cargar_pares(version))["total"])
+
+
+@lru_cache(maxsize=None)
+def bootstrap_version(version):
+    return bootstrap_pares(cargar_pares(version)["ratio_costo"].to_numpy())
+
+
+@lru_cache(maxsize=None)
+def tipos_version(version):
+    return frozenset(cargar_inversiones(version)["tipo"].dropna().unique())
+
+
+@lru_cache(maxsize=None)
+def modelo_costos_version(version):
+    return ajustar_modelo_costos(cargar_pares(version))
+
+
+def _objeto(params):
+    """Los parametros de una consulta (tambien cada elemento de un lote) son un objeto JSON."""
+    if not isinstance(params, dict):
+        raise ErrorAPI(400, "Cada consulta debe ser un objeto JSON")
+    return params
+
+
+def _texto(valor, campo):
+    if not isinstance(valor, str):
+        raise ErrorAPI(400, f"'{campo}' debe ser texto")
+    return valor
+
+
+def normalizar_dimensionamiento(params):
+    """Completa defaults, valida tipos y devuelve una tupla ordenada (clave de cache)."""
+    desconocidos = set(_objeto(params)) - set(DEFAULTS_DIMENSIONAMIENTO)
+    if desconocidos:
+        raise ErrorAPI(400, f"Parametros desconocidos: {sorted(desconocidos)}")
+    valores = {**DEFAULTS_DIMENSIONAMIENTO, **params}
+    if _texto(valores["metodo"], "metodo") not in METODOS:
+        raise ErrorAPI(400, f"Metodo desconocido. Opciones: {list(METODOS)}")
+    for campo in DEFAULTS_DIMENSIONAMIENTO:
+        if campo == "metodo":
+            continue
+        valor = _numero(valores[campo], campo)
+        if campo in CAMPOS_ENTEROS:
+            if valor != int(valor):
+                raise ErrorAPI(400, f"'{campo}' debe ser entero")
+            valor = int(valor)
+        else:
+            valor = round(valor, 6)
+        minimo, maximo = RANGOS_DIMENSIONAMIENTO[campo]
+        if not minimo <= valor <= maximo:
+            raise ErrorAPI(400, f"'{campo}' fuera de rango [{minimo:g}, {maximo:g}]")
+        valores[campo] = valor
+    return tuple(sorted(valores.items()))
+
+
+def _numero(valor, campo):
+    """Valor numerico finito; cualquier otra cosa es un 400."""
+    try:
+        numero = float(valor)
+    except (TypeError, ValueError):
+        raise ErrorAPI(400, f"Valor no numerico en '{campo}'")
+    if not math.isfinite(numero):
+        raise ErrorAPI(400, f"Valor no finito en '{campo}'")
+    return numero
+
+
+@lru_cache(maxsize=MAX_CACHE)
+def dimensionamiento_cacheado(clave):
+    valores = dict(clave)
+    # En la API el campo conserva su nombre original: matricula del colegio mayor
+    return calcular_dimensionamiento(alumnos_referencia=valores.pop("mayor_alumnos"), **valores)
+
+
+def normalizar_ratio(params):
+    _objeto(params)
+    try:
+        monto = round(_numero(params["monto"], "monto"), 2)
+        poblacion = _numero(params["poblacion"], "poblacion")
+    except KeyError as exc:
+        raise ErrorAPI(400, f"Falta el parametro {exc}")
+    if monto < 0:
+        raise ErrorAPI(400, "monto no puede ser negativo")
+    if poblacion <= 0 or poblacion != int(poblacion):
+        raise ErrorAPI(400, "poblacion debe ser un entero positivo")
+    version = _texto(params.get("version", DATASET_ACTIVO), "version")
+    if version not in DATASETS:
+        raise ErrorAPI(400, f"Version desconocida. Opciones: {list(DATASETS)}")
+    tipo = _texto(params.get("tipo", TIPO_DEFAULT), "tipo").upper()
+    if tipo not in tipos_version(version):
+        raise ErrorAPI(400, f"Tipo desconocido. Opciones: {sorted(tipos_version(version))}")
+    return monto, int(poblacion), version, tipo
+
+
+@lru_cache(maxsize=MAX_CACHE)
+def ratio_cacheado(monto, poblacion, version, tipo=TIPO_DEFAULT):
+    """Ratio de Marcona, su posicion frente a los pares (`otros`) y el costo de referencia por escala."""
+    stats = stats_version(version)
+    boot = bootstrap_version(version)
+    modelo = modelo_costos_version(version)
+    ratio = monto / poblacion
+    prediccion = predecir_costos(modelo, poblacion, tipo)
+    costo_referencial = float(prediccion["costo"][0])
+    costo_pi = [float(prediccion["bajo"][0]), float(prediccion["alto"][0])]
+    return {
+        "monto": monto,
+        "poblacion": poblacion,
+        "tipo": tipo,
+        "version": version,
+        "ratio_costo": ratio,
+        "ratio_costo_norm": ratio_normalizado(stats, ratio),
+        "percentil": percentil_sketch(stats["sketch"], ratio),
+        "mediana_pares": stats["mediana"],
+        "costo_referencial": costo_referencial,
+        "diferencia_pct": (monto / costo_referencial - 1) * 100 if costo_referencial > 0 else 0.0,
+        "nivel_confianza": boot["nivel"],
+        "mediana_pares_ic": list(boot["mediana_ic"]),
+        "percentil_ic": list(intervalo_percentil(boot, ratio)),
+        "elasticidad_costo": modelo["elasticidad"],
+        "nivel_prediccion": modelo["nivel"],
+        "costo_referencial_ip": costo_pi,
+        "diferencia_pct_ip": [(monto / c - 1) * 100 for c in costo_pi[::-1]],
+    }
+
+
+def resumen_estadisticas(version):
+    if _texto(version, "version") not in DATASETS:
+        raise ErrorAPI(400, f"Version desconocida. Opciones: {list(DATASETS)}")
+    stats = stats_version(version)
+    return {"version": version, **{k: v for k, v in stats.items() if k != "sketch"}}
+
+
+def lote(items, fn_normalizar, fn_calcular):
+    if not isinstance(items, list):
+        raise ErrorAPI(400, "Se esperaba una lista")
+    if len(items) > MAX_LOTE:
+        raise ErrorAPI(413, f"Maximo {MAX_LOTE} elementos por lote")
+    resultados = []
+    for i, item in enumerate(items):
+        try:
+            resultados.append(fn_calcular(*fn_normalizar(item)))
+        except ErrorAPI as exc:
+            resultados.append({"error": str(exc), "indice": i})
+    return resultados
+
+
+# =============================================
+# RUTAS
+# =============================================
+def ruta_salud(metodo, params, cuerpo):
+    info_dim = dimensionamiento_cacheado.cache_info()
+    info_ratio = ratio_cacheado.cache_info()
+    return {
+        "estado": "ok",
+        "cache": {
+            "dimensionamiento": {"aciertos": info_dim.hits, "fallos": info_dim.misses, "tamano": info_dim.currsize},
+            "ratio": {"aciertos": info_ratio.hits, "fallos": info_ratio.misses, "tamano": info_ratio.currsize},
+        },
+    }
+
+
+def ruta_estadisticas(metodo, params, cuerpo):
+    return resumen_estadisticas(params.get("version", DATASET_ACTIVO))
+
+
+def ruta_dimensionamiento(metodo, params, cuerpo):
+    entrada = cuerpo if metodo == "POST" else params
+    return dimensionamiento_cacheado(normalizar_dimensionamiento(entrada))
+
+
+def ruta_ratio(metodo, params, cuerpo):
+    entrada = cuerpo if metodo == "POST" else params
+    return ratio_cacheado(*normalizar_ratio(entrada))
+
+
+def ruta_lote_dimensionamiento(metodo, params, cuerpo):
+    return {"resultados": lote(
+        cuerpo.get("escenarios"),
+        lambda item: (normalizar_dimensionamiento(item),),
+        dimensionamiento_cacheado,
+    )}
+
+
+def ruta_lote_ratio(metodo, params, cuerpo):
+    return {"resultados": lote(cuerpo.get("consultas"), normalizar_ratio, ratio_cacheado)}
+
+
+# ruta -> (metodos permitidos, handler, es_lote)
+RUTAS = {
+    "/salud": ({"GET"}, ruta_salud, False),
+    "/estadisticas": ({"GET"}, ruta_estadisticas, False),
+    "/dimensionamiento": ({"GET", "POST"}, ruta_dimensionamiento, False),
+    "/ratio": ({"GET", "POST"}, ruta_ratio, False),
+    "/lote/dimensionamiento": ({"POST"}, ruta_lote_dimensionamiento, True),
+    "/lote/ratio": ({"POST"}, ruta_lote_ratio, True),
+}
+
+
+# =============================================
+# SERVIDOR HTTP/1.1 (keep-alive)
+# =============================================
+class ServidorAPI:
+    """
+    Servidor asyncio minimo. Limita las conexiones abiertas y los lotes que se
+    calculan a la vez (los lotes van a un hilo para no bloquear el event loop).
+    """
+
+    def __init__(self, max_conexiones=1_024, max_lotes_concurrentes=4, timeout_inactivo=30):
+        self.max_conexiones = max_conexiones
+        self.timeout_inactivo = timeout_inactivo
+        self._conexiones = 0
+        self._sem_lotes = asyncio.Semaphore(max_lotes_concurrentes)
+
+    async def atender(self, reader, writer):
+        if self._conexiones >= self.max_conexiones:
+            await self._responder(writer, 503, {"error": "Demasiadas conexiones"}, mantener=False)
+            writer.close()
+            return
+        self._conexiones += 1
+        try:
+            while True:
+                try:
+                    cabecera = await asyncio.wait_for(reader.readuntil(b"\r\n\r\n"), self.timeout_inactivo)
+                except (asyncio.IncompleteReadError, asyncio.LimitOverrunError,
+                        asyncio.TimeoutError, ConnectionError):
+                    break
+                mantener = await self._procesar(cabecera, reader, writer)
+                if not mantener:
+                    break
+        finally:
+            self._conexiones -= 1
+            writer.close()
+
+    async def _procesar(self, cabecera, reader, writer):
+        lineas = cabecera.decode("latin-1").split("\r\n")
+        try:
+            metodo, objetivo, version_http = lineas[0].split(" ", 2)
+        except ValueError:
+            await self._responder(writer, 400, {"error": "Solicitud malformada"}, mantener=False)
+            return False
+        headers = {}
+        for linea in lineas[1:]:
+            if ":" in linea:
+                nombre, valor = linea.split(":", 1)
+                headers[nombre.strip().lower()] = valor.strip()
+        conexion = headers.get("connection", "").lower()
+        mantener = conexion != "close" if version_http == "HTTP/1.1" else conexion == "keep-alive"
+
+        try:
+            largo = int(headers.get("content-length", 0) or 0)
+        except ValueError:
+            largo = -1
+        if largo < 0:
+            await self._responder(writer, 400, {"error": "Content-Length invalido"}, mantener=False)
+            return False
+        if largo > TAMANO_MAX_CUERPO:
+            await self._responder(writer, 413, {"error": "Cuerpo demasiado grande"}, mantener=False)
+            return False
+        crudo = await reader.readexactly(largo) if largo else b""
+
+        url = urlsplit(objetivo)
+        estado, respuesta = await self._despachar(metodo.upper(), url.path.rstrip("/") or "/",
+                                                  dict(parse_qsl(url.query)), crudo)
+        await self._responder(writer, estado, respuesta, mantener)
+        return mantener
+
+    async def _despachar(self, metodo, ruta, params, crudo):
+        if ruta not in RUTAS:
+            return 404, {"error": f"Ruta desconocida: {ruta}", "rutas": sorted(RUTAS)}
+        metodos, handler, es_lote = RUTAS[ruta]
+        if metodo not in metodos:
+            return 405, {"error": f"Metodo {metodo} no permitido en {ruta}"}
+        try:
+            cuerpo = json.loads(crudo) if crudo else {}
+            if not isinstance(cuerpo, dict):
+                raise ErrorAPI(400, "El cuerpo debe ser un objeto JSON")
+            if es_lote:
+                async with self._sem_lotes:
+                    resultado = await asyncio.to_thread(handler, metodo, params, cuerpo)
+            else:
+                resultado = handler(metodo, params, cuerpo)
+            return 200, resultado
+        except ErrorAPI as exc:
+            return exc.estado, {"error": str(exc)}
+        except json.JSONDecodeError:
+            return 400, {"error": "JSON invalido"}
+        except Exception as exc:
+            return 500, {"error": f"{type(exc).__name__}: {exc}"}
+
+    async def _responder(self, writer, estado, cuerpo, mantener):
+        datos = json.dumps(cuerpo, ensure_ascii=False, default=_json_default).encode("utf-8")
+        writer.write(
+            (f"HTTP/1.1 {estado} {ESTADOS_HTTP.get(estado, '')}\r\n"
+             f"Content-Type: application/json; charset=utf-8\r\n"
+             f"Content-Length: {len(datos)}\r\n"
+             f"Connection: {'keep-alive' if mantener else 'close'}\r\n\r\n").encode("latin-1")
+            + datos
+        )
+        try:
+            await writer.drain()
+        except ConnectionError:
+            pass
+
+
+def _json_default(obj):
+    # Tipos numpy (bool_, int64, float64) que devuelve el modelo
+    if hasattr(obj, "item"):
+        return obj.item()
+    raise TypeError(f"No serializable: {type(obj).__name__}")
+
+
+async def servir(host, puerto, **opciones):
+    servidor_api = ServidorAPI(**opciones)
+    inicio = time.perf_counter()
+    # Todo lo que /ratio calcula por version se hace aqui, no en el event loop
+    for version in DATASETS:
+        stats_version(version)
+        bootstrap_version(version)
+        modelo_costos_version(version)
+        tipos_version(version)
+    servidor = await asyncio.start_server(servidor_api.atender, host, puerto, backlog=1_024)
+    print(f"Servicio API en http://{host}:{puerto} "
+          f"(datos cargados en {time.perf_counter() - inicio:.2f}s)")
+    async with servidor:
+        await servidor.serve_forever()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="API local de dimensionamiento y ratios de costo")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--puerto", type=int, default=8600)
+    parser.add_argument("--max-conexiones", type=int, default=1_024)
+    parser.add_argument("--max-lotes", type=int, default=4,
+                        help="Lotes que se calculan en paralelo")
+    args = parser.parse_args()
+    try:
+        asyncio.run(servir(args.host, args.puerto,
+                           max_conexiones=args.max_conexiones,
+                           max_lotes_concurrentes=args.max_lotes))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
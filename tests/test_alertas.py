@@ -0,0 +1,119 @@
+import hashlib
+import json
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from modelo.alertas import (
+    aplicables, alertas_escenario, cargar_reglas, evaluar_reglas, leer_reglas, marcar_tabla,
+    severidad_maxima, validar_reglas, version_reglas,
+)
+from modelo.dimensionamiento import METODO_DEFAULT, dimensionar_escenario
+
+
+def regla(id_, severidad="advertencia", condicion=None, mensaje="{x}"):
+    return {
+        "id": id_, "severidad": severidad,
+        "condicion": condicion or {"variable": "x", "operador": ">", "umbral": 10}, "mensaje": mensaje,
+    }
+
+
+REGLAS = [
+    regla("alto", "alerta", {"variable": "x", "operador": ">", "umbral": 100}, "x={x:,.0f}"),
+    regla("relativo", "advertencia", {"variable": "x", "operador": ">", "referencia": "y", "factor": 0.5},
+          "x={x} > y/2 ({y:.1f})"),
+    regla("rango", "info", {"todas": [
+        {"variable": "x", "operador": ">=", "umbral": 10},
+        {"variable": "x", "operador": "<", "umbral": 20},
+    ]}, "x en [10, 20)"),
+]
+
+
+def test_archivo_de_reglas_valido():
+    reglas = cargar_reglas()
+    assert {r["id"] for r in reglas} == {"sostenibilidad", "poblacion_3pct", "costo_sobre_intervalo"}
+
+
+@pytest.mark.parametrize("invalida, texto", [
+    ({"id": "a", "severidad": "alerta", "condicion": {}}, "sin los campos"),
+    (regla("a", severidad="grave"), "Severidad"),
+    (regla("a", condicion={"variable": "x", "operador": "~", "umbral": 1}), "Operador"),
+    (regla("a", condicion={"variable": "x", "operador": ">"}), "umbral"),
+    (regla("a", mensaje="{x"), "mal formado"),
+    (regla("a", mensaje="{0}"), "Campo invalido"),
+    (regla("a", mensaje="{x.real}"), "Campo invalido"),
+    (regla("a", mensaje="{x[0]}"), "Campo invalido"),
+    (regla("a", mensaje="{x!z}"), "Conversion"),
+    (regla("a", mensaje="{x:q}"), "Formato"),
+])
+def test_reglas_invalidas(invalida, texto):
+    with pytest.raises(ValueError, match=texto):
+        validar_reglas([invalida])
+
+
+def test_reglas_duplicadas():
+    with pytest.raises(ValueError, match="duplicada"):
+        validar_reglas([regla("a"), regla("a")])
+
+
+def test_aplicables_requiere_variables_del_mensaje():
+    con_mensaje = regla("a", mensaje="{x} de {z}")
+    assert aplicables([con_mensaje], {"x"}) == []
+    assert aplicables([con_mensaje], {"x", "z"}) == [con_mensaje]
+    assert [r["id"] for r in aplicables(REGLAS, {"x"})] == ["alto", "rango"]
+
+
+def test_evaluacion_vectorizada_igual_a_la_escalar():
+    rng = np.random.default_rng(0)
+    datos = pd.DataFrame({"x": rng.integers(0, 200, 500), "y": rng.integers(0, 300, 500)})
+    marcas = evaluar_reglas(REGLAS, datos)
+    x, y = datos["x"].to_numpy(), datos["y"].to_numpy()
+    np.testing.assert_array_equal(marcas["alto"], x > 100)
+    np.testing.assert_array_equal(marcas["relativo"], x > 0.5 * y)
+    np.testing.assert_array_equal(marcas["rango"], (x >= 10) & (x < 20))
+    for i in range(0, 500, 37):
+        escalares = {r["id"] for r in alertas_escenario(REGLAS, {"x": int(x[i]), "y": int(y[i])})}
+        assert escalares == {id_ for id_, m in marcas.items() if m[i]}
+
+
+def test_severidad_maxima_y_tabla():
+    tabla = marcar_tabla(pd.DataFrame({"x": [5, 15, 60, 150], "y": [0, 100, 100, 1000]}), REGLAS)
+    assert list(tabla["severidad"]) == ["advertencia", "info", "advertencia", "alerta"]
+    assert list(tabla["alerta_alto"]) == [False, False, False, True]
+    assert list(severidad_maxima(REGLAS, {})) == []
+    sin_reglas = marcar_tabla(pd.DataFrame({"w": [1, 2]}), REGLAS)
+    assert list(sin_reglas["severidad"]) == ["", ""]
+
+
+def test_mensajes_del_escenario():
+    alertas = alertas_escenario(cargar_reglas(), {"aforo_propuesto": 800, "pob_proyectada": 21_409})
+    assert {a["id"] for a in alertas} == {"sostenibilidad", "poblacion_3pct"}
+    sostenibilidad = next(a for a in alertas if a["id"] == "sostenibilidad")
+    assert "21,409 habitantes" in sostenibilidad["mensaje"]
+    assert alertas_escenario(cargar_reglas(), {"aforo_propuesto": 800}) == []
+
+
+def test_reglas_y_huella_de_los_mismos_bytes(tmp_path):
+    ruta = tmp_path / "reglas.json"
+    ruta.write_text(json.dumps({"reglas": REGLAS}), encoding="utf-8")
+    reglas, huella = leer_reglas(ruta)
+    assert [r["id"] for r in reglas] == ["alto", "relativo", "rango"]
+    assert huella == version_reglas(ruta) == hashlib.sha1(ruta.read_bytes()).hexdigest()[:12]
+
+
+def test_formatos_enteros_en_el_mensaje():
+    reglas = validar_reglas([regla("entero", mensaje="aforo {x:d}, poblacion {y:,d}, {x:.1f}")])
+    for x, y in ((150, 21_409), (150.0, 21_409.4), (np.int64(150), np.float64(21_409))):
+        (alerta,) = alertas_escenario(reglas, {"x": x, "y": y})
+        assert alerta["mensaje"] == "aforo 150, poblacion 21,409, 150.0"
+
+
+def test_dimensionamiento_con_reglas_propias():
+    escenario = {"tasa_part": 50, "ratio_m2": 1.0, "horizonte": 12, "factor_multi": 15,
+                 "ratio_asistencia": 1.0, "aforo_propuesto": 450}
+    propias = [regla("grande", condicion={"variable": "aforo_propuesto", "operador": ">", "umbral": 400},
+                     mensaje="{aforo_propuesto:d} butacas")]
+    resultado = dimensionar_escenario(escenario, METODO_DEFAULT, 976, propias)
+    assert [(a["id"], a["mensaje"]) for a in resultado["alertas"]] == [("grande", "450 butacas")]
+    assert dimensionar_escenario(escenario, METODO_DEFAULT, 976)["alertas"] == []
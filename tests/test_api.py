@@ -0,0 +1,87 @@
+import asyncio
+import json
+
+import pytest
+
+from modelo.cuantiles import construir_sketches, percentil_sketch
+from modelo.datos import DATASET_ACTIVO, cargar_pares
+from servicio_api import (
+    ErrorAPI, ServidorAPI, normalizar_dimensionamiento, normalizar_ratio, resumen_estadisticas,
+)
+
+
+def despachar(metodo, ruta, params=None, cuerpo=None):
+    async def correr():
+        servidor = ServidorAPI()
+        crudo = json.dumps(cuerpo).encode() if cuerpo is not None else b""
+        return await servidor._despachar(metodo, ruta, params or {}, crudo)
+    estado, respuesta = asyncio.run(correr())
+    # La respuesta debe poder enviarse como JSON
+    json.dumps(respuesta, default=lambda o: o.item())
+    return estado, respuesta
+
+
+@pytest.mark.parametrize("params, texto", [
+    ([5], "objeto JSON"),
+    ({"metodo": ["a"]}, "metodo"),
+    ({"metodo": "Metodo 9"}, "Metodo desconocido"),
+    ({"desconocido": 1}, "desconocidos"),
+    ({"horizonte": 2000}, "fuera de rango"),
+    ({"horizonte": 12.5}, "entero"),
+    ({"tasa_part": "nan"}, "no finito"),
+    ({"aforo_propuesto": [1]}, "no numerico"),
+])
+def test_dimensionamiento_invalido(params, texto):
+    with pytest.raises(ErrorAPI, match=texto) as exc:
+        normalizar_dimensionamiento(params)
+    assert exc.value.estado == 400
+
+
+@pytest.mark.parametrize("params, texto", [
+    (5, "objeto JSON"),
+    ({"poblacion": 100}, "Falta"),
+    ({"monto": -1, "poblacion": 100}, "negativo"),
+    ({"monto": 1, "poblacion": 2.5}, "entero positivo"),
+    ({"monto": 1, "poblacion": 100, "version": ["v3"]}, "version"),
+    ({"monto": 1, "poblacion": 100, "version": "v9"}, "Version desconocida"),
+    ({"monto": 1, "poblacion": 100, "tipo": {"a": 1}}, "tipo"),
+    ({"monto": 1, "poblacion": 100, "tipo": "OTRO"}, "Tipo desconocido"),
+])
+def test_ratio_invalido(params, texto):
+    with pytest.raises(ErrorAPI, match=texto):
+        normalizar_ratio(params)
+
+
+@pytest.mark.parametrize("ruta, cuerpo", [
+    ("/dimensionamiento", {"metodo": ["a"]}),
+    ("/ratio", {"monto": 1, "poblacion": 100, "version": ["v3"]}),
+    ("/dimensionamiento", [1, 2]),
+])
+def test_rutas_responden_400(ruta, cuerpo):
+    estado, respuesta = despachar("POST", ruta, cuerpo=cuerpo)
+    assert estado == 400 and "error" in respuesta
+
+
+def test_lote_aisla_elementos_invalidos():
+    estado, respuesta = despachar("POST", "/lote/dimensionamiento", cuerpo={
+        "escenarios": [{}, 5, {"metodo": ["a"]}, {"horizonte": 10}],
+    })
+    assert estado == 200
+    resultados = respuesta["resultados"]
+    assert [("error" in r) for r in resultados] == [False, True, True, False]
+    assert [r["indice"] for r in resultados if "error" in r] == [1, 2]
+
+    estado, respuesta = despachar("POST", "/lote/ratio", cuerpo={
+        "consultas": [{"monto": 1_000_000, "poblacion": 5_000}, "x"],
+    })
+    assert estado == 200 and respuesta["resultados"][1]["indice"] == 1
+
+
+def test_ratio_usa_el_mismo_estimador_que_el_dashboard():
+    estado, respuesta = despachar("GET", "/ratio", params={"monto": "1000000", "poblacion": "5000"})
+    assert estado == 200
+    sketch = construir_sketches(cargar_pares(DATASET_ACTIVO))["total"]
+    assert respuesta["percentil"] == percentil_sketch(sketch, 1_000_000 / 5_000)
+    assert respuesta["mediana_pares"] == sketch.cuantil(0.5)
+    resumen = resumen_estadisticas(DATASET_ACTIVO)
+    assert "sketch" not in resumen and resumen["n"] == sketch.n
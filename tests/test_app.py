@@ -0,0 +1,65 @@
+from pathlib import Path
+
+import pytest
+
+import modelo.datos as datos
+
+pytest.importorskip("streamlit.testing.v1")
+from streamlit.testing.v1 import AppTest  # noqa: E402
+
+APP_PATH = str(Path(__file__).resolve().parent.parent / "app.py")
+TIMEOUT = 180
+CONTROLES = ("monto", "poblacion", "tasa_part", "ratio_m2", "horizonte", "factor_multi",
+             "ratio_asistencia", "aforo_propuesto", "metodo")
+
+
+def escenario(at):
+    return {clave: at.session_state[clave] for clave in CONTROLES}
+
+
+def test_controles_sobreviven_al_cambio_de_pagina():
+    at = AppTest.from_file(APP_PATH, default_timeout=TIMEOUT).run()
+    assert not at.exception
+    at.slider(key="aforo_propuesto").set_value(600)
+    at.slider(key="horizonte").set_value(15)
+    at.run()
+    antes = escenario(at)
+    assert (antes["aforo_propuesto"], antes["horizonte"]) == (600, 15)
+
+    at.switch_page("pages/02_Presentacion.py").run()
+    assert not at.exception
+    at.switch_page("app.py").run()
+    assert not at.exception
+    assert escenario(at) == antes
+
+
+def test_escenario_desde_la_url():
+    at = AppTest.from_file(APP_PATH, default_timeout=TIMEOUT)
+    at.query_params["aforo_propuesto"] = "703"     # Se ajusta al paso del slider
+    at.query_params["horizonte"] = "99"            # Se lleva al maximo
+    at.query_params["metodo"] = "1"
+    at.run()
+    assert not at.exception
+    assert at.session_state["aforo_propuesto"] == 700
+    assert at.session_state["horizonte"] == 20
+    assert at.session_state["metodo"].startswith("Método 1")
+
+
+def test_rerun_no_vuelve_a_leer_los_pares(monkeypatch):
+    at = AppTest.from_file(APP_PATH, default_timeout=TIMEOUT).run()
+    lecturas = []
+    original = datos.cargar_inversiones
+    monkeypatch.setattr(datos, "cargar_inversiones", lambda *a: lecturas.append(a) or original(*a))
+    at.slider(key="aforo_propuesto").set_value(600).run()
+    at.slider(key="horizonte").set_value(15).run()
+    assert not at.exception
+    assert lecturas == []
+
+
+def test_modelo_de_costos_ignora_la_banda_de_monto():
+    at = AppTest.from_file(APP_PATH, default_timeout=TIMEOUT).run()
+    assert not any("sin el filtro de monto" in m.value for m in at.markdown)
+    filtro = at.multiselect(key="filtro_banda_monto")
+    filtro.set_value([filtro.options[-1]]).run()
+    assert not at.exception
+    assert any("sin el filtro de monto" in m.value for m in at.markdown)
@@ -0,0 +1,86 @@
+import numpy as np
+import pytest
+
+from modelo.cohortes import (
+    EDAD_MAX, GRUPOS, demanda_escolar, estructura_desde_grupos, fecundidad_referencia,
+    proyectar_cohortes, proyectar_distritos, supervivencia_referencia,
+)
+from modelo.dimensionamiento import (
+    HORIZONTE_COHORTES, METODO_DEFAULT, METODOS, factor_escolar, proyeccion_cohortes,
+)
+
+GRUPOS_PRUEBA = np.array([[5_364, 14_200, 1_845], [30_000, 80_000, 12_000]], dtype=float)
+
+
+def matriz_leslie(supervivencia, fecundidad):
+    n = EDAD_MAX + 1
+    leslie = np.zeros((n, n))
+    leslie[0] = fecundidad * supervivencia[0]
+    leslie[np.arange(1, n), np.arange(n - 1)] = supervivencia[:-1]
+    leslie[-1, -1] += supervivencia[-1]
+    return leslie
+
+
+def test_estructura_conserva_totales_por_grupo():
+    poblacion = estructura_desde_grupos(GRUPOS_PRUEBA)
+    assert poblacion.shape == (2, EDAD_MAX + 1)
+    for g, (desde, hasta) in enumerate(GRUPOS):
+        np.testing.assert_allclose(poblacion[:, desde:hasta + 1].sum(axis=1), GRUPOS_PRUEBA[:, g])
+
+
+def test_proyeccion_equivale_a_matriz_de_leslie():
+    s, f = supervivencia_referencia(), fecundidad_referencia()
+    base = estructura_desde_grupos(GRUPOS_PRUEBA[:1])
+    serie = proyectar_cohortes(base, 5, s, f, migracion=0.01)
+    leslie = matriz_leslie(s, f)
+    esperado = base[0]
+    for t in range(1, 6):
+        esperado = leslie @ esperado * 1.01
+        np.testing.assert_allclose(serie[0, t], esperado, rtol=1e-12)
+
+
+def test_migracion_calibrada_reproduce_el_crecimiento():
+    tasas = np.array([0.0291, -0.005])
+    serie, migracion = proyectar_distritos(GRUPOS_PRUEBA, tasas, 12)
+    objetivo = GRUPOS_PRUEBA.sum(axis=1) * (1 + tasas) ** 12
+    np.testing.assert_allclose(serie[:, -1].sum(axis=1), objetivo, rtol=1e-8)
+    # Vectorizado sobre distritos = distrito por distrito
+    for i in range(2):
+        serie_i, migracion_i = proyectar_distritos(GRUPOS_PRUEBA[i:i + 1], tasas[i:i + 1], 12)
+        np.testing.assert_allclose(serie_i[0], serie[i], rtol=1e-10)
+        np.testing.assert_allclose(migracion_i[0], migracion[i], rtol=1e-10)
+
+
+def test_migracion_por_grupo_reproduce_los_grupos_finales():
+    finales = GRUPOS_PRUEBA * [[0.98, 1.11, 3.9], [1.4, 1.3, 0.95]]
+    serie, migracion = proyectar_distritos(GRUPOS_PRUEBA, None, 20, finales, [12, 8])
+    assert migracion.shape == (2, len(GRUPOS)) and serie.shape[1] == 21
+    for i, anios in enumerate((12, 8)):
+        totales = [serie[i, anios, desde:hasta + 1].sum() for desde, hasta in GRUPOS]
+        np.testing.assert_allclose(totales, finales[i], rtol=1e-8)
+
+
+@pytest.mark.parametrize("metodo", list(METODOS))
+def test_proyeccion_del_metodo_coincide_con_el_motor_en_el_anio_final(metodo):
+    p = METODOS[metodo]
+    serie = proyeccion_cohortes(metodo)
+    anios = p["anio_fin"] - p["anio_base"]
+    for t, esperado in ((0, p["grupos_base"]), (anios, p["grupos_final"])):
+        totales = [serie[t, desde:hasta + 1].sum() for desde, hasta in GRUPOS]
+        np.testing.assert_allclose(totales, esperado, rtol=1e-8)
+
+
+def test_demanda_escolar_suma_edades_6_a_18():
+    serie, _ = proyectar_distritos(GRUPOS_PRUEBA, [0.01, 0.01], 3)
+    np.testing.assert_allclose(demanda_escolar(serie), serie[:, :, 6:19].sum(axis=2))
+
+
+@pytest.mark.parametrize("horizonte", [-1, HORIZONTE_COHORTES + 1, 2.5])
+def test_factor_escolar_rechaza_horizontes_fuera_de_rango(horizonte):
+    with pytest.raises(ValueError):
+        factor_escolar(METODO_DEFAULT, horizonte)
+
+
+def test_factor_escolar_en_el_anio_base_es_uno():
+    assert factor_escolar(METODO_DEFAULT, 0) == pytest.approx(1.0)
+    assert factor_escolar(METODO_DEFAULT, HORIZONTE_COHORTES) > 0
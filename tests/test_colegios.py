@@ -0,0 +1,91 @@
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import modelo.datos as datos
+from modelo.colegios import IndiceColegios, distancia_km, validar_padron
+from modelo.dimensionamiento import COLEGIO_MAYOR_ALUMNOS, COLEGIO_MAYOR_NOMBRE
+
+APP_PATH = str(Path(__file__).resolve().parent.parent / "app.py")
+SITIO = (-15.3607, -75.1658)
+KM_POR_GRADO = np.radians(1) * 6371.0
+
+
+def colegio(nombre, al_norte_km=0.0, al_este_km=0.0, alumnos=100):
+    """Colegio desplazado del sitio; sobre el meridiano la distancia es exactamente `al_norte_km`."""
+    lat = SITIO[0] + al_norte_km / KM_POR_GRADO
+    lon = SITIO[1] + al_este_km / (KM_POR_GRADO * np.cos(np.radians(SITIO[0])))
+    return {"nombre": nombre, "latitud": lat, "longitud": lon, "alumnos": alumnos}
+
+
+def test_distancia_sobre_el_meridiano():
+    lat = SITIO[0] + np.array([1.0, -2.5]) / KM_POR_GRADO
+    np.testing.assert_allclose(distancia_km(*SITIO, lat, [SITIO[1]] * 2), [1.0, 2.5], rtol=1e-9)
+
+
+def test_captacion_con_distancias_conocidas():
+    indice = IndiceColegios(pd.DataFrame([
+        colegio("cerca", 0.5, alumnos=300),
+        colegio("borde", -2.99, alumnos=500),
+        colegio("fuera", 3.01, alumnos=900),
+        # Dentro de la caja del radio pero fuera del circulo (esquina)
+        colegio("esquina", 2.5, 2.5, alumnos=700),
+    ]))
+    filas, dist = indice.consultar(SITIO, 3.0)
+    assert sorted(indice.padron.loc[filas, "nombre"]) == ["borde", "cerca"]
+    np.testing.assert_allclose(sorted(dist), [0.5, 2.99], rtol=1e-6)
+    assert indice.captacion(SITIO, 3.0) == {
+        "alumnos": 800, "colegios": 2, "radio_km": 3.0, "mayor": {"nombre": "borde", "alumnos": 500},
+    }
+    assert indice.captacion(SITIO, 0.1)["mayor"] is None
+    assert indice.captacion(SITIO, 5.0)["colegios"] == 4
+
+
+def test_validar_padron():
+    padron = pd.DataFrame({
+        "nombre": ["a", "b", "c", "d"], "latitud": [1.0, None, 3.0, 4.0],
+        "longitud": [1.0, 2.0, None, 4.0], "alumnos": [10, 20, 30, None],
+    })
+    assert list(validar_padron(padron)["nombre"]) == ["a"]
+    with pytest.raises(ValueError, match="longitud, alumnos"):
+        validar_padron(padron[["nombre", "latitud"]])
+
+
+def test_consulta_por_caja_igual_a_fuerza_bruta():
+    rng = np.random.default_rng(0)
+    padron = pd.DataFrame({
+        "nombre": [f"c{i}" for i in range(3_000)],
+        "latitud": rng.uniform(-18.0, -12.0, 3_000),
+        "longitud": rng.uniform(-78.0, -72.0, 3_000),
+        "alumnos": rng.integers(10, 1_500, 3_000),
+    })
+    indice = IndiceColegios(padron)
+    for _ in range(50):
+        sitio = (rng.uniform(-17.5, -12.5), rng.uniform(-77.5, -72.5))
+        radio = rng.uniform(0.5, 60.0)
+        filas, dist = indice.consultar(sitio, radio)
+        todas = distancia_km(*sitio, padron["latitud"], padron["longitud"])
+        esperadas = np.flatnonzero(todas <= radio)
+        np.testing.assert_array_equal(np.sort(filas), esperadas)
+        np.testing.assert_allclose(dist[np.argsort(filas)], todas[esperadas])
+
+
+@pytest.mark.parametrize("contenido", [
+    "nombre,latitud\nA,-15.36\n",
+    "nombre,latitud,longitud,alumnos\nA,-15.36,-75.16,muchos\n",
+])
+def test_padron_mal_formado_usa_la_matricula_fija(tmp_path, monkeypatch, contenido):
+    pytest.importorskip("streamlit.testing.v1")
+    from streamlit.testing.v1 import AppTest
+
+    padron = tmp_path / "padron_colegios.csv"
+    padron.write_text(contenido, encoding="utf-8")
+    monkeypatch.setattr(datos, "PADRON_COLEGIOS_PATH", padron)
+    at = AppTest.from_file(APP_PATH, default_timeout=180).run()
+    assert not at.exception
+    assert any("No se pudo leer" in w.value for w in at.warning)
+    assert "radio_captacion" not in [s.key for s in at.slider]
+    assert any(COLEGIO_MAYOR_NOMBRE in m.value for m in at.markdown)
+    assert any(f"{COLEGIO_MAYOR_ALUMNOS} alumnos" in w.value for w in at.warning)
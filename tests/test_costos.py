@@ -0,0 +1,81 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from modelo.costos import _cuantil_normal, ajustar_modelo_costos, cuantil_t, predecir_costos
+
+A, B, SIGMA = 9.0, 0.6, 0.3
+DESPLAZAMIENTO = {"DISTRITAL": 0.0, "PROVINCIAL": 0.5}
+
+
+def pares_prueba(n=400, semilla=0, atipicos=0.0):
+    """log(monto) = A + B log(poblacion) + desplazamiento(tipo) + ruido; `atipicos` = fraccion con +3."""
+    rng = np.random.default_rng(semilla)
+    log_pob = rng.uniform(np.log(2_000), np.log(300_000), n)
+    tipo = rng.choice(list(DESPLAZAMIENTO), n, p=[0.7, 0.3])
+    log_monto = A + B * log_pob + np.vectorize(DESPLAZAMIENTO.get)(tipo) + rng.normal(0, SIGMA, n)
+    log_monto[: int(n * atipicos)] += 3.0
+    return pd.DataFrame({"monto_viable": np.exp(log_monto), "poblacion_ref": np.exp(log_pob), "tipo": tipo})
+
+
+@pytest.mark.parametrize("p, gl, esperado", [
+    (0.975, None, 1.959964), (0.95, 10, 1.812461), (0.975, 30, 2.042272), (0.95, 100, 1.660234),
+])
+def test_cuantiles(p, gl, esperado):
+    valor = _cuantil_normal(p) if gl is None else cuantil_t(p, gl)
+    assert valor == pytest.approx(esperado, abs=2e-3)
+
+
+@pytest.mark.parametrize("p, gl, esperado", [
+    (0.95, 1, 6.313752), (0.95, 2, 2.919986), (0.95, 3, 2.353363), (0.995, 4, 4.604095),
+    (0.975, 7, 2.364624), (0.05, 3, -2.353363),
+])
+def test_cuantil_t_exacto_con_pocos_grados_de_libertad(p, gl, esperado):
+    assert cuantil_t(p, gl) == pytest.approx(esperado, abs=1e-6)
+
+
+def test_recupera_pendiente_y_desplazamiento():
+    modelo = ajustar_modelo_costos(pares_prueba())
+    assert modelo["elasticidad"] == pytest.approx(B, abs=0.03)
+    assert modelo["tipos_modelo"] == ["PROVINCIAL"]
+    assert modelo["coef"][2] == pytest.approx(DESPLAZAMIENTO["PROVINCIAL"], abs=0.08)
+    assert np.sqrt(modelo["sigma2"]) == pytest.approx(SIGMA, rel=0.15)
+
+
+def test_robusto_a_atipicos():
+    pares = pares_prueba(atipicos=0.1)
+    modelo = ajustar_modelo_costos(pares, por_tipo=False)
+    assert modelo["elasticidad"] == pytest.approx(B, abs=0.05)
+    # Los atipicos quedan con peso reducido; el resto casi con peso completo
+    assert modelo["pesos"][:40].max() < 0.3
+    assert np.median(modelo["pesos"][40:]) == 1.0
+
+
+def test_cobertura_del_intervalo():
+    modelo = ajustar_modelo_costos(pares_prueba(semilla=1))
+    nuevos = pares_prueba(n=20_000, semilla=2)
+    prediccion = predecir_costos(modelo, nuevos["poblacion_ref"], nuevos["tipo"])
+    dentro = (nuevos["monto_viable"] >= prediccion["bajo"]) & (nuevos["monto_viable"] <= prediccion["alto"])
+    assert dentro.mean() == pytest.approx(modelo["nivel"], abs=0.03)
+
+
+def test_intervalo_se_abre_lejos_del_centro():
+    pares = pares_prueba()
+    modelo = ajustar_modelo_costos(pares, por_tipo=False)
+    centro = np.exp(np.log(pares["poblacion_ref"]).mean())
+    prediccion = predecir_costos(modelo, [centro, centro * 20, centro * 200])
+    ancho = np.log(prediccion["alto"]) - np.log(prediccion["bajo"])
+    assert ancho[0] < ancho[1] < ancho[2]
+    assert np.all(prediccion["bajo"] < prediccion["costo"]) and np.all(prediccion["costo"] < prediccion["alto"])
+
+
+def test_pocos_pares_sin_desplazamiento_por_tipo():
+    # 5 pares: quedarian 2 grados de libertad con el desplazamiento de tipo
+    pares = pares_prueba(n=5).assign(tipo=["DISTRITAL", "DISTRITAL", "PROVINCIAL", "PROVINCIAL", "PROVINCIAL"])
+    assert ajustar_modelo_costos(pares)["tipos_modelo"] == []
+    assert ajustar_modelo_costos(pd.concat([pares, pares_prueba(n=1)]))["tipos_modelo"] != []
+    # Un tipo desconocido usa la constante comun
+    modelo = ajustar_modelo_costos(pares_prueba())
+    desconocido = predecir_costos(modelo, 10_000, "OTRO")["costo"]
+    referencia = predecir_costos(modelo, 10_000, "DISTRITAL")["costo"]
+    np.testing.assert_allclose(desconocido, referencia)
@@ -0,0 +1,86 @@
+import numpy as np
+import pandas as pd
+
+from modelo.cuantiles import (
+    SketchKLL, cargar_sketches, construir_sketches, guardar_sketches, percentil_sketch,
+    sketches_incrementales,
+)
+from modelo.estadisticas import estadisticas_pares, percentil_ratio
+
+PUNTOS = np.linspace(0.01, 0.99, 99)
+
+
+def error_rango_maximo(sketch, datos):
+    ordenados = np.sort(datos)
+    exacto = np.searchsorted(ordenados, sketch_cuantiles(sketch), side="left") / len(datos)
+    return np.abs(exacto - PUNTOS).max()
+
+
+def sketch_cuantiles(sketch):
+    return np.array([sketch.cuantil(q) for q in PUNTOS])
+
+
+def pares_prueba(n, semilla=0):
+    rng = np.random.default_rng(semilla)
+    return pd.DataFrame({
+        "nombre_pip": [f"P{i}" for i in range(n)],
+        "ratio_costo": rng.lognormal(3, 1, n),
+        "tipo": rng.choice(["DISTRITAL", "PROVINCIAL"], n),
+        "region": rng.choice(["ICA", "LIMA", "PUNO"], n),
+    })
+
+
+def test_exacto_con_pocos_valores():
+    datos = np.random.default_rng(1).normal(size=150)
+    sketch = SketchKLL(200).actualizar(datos)
+    assert sketch.error_rango() == 0.0
+    assert sketch.cuantil(0.5) == np.median(datos)
+    stats = estadisticas_pares(datos)
+    for ratio in (-1.0, 0.0, 0.7):
+        assert percentil_sketch(sketch, ratio) == percentil_ratio(stats, ratio)
+
+
+def test_error_de_rango_acotado():
+    datos = np.random.default_rng(2).lognormal(0, 2, 100_000)
+    sketch = SketchKLL(200)
+    for lote in np.array_split(datos, 50):
+        sketch.actualizar(lote)
+    assert sketch.n == len(datos)
+    assert sum(len(nivel) for nivel in sketch.niveles) < 3 * sketch.k
+    assert 0 < error_rango_maximo(sketch, datos) <= sketch.error_rango()
+    assert sketch.minimo == datos.min() and sketch.maximo == datos.max()
+
+
+def test_fusion_equivale_a_todos_los_datos():
+    rng = np.random.default_rng(3)
+    a, b = rng.normal(0, 1, 40_000), rng.normal(3, 2, 60_000)
+    sa, sb = SketchKLL(200).actualizar(a), SketchKLL(200).actualizar(b)
+    fusion = sa.fusionar(sb)
+    datos = np.concatenate([a, b])
+    assert fusion.n == len(datos) and np.isclose(fusion.suma, datos.sum())
+    assert error_rango_maximo(fusion, datos) <= fusion.error_rango()
+    # Los originales no cambian
+    assert sa.n == len(a) and sb.n == len(b)
+
+
+def test_incremental_solo_agrega_filas_nuevas():
+    pares = pares_prueba(3_000)
+    previos = construir_sketches(pares.iloc[:2_000])
+    sketches, incremental = sketches_incrementales(previos, pares.iloc[:2_000], pares)
+    assert incremental
+    assert sketches["total"].n == 3_000 and previos["total"].n == 2_000
+    assert error_rango_maximo(sketches["total"], pares["ratio_costo"].to_numpy()) <= sketches["total"].error_rango()
+
+    modificados = pares.assign(ratio_costo=pares["ratio_costo"].where(pares.index != 0, -1.0))
+    _, incremental = sketches_incrementales(previos, pares.iloc[:2_000], modificados)
+    assert not incremental
+
+
+def test_guardar_y_cargar(tmp_path):
+    sketches = construir_sketches(pares_prueba(5_000))
+    ruta = tmp_path / "sketches.json"
+    guardar_sketches(sketches, ruta, "abc")
+    version, cargados = cargar_sketches(ruta)
+    assert version == "abc"
+    assert set(cargados["region"]) == set(sketches["region"])
+    np.testing.assert_array_equal(sketch_cuantiles(cargados["total"]), sketch_cuantiles(sketches["total"]))
@@ -0,0 +1,90 @@
+import itertools
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from modelo.datos import DATASETS, cargar_inversiones, region_proyecto, separar_marcona
+from modelo.filtros import (
+    BANDAS_MONTO, BANDAS_POBLACION, DIMENSIONES, IndiceFiltros, banda, columnas_filtro, normalizar_filtro,
+    quitar_dimension,
+)
+
+
+def pares_prueba(n=1_003, semilla=0):
+    rng = np.random.default_rng(semilla)
+    return pd.DataFrame({
+        "tipo": rng.choice(["DISTRITAL", "PROVINCIAL", "REGIONAL"], n),
+        "region": rng.choice(["ICA", "LIMA", "PUNO", "CUSCO"], n),
+        "poblacion_ref": rng.lognormal(10, 1.5, n).round(),
+        "monto_viable": rng.lognormal(14.5, 1.2, n).round(),
+    })
+
+
+def mascara_pandas(pares, filtro):
+    columnas = columnas_filtro(pares)
+    mascara = pd.Series(True, index=columnas.index)
+    for dimension, valores in filtro:
+        mascara &= columnas[dimension].isin(valores)
+    return mascara.to_numpy()
+
+
+def filtros_aleatorios(indice, cantidad, semilla=1):
+    rng = np.random.default_rng(semilla)
+    for _ in range(cantidad):
+        selecciones = {}
+        for dimension in DIMENSIONES:
+            opciones = indice.opciones(dimension)
+            elegidos = rng.random(len(opciones)) < 0.4
+            selecciones[dimension] = [v for v, e in zip(opciones, elegidos) if e]
+        yield normalizar_filtro(selecciones)
+
+
+def test_bandas_cerradas_a_la_izquierda():
+    assert list(banda([0, 9_999, 10_000, 200_000], BANDAS_POBLACION)) == [
+        "< 10 mil", "< 10 mil", "10-50 mil", "≥ 200 mil",
+    ]
+    assert list(banda([999_999, 1_000_000, 5_000_000], BANDAS_MONTO)) == ["< S/ 1 M", "S/ 1-5 M", "≥ S/ 5 M"]
+
+
+def test_mascara_igual_a_pandas():
+    pares = pares_prueba()
+    indice = IndiceFiltros(pares)
+    for filtro in filtros_aleatorios(indice, 200):
+        esperado = mascara_pandas(pares, filtro)
+        np.testing.assert_array_equal(indice.mascara(filtro), esperado, err_msg=str(filtro))
+        assert indice.conteo(filtro) == esperado.sum()
+
+
+def test_todas_las_combinaciones_de_una_dimension():
+    pares = pares_prueba(n=57)
+    indice = IndiceFiltros(pares)
+    opciones = indice.opciones("region")
+    for r in range(1, len(opciones) + 1):
+        for valores in itertools.combinations(opciones, r):
+            filtro = normalizar_filtro({"region": valores})
+            np.testing.assert_array_equal(indice.mascara(filtro), mascara_pandas(pares, filtro))
+
+
+def test_sin_filtro_y_valor_desconocido():
+    pares = pares_prueba(n=13)
+    indice = IndiceFiltros(pares)
+    assert normalizar_filtro({"tipo": [], "region": []}) == ()
+    assert indice.mascara(()).all() and indice.conteo(()) == 13
+    assert indice.conteo((("region", ("ATLANTIDA",)),)) == 0
+
+
+def test_quitar_dimension():
+    filtro = normalizar_filtro({"banda_monto": ["< S/ 1 M"], "tipo": ["DISTRITAL"]})
+    assert quitar_dimension(filtro, "banda_monto") == (("tipo", ("DISTRITAL",)),)
+    assert quitar_dimension(filtro, "region") == filtro
+    assert quitar_dimension(normalizar_filtro({"banda_monto": ["< S/ 1 M"]}), "banda_monto") == ()
+
+
+@pytest.mark.parametrize("version", list(DATASETS))
+def test_mascara_igual_a_pandas_en_los_datasets(version):
+    _, otros = separar_marcona(cargar_inversiones(version))
+    pares = otros.assign(region=region_proyecto(otros)).reset_index(drop=True)
+    indice = IndiceFiltros(pares)
+    for filtro in filtros_aleatorios(indice, 50):
+        np.testing.assert_array_equal(indice.mascara(filtro), mascara_pandas(pares, filtro))
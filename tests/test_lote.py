@@ -0,0 +1,69 @@
+import pandas as pd
+import pytest
+
+from modelo.dimensionamiento import MOTOR, METODOS, dimensionar_escenario
+from modelo.lote import dimensionar_grilla, dimensionar_lote, factores_escolares
+
+ESCENARIOS = [
+    {"tasa_part": 50, "ratio_m2": 1.0, "horizonte": 12, "factor_multi": 15, "ratio_asistencia": 1.0,
+     "aforo_propuesto": 450},
+    {"tasa_part": 100, "ratio_m2": 1.5, "horizonte": 20, "factor_multi": 50, "ratio_asistencia": 5.0,
+     "aforo_propuesto": 800},
+    {"tasa_part": 10, "ratio_m2": 0.8, "horizonte": 5, "factor_multi": 0, "ratio_asistencia": 0.5,
+     "aforo_propuesto": 100},
+]
+ALUMNOS = 976
+
+
+def distritos_motor():
+    """Un distrito por metodo del motor, con los mismos datos que usa el escenario escalar."""
+    filas = []
+    for metodo, p in METODOS.items():
+        est = MOTOR["estadisticas"][metodo]
+        filas.append({
+            "distrito": metodo, "pob_base": p["pob_base"], "tasa_crecimiento": p["tasa"],
+            "mayor_alumnos": ALUMNOS, "anio_base": p["anio_base"],
+            "pob_0_14": est["Población 0-14 años inicial"],
+            "pob_15_64": est["Población 15-64 años inicial"],
+            "pob_65": est["Población 65+ años inicial"],
+            "pob_0_14_final": est["Población 0-14 años final"],
+            "pob_15_64_final": est["Población 15-64 años final"],
+            "pob_65_final": est["Población 65+ años final"],
+            "anio_final": p["anio_fin"],
+        })
+    return pd.DataFrame(filas)
+
+
+@pytest.mark.parametrize("escenario", ESCENARIOS)
+def test_lote_igual_al_escenario_escalar(escenario):
+    distritos = distritos_motor()
+    tabla = dimensionar_lote(distritos, escenario)
+    for fila in tabla.itertuples():
+        r = dimensionar_escenario(escenario, fila.distrito, ALUMNOS)
+        edu, pob, bch = r["enfoques"]
+        assert (fila.aforo_educativo, fila.aforo_poblacional, fila.aforo_benchmark) == (
+            edu["aforo"], pob["aforo"], bch["aforo"]
+        )
+        assert (fila.rango_min, fila.rango_max, fila.punto_equilibrio) == (
+            r["rango_min"], r["rango_max"], r["punto_equilibrio"]
+        )
+        assert (fila.pob_proyectada, fila.anio_horizonte) == (r["pob_proyectada"], r["anio_horizonte"])
+        disparadas = {c[len("alerta_"):] for c in tabla.columns if c.startswith("alerta_") and getattr(fila, c)}
+        assert disparadas == {a["id"] for a in r["alertas"]}
+
+
+def test_grilla_igual_a_lotes_separados():
+    distritos = distritos_motor()
+    grilla = dimensionar_grilla(distritos, ESCENARIOS)
+    for i, escenario in enumerate(ESCENARIOS):
+        esperado = dimensionar_lote(distritos, escenario)
+        obtenido = grilla[grilla["escenario"] == i].drop(columns="escenario").reset_index(drop=True)
+        pd.testing.assert_frame_equal(obtenido, esperado)
+
+
+@pytest.mark.parametrize("horizonte", [-1, 21, 2.5])
+def test_horizonte_fuera_de_la_proyeccion(horizonte):
+    with pytest.raises(ValueError):
+        factores_escolares(distritos_motor(), horizonte)
+    with pytest.raises(ValueError):
+        dimensionar_lote(distritos_motor(), {**ESCENARIOS[0], "horizonte": horizonte})
@@ -0,0 +1,103 @@
+import threading
+
+import pytest
+
+from modelo.memo import MemoLRU
+from modelo.precalculo import Precalculador, vecinos
+
+
+class Contador:
+    """Funcion que cuenta sus llamadas y falla las primeras `fallas` veces."""
+
+    def __init__(self, fallas=0):
+        self.llamadas = 0
+        self.fallas = fallas
+        self.hilos = []
+        self._lock = threading.Lock()
+
+    def __call__(self, valor):
+        with self._lock:
+            self.llamadas += 1
+            falla = self.llamadas <= self.fallas
+        self.hilos.append(threading.current_thread().name)
+        if falla:
+            raise RuntimeError("fallo transitorio")
+        return valor * 2
+
+
+@pytest.fixture
+def bloqueado():
+    """Precalculador de un hilo ocupado por un trabajo que espera un evento."""
+    pre = Precalculador(max_workers=1)
+    liberar, iniciado = threading.Event(), threading.Event()
+    pre.programar("bloqueo", lambda: (iniciado.set(), liberar.wait(10)))
+    iniciado.wait(5)
+    yield pre
+    liberar.set()
+
+
+def test_fallo_en_segundo_plano_se_reintenta():
+    pre = Precalculador(max_workers=1)
+    fn = Contador(fallas=1)
+    futuro = pre.programar("k", fn, 21)
+    with pytest.raises(RuntimeError):
+        futuro.result(5)
+    assert not pre.listo("k")
+    assert pre.programar("k", fn, 21).result(5) == 42
+    assert pre.listo("k") and fn.llamadas == 2
+    # Ya resuelto: no se vuelve a calcular
+    assert pre.obtener("k", fn, 21) == 42 and fn.llamadas == 2
+
+
+def test_fallo_en_linea_no_queda_en_cache(bloqueado):
+    fn = Contador(fallas=1)
+    with pytest.raises(RuntimeError):
+        bloqueado.obtener("k", fn, 5)
+    assert not bloqueado.listo("k")
+    assert bloqueado.obtener("k", fn, 5) == 10
+    assert bloqueado.listo("k") and fn.llamadas == 2
+
+
+def test_obtener_en_cola_se_resuelve_en_el_hilo_actual(bloqueado):
+    fn = Contador()
+    assert bloqueado.obtener("k", fn, 3) == 6
+    assert fn.hilos == [threading.current_thread().name]
+    assert bloqueado.estado()["pendientes"] == 1       # Solo el trabajo bloqueante
+
+
+def test_obtener_simultaneo_calcula_una_vez(bloqueado):
+    inicio = threading.Barrier(8)
+    resultados = []
+    llamadas = []
+
+    def lento(valor):
+        llamadas.append(valor)
+        threading.Event().wait(0.2)
+        return valor * 2
+
+    def pedir():
+        inicio.wait()
+        resultados.append(bloqueado.obtener("k", lento, 4))
+
+    hilos = [threading.Thread(target=pedir) for _ in range(8)]
+    for h in hilos:
+        h.start()
+    for h in hilos:
+        h.join(10)
+    assert resultados == [8] * 8
+    assert len(llamadas) == 1
+
+
+def test_vecinos_respetan_rangos():
+    rangos = {"a": (0, 10, 5), "b": (0.5, 1.0, 0.1)}
+    resultado = list(vecinos({"a": 0, "b": 0.9}, rangos))
+    assert resultado == [{"a": 5, "b": 0.9}, {"a": 0, "b": 0.8}, {"a": 0, "b": 1.0}]
+
+
+def test_memo_estadisticas():
+    memo = MemoLRU(max_entradas=2)
+    for clave in ("a", "b", "a", "c", "a"):
+        memo.obtener(clave, str.upper, clave)
+    stats = memo.estadisticas()
+    assert (stats["entradas"], stats["aciertos"], stats["fallos"]) == (2, 2, 3)
+    assert stats["tasa_acierto"] == pytest.approx(0.4)